@@ -1,9 +1,18 @@
 from django.contrib import admin
 
 from blog.models import (Tag, ResourceType, News, Resource)
+from common.admin import IndexedSearchAdmin
+
+
+class PostAdmin(IndexedSearchAdmin):
+    list_display = ('title', 'community', 'author', 'date_created')
+    list_filter = ('community',)
+    list_select_related = ('community', 'author__user')
+    raw_id_fields = ('author',)
+    search_fields = ('slug',)
 
 
 admin.site.register(Tag)
 admin.site.register(ResourceType)
-admin.site.register(News)
-admin.site.register(Resource)
+admin.site.register(News, PostAdmin)
+admin.site.register(Resource, PostAdmin)
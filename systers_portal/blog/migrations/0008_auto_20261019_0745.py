@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 07:45
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_auto_20261019_0738'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Rendered body'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Excerpt'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Word count'),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='body_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Rendered body'),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Excerpt'),
+        ),
+        migrations.AddField(
+            model_name='resource',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Word count'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from common.utils import render_stored_rich_text
+
+
+def render_rich_text(apps, schema_editor):
+    """Backfill the rich text artifacts of the objects saved before they existed"""
+    for model_name in ('News', 'Resource'):
+        render_stored_rich_text(apps.get_model('blog', model_name), 'content', 50)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_auto_20261019_0745'),
+    ]
+
+    operations = [
+        migrations.RunPython(render_rich_text, migrations.RunPython.noop),
+    ]
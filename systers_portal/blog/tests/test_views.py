@@ -141,6 +141,37 @@ class CommunityNewsViewTestCase(TestCase):
         self.assertContains(response, "Edit current news")
         self.assertContains(response, "Delete current news")
 
+    def test_community_news_view_conditional_get(self):
+        """Test conditional GET requests to a single community news"""
+        news = News.objects.create(slug="bar", title="Bar",
+                                   author=self.systers_user,
+                                   content="Hi there!",
+                                   community=self.community)
+        url = reverse('view_community_news', kwargs={'slug': 'foo',
+                                                     'news_slug': 'bar'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        news.content = "Hi again!"
+        news.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Hi again!")
+        self.assertNotEqual(response['ETag'], etag)
+
+        self.client.login(username="foo", password="foobar")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
 
 class AddCommunityNewsViewTestCase(TestCase):
     def setUp(self):
@@ -391,6 +422,29 @@ class CommunityResourceViewTestCase(TestCase):
         self.assertContains(response, "Bar")
         self.assertContains(response, "Hi there!")
 
+    def test_community_resource_view_conditional_get(self):
+        """Test conditional GET requests to a community resource"""
+        url = reverse('view_community_resource',
+                      kwargs={'slug': 'foo', 'resource_slug': 'bar'})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"foo"')
+        self.assertEqual(response.status_code, 404)
+
+        resource = Resource.objects.create(slug="bar", title="Bar",
+                                           author=self.systers_user,
+                                           content="Hi there!",
+                                           community=self.community)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        resource.title = "Baz"
+        resource.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Baz")
+
     def test_multiple_communities_same_slug_resource_view(self):
         """Test GET request to two resource objects with same slug, but
         belonging to two separate communities"""
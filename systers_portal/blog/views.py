@@ -5,7 +5,7 @@ from django.views.generic import (ListView, DetailView, CreateView, UpdateView,
 from django.views.generic.detail import SingleObjectMixin
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 
-from common.mixins import UserDetailsMixin
+from common.mixins import ConditionalGetMixin, PublicCacheMixin, UserDetailsMixin
 from community.mixins import CommunityMenuMixin
 from community.models import Community
 from blog.forms import (AddNewsForm, EditNewsForm, AddResourceForm,
@@ -14,8 +14,8 @@ from blog.mixins import ResourceTypesMixin
 from blog.models import News, Resource, ResourceType, Tag
 
 
-class CommunityNewsListView(UserDetailsMixin, CommunityMenuMixin,
-                            SingleObjectMixin, ListView):
+class CommunityNewsListView(PublicCacheMixin, UserDetailsMixin,
+                            CommunityMenuMixin, SingleObjectMixin, ListView):
     """List of Community news view"""
     template_name = "blog/post_list.html"
     page_slug = 'news'
@@ -33,7 +33,8 @@ class CommunityNewsListView(UserDetailsMixin, CommunityMenuMixin,
         return context
 
     def get_queryset(self):
-        return News.objects.filter(community=self.object)
+        return News.objects.filter(community=self.object).defer(
+            'content', 'body_html')
 
     def get_community(self):
         """Overrides the method from CommunityMenuMixin to extract the current
@@ -44,12 +45,23 @@ class CommunityNewsListView(UserDetailsMixin, CommunityMenuMixin,
         return self.object
 
 
-class CommunityNewsView(UserDetailsMixin, CommunityMenuMixin, DetailView):
+class CommunityNewsView(PublicCacheMixin, ConditionalGetMixin,
+                        UserDetailsMixin, CommunityMenuMixin, DetailView):
     """Single News Community view"""
     template_name = "blog/post.html"
     model = Community
     page_slug = 'news'
 
+    def get_validators(self):
+        """Compute the page validators from the News modification date"""
+        news = News.objects.filter(community__slug=self.kwargs['slug'],
+                                   slug=self.kwargs['news_slug']).\
+            values_list('pk', 'date_modified').first()
+        if news is None:
+            return None
+        pk, date_modified = news
+        return self.make_etag("news", pk, date_modified), date_modified
+
     def get_context_data(self, **kwargs):
         """Add Community object, News object and post type to the context"""
         context = super(CommunityNewsView, self).get_context_data(**kwargs)
@@ -171,9 +183,9 @@ class DeleteCommunityNewsView(LoginRequiredMixin, PermissionRequiredMixin,
         return request.user.has_perm("delete_community_news", self.community)
 
 
-class CommunityResourceListView(UserDetailsMixin, CommunityMenuMixin,
-                                ResourceTypesMixin, SingleObjectMixin,
-                                ListView):
+class CommunityResourceListView(PublicCacheMixin, UserDetailsMixin,
+                                CommunityMenuMixin, ResourceTypesMixin,
+                                SingleObjectMixin, ListView):
     """List of Community resources view"""
     template_name = "blog/post_list.html"
     page_slug = 'resources'
@@ -195,13 +207,14 @@ class CommunityResourceListView(UserDetailsMixin, CommunityMenuMixin,
     def get_queryset(self):
         """Get the list of Resource objects filtered or not by their resource
         type"""
+        resources = Resource.objects.filter(community=self.object).defer(
+            'content', 'body_html')
         type_query = self.request.GET.get("type", "")
         if type_query:
             resource_type = ResourceType.objects.filter(name=type_query)
             if resource_type:
-                return Resource.objects.filter(community=self.object,
-                                               resource_type=resource_type[0])
-        return Resource.objects.filter(community=self.object)
+                return resources.filter(resource_type=resource_type[0])
+        return resources
 
     def get_community(self):
         """Overrides the method from CommunityMenuMixin to extract the current
@@ -212,12 +225,24 @@ class CommunityResourceListView(UserDetailsMixin, CommunityMenuMixin,
         return self.object
 
 
-class CommunityResourceView(UserDetailsMixin, CommunityMenuMixin, DetailView):
+class CommunityResourceView(PublicCacheMixin, ConditionalGetMixin,
+                            UserDetailsMixin, CommunityMenuMixin, DetailView):
     """Resource Community view"""
     template_name = "blog/post.html"
     model = Community
     page_slug = 'resources'
 
+    def get_validators(self):
+        """Compute the page validators from the Resource modification date"""
+        resource = Resource.objects.filter(
+            community__slug=self.kwargs['slug'],
+            slug=self.kwargs['resource_slug']).\
+            values_list('pk', 'date_modified').first()
+        if resource is None:
+            return None
+        pk, date_modified = resource
+        return self.make_etag("resource", pk, date_modified), date_modified
+
     def get_context_data(self, **kwargs):
         """Add Community object, Resource object and post type to the
         context"""
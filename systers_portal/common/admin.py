@@ -1,5 +1,75 @@
+import operator
+from collections import defaultdict
+from functools import reduce
+
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
 from common.models import Comment
 
 
-admin.site.register(Comment)
+class IndexedSearchAdmin(admin.ModelAdmin):
+    """ModelAdmin for tables too large to scan. The search looks up the
+    `search_fields` by case sensitive prefix, which PostgreSQL answers with
+    the `varchar_pattern_ops` indexes of the unique and indexed text columns,
+    instead of the `icontains` lookups of the default search, and a number
+    searches the primary key. The changelist does not count the whole table
+    to show the total number of rows."""
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Filter the queryset by prefix of the search fields or by id
+
+        :return: tuple (QuerySet, False since no lookup spans a
+                 multi-valued relation)
+        """
+        search_term = search_term.strip()
+        search_fields = self.get_search_fields(request)
+        if not search_term or not search_fields:
+            return queryset, False
+        lookups = [Q(**{"{0}__startswith".format(field): search_term})
+                   for field in search_fields]
+        if search_term.isdigit():
+            lookups.append(Q(pk=int(search_term)))
+        return queryset.filter(reduce(operator.or_, lookups)), False
+
+
+class CommentChangeList(ChangeList):
+    """ChangeList fetching the commented objects with one query per content
+    type, along with the objects their string representation refers to"""
+    def get_results(self, request):
+        super(CommentChangeList, self).get_results(request)
+        object_ids = defaultdict(set)
+        for comment in self.result_list:
+            object_ids[comment.content_type_id].add(comment.object_id)
+        objects = {}
+        for content_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            for obj in model._default_manager.select_related().filter(pk__in=ids):
+                objects[content_type_id, obj.pk] = obj
+        for comment in self.result_list:
+            comment.commented_object = objects.get((comment.content_type_id,
+                                                    comment.object_id))
+
+
+class CommentAdmin(IndexedSearchAdmin):
+    list_display = ('pk', 'author', 'content_type', 'commented_object',
+                    'is_approved', 'date_created')
+    list_filter = ('is_approved', 'content_type')
+    list_select_related = ('author__user', 'content_type')
+    raw_id_fields = ('author',)
+    search_fields = ('author__user__username',)
+
+    def get_changelist(self, request, **kwargs):
+        return CommentChangeList
+
+    def commented_object(self, comment):
+        return getattr(comment, 'commented_object', None)
+    commented_object.short_description = "Commented object"
+
+
+admin.site.register(Comment, CommentAdmin)
@@ -0,0 +1,219 @@
+"""Two tier cache and versioned cache namespaces.
+
+`TwoTierCache` keeps the recently used entries in a bounded in-process LRU in
+front of a cache shared by all the workers, like a file based or a database
+cache, so that no cache service is needed. The local entries are kept for
+`LOCAL_TIMEOUT` seconds at most, which bounds how long a worker may miss
+the writes of the other workers.
+
+The cached data of an object, like a Community or a MeetupLocation, lives in
+a namespace whose version is part of the keys, so that bumping the version
+invalidates all of it at once.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import transaction
+
+# LRU stores, statistics and locks of the TwoTierCache instances, by location. The
+# cache instances are per thread, the stores are shared by the threads.
+_stores = {}
+_stats = {}
+_locks = {}
+
+NAMESPACE_VERSION_KEY = "namespace:{0}:version"
+
+
+class TwoTierCache(BaseCache):
+    """Cache backend keeping an in-process LRU of the entries of a shared cache.
+
+    LOCATION is the alias of the shared cache. The OPTIONS are:
+
+    * MAX_ENTRIES: number of entries of the LRU, default 1000
+    * LOCAL_TIMEOUT: seconds an entry is kept in the LRU, default 5
+    """
+    def __init__(self, location, params):
+        super(TwoTierCache, self).__init__(params)
+        options = params.get('OPTIONS', {})
+        self._max_entries = int(options.get('MAX_ENTRIES', 1000))
+        self._local_timeout = float(options.get('LOCAL_TIMEOUT', 5))
+        self._shared_alias = location
+        self._store = _stores.setdefault(location, OrderedDict())
+        self._stats = _stats.setdefault(location, dict.fromkeys(
+            ('local_hits', 'shared_hits', 'misses', 'evictions'), 0))
+        self._lock = _locks.setdefault(location, threading.Lock())
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _local_key(self, key, version):
+        key = self.shared.make_key(key, version=version)
+        self.shared.validate_key(key)
+        return key
+
+    def _get_local(self, local_key):
+        with self._lock:
+            entry = self._store.get(local_key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._store.move_to_end(local_key)
+                    self._stats['local_hits'] += 1
+                    return pickle.loads(entry[0])
+                del self._store[local_key]
+        return None
+
+    def _set_local(self, local_key, value, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.shared.default_timeout
+        local_timeout = self._local_timeout
+        if timeout is not None:
+            local_timeout = min(timeout, local_timeout)
+        if local_timeout <= 0:
+            self._delete_local(local_key)
+            return
+        # pickled like the other backends, so that the callers cannot change the cached values
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store[local_key] = (pickled, time.monotonic() + local_timeout)
+            self._store.move_to_end(local_key)
+            while len(self._store) > self._max_entries:
+                self._store.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _delete_local(self, local_key):
+        with self._lock:
+            self._store.pop(local_key, None)
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        value = self._get_local(local_key)
+        if value is not None:
+            return value
+        value = self.shared.get(key, version=version)
+        if value is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return default
+        with self._lock:
+            self._stats['shared_hits'] += 1
+        self._set_local(local_key, value, DEFAULT_TIMEOUT)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._set_local(self._local_key(key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._set_local(self._local_key(key, version), value, timeout)
+        return added
+
+    def delete(self, key, version=None):
+        self._delete_local(self._local_key(key, version))
+        self.shared.delete(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self._local_key(key, version)
+        self._delete_local(local_key)
+        value = self.shared.incr(key, delta, version=version)
+        self._set_local(local_key, value, DEFAULT_TIMEOUT)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+        self.shared.clear()
+
+    def get_stats(self):
+        """Get the statistics of the cache in this process
+
+        :return: dict with the integer numbers of local_hits, shared_hits, misses and evictions,
+                 the float hit_ratio and the integer number of local entries
+        """
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._store))
+        hits = stats['local_hits'] + stats['shared_hits']
+        stats['hit_ratio'] = hits / (hits + stats['misses']) if hits + stats['misses'] else 0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.update(dict.fromkeys(self._stats, 0))
+
+
+def get_object_namespace(model, pk):
+    """Get the cache namespace of the data of an object
+
+    :param model: model class of the object
+    :param pk: primary key of the object
+    :return: string namespace, like `community:1`
+    """
+    return '{0}:{1}'.format(model._meta.model_name, pk)
+
+
+def get_namespace_version(namespace):
+    """Get the version of a cache namespace. A missing version starts from the current time,
+    above the versions used before.
+
+    :param namespace: string namespace
+    :return: integer version
+    """
+    version_key = NAMESPACE_VERSION_KEY.format(namespace)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, int(time.time() * 1000), None)
+        version = cache.get(version_key)
+    return version
+
+
+def make_namespaced_key(namespace, *parts):
+    """Get a cache key in a namespace. The key contains the version of the namespace, so that it
+    changes with every bump of the namespace.
+
+    :param namespace: string namespace
+    :param parts: strings identifying the data
+    :return: string cache key
+    """
+    return ':'.join(str(part) for part in (namespace, get_namespace_version(namespace)) + parts)
+
+
+def get_or_set_namespaced(namespace, parts, default, timeout=DEFAULT_TIMEOUT):
+    """Get data cached in a namespace, computing and caching it when missing
+
+    :param namespace: string namespace
+    :param parts: tuple of strings identifying the data
+    :param default: callable computing the data, which must not be None
+    :param timeout: seconds the data is cached
+    :return: the cached data
+    """
+    key = make_namespaced_key(namespace, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = default()
+        cache.set(key, value, timeout)
+    return value
+
+
+def bump_namespace(namespace):
+    """Change the version of a namespace, right away and again once the transaction is
+    committed, so that data cached in between from the data before the commit is not used
+
+    :param namespace: string namespace
+    """
+    version_key = NAMESPACE_VERSION_KEY.format(namespace)
+
+    def increment_version():
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            # no version, the next key starts a new one
+            pass
+
+    increment_version()
+    transaction.on_commit(increment_version)
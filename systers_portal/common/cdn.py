@@ -0,0 +1,105 @@
+"""Caching of the public pages by a CDN or a shared HTTP cache.
+
+The pages served to anonymous visitors by `common.mixins.PublicCacheMixin`
+carry a `Surrogate-Key` header naming the objects they depend on, like
+`community-1 meetuplocation-2`. When such an object changes, the dependent
+pages are purged from the cache by a background job calling the purger of
+`CDN_PURGER`.
+"""
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils.module_loading import import_string
+
+from common.jobs import enqueue, purge_cdn
+
+
+def get_surrogate_key(model, pk):
+    """Get the surrogate key of an object
+
+    :param model: model class of the object
+    :param pk: primary key of the object
+    :return: string surrogate key, like `community-1`
+    """
+    return '{0}-{1}'.format(model._meta.model_name, pk)
+
+
+def get_dependent_surrogate_keys(instance):
+    """Get the surrogate keys of the public pages showing an object
+
+    :param instance: model instance
+    :return: list of string surrogate keys, empty if no public page shows the object
+    """
+    label = instance._meta.label_lower
+    if label in ('community.community', 'meetup.meetuplocation'):
+        return [get_surrogate_key(type(instance), instance.pk)]
+    if label in ('community.communitypage', 'blog.news', 'blog.resource'):
+        return [get_surrogate_key(instance._meta.get_field('community').related_model,
+                                  instance.community_id)]
+    if label == 'meetup.meetup':
+        return [get_surrogate_key(type(instance), instance.pk),
+                get_surrogate_key(instance._meta.get_field('meetup_location').related_model,
+                                  instance.meetup_location_id)]
+    if label == 'meetup.rsvp':
+        return [get_surrogate_key(instance._meta.get_field('meetup').related_model,
+                                  instance.meetup_id)]
+    if label == 'common.comment':
+        model = ContentType.objects.get_for_id(instance.content_type_id).model_class()
+        keys = [get_surrogate_key(model, instance.object_id)]
+        if model._meta.label_lower == 'meetup.meetup':
+            # the upcoming meetups on the pages of the location show their number of comments
+            location_id = model._default_manager.filter(pk=instance.object_id).values_list(
+                'meetup_location_id', flat=True).first()
+            if location_id is not None:
+                keys.append(get_surrogate_key(
+                    model._meta.get_field('meetup_location').related_model, location_id))
+        return keys
+    return []
+
+
+class BasePurger(object):
+    """Purger of the pages cached by a CDN. Subclasses implement `purge()`."""
+    def purge(self, keys):
+        """Purge the cached pages having any of the surrogate keys
+
+        :param keys: list of string surrogate keys
+        :raises Exception: if the purge failed, the job purging the keys is then retried
+        """
+        raise NotImplementedError
+
+
+class HttpPurger(BasePurger):
+    """Purge with a single HTTP request to `CDN_PURGE_URL` listing the keys in its
+    `Surrogate-Key` header, like the purge APIs of Fastly and of Varnish with xkey"""
+    method = 'PURGE'
+
+    def purge(self, keys):
+        request = Request(settings.CDN_PURGE_URL, method=self.method,
+                          headers={'Surrogate-Key': ' '.join(keys)})
+        with urlopen(request, timeout=settings.CDN_PURGE_TIMEOUT):
+            pass
+
+
+def get_purger():
+    """Get the purger of `CDN_PURGER`
+
+    :return: BasePurger object, or None if no purger is configured
+    """
+    if not settings.CDN_PURGER:
+        return None
+    return import_string(settings.CDN_PURGER)()
+
+
+def purge_surrogate_keys(keys):
+    """Queue the purge of the cached pages having any of the surrogate keys, unless no purger
+    is configured
+
+    :param keys: list of string surrogate keys
+    :return: Job object, or None if the purge was run right away, was already queued or if no
+             purger is configured
+    """
+    if not settings.CDN_PURGER or not keys:
+        return None
+    keys = sorted(set(keys))
+    return enqueue(purge_cdn, keys, dedup_key='purge_cdn:' + ' '.join(keys))
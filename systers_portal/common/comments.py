@@ -0,0 +1,122 @@
+"""Comment threads, and sweeping of the orphaned comments.
+
+Comments refer to the commented object through a generic foreign key. The
+threads are read with `get_comment_page`, one page at a time, and the
+models with comments subclass `Commentable`, which keeps their number of
+approved comments up to date through `update_comment_count`.
+
+The database does not delete the comments along with the object, hence
+`Commentable` declares a `GenericRelation` to `Comment` to delete them on
+cascade; `sweep_orphaned_comments` deletes the comments left behind by the
+objects deleted before, or deleted without going through the ORM.
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from common.models import Comment, Commentable
+
+
+def get_comments(obj):
+    """Get the approved comments to an object, with their authors. The
+    content type comes from the cache of the ContentType manager.
+
+    :param obj: commented object
+    :return: QuerySet of Comment objects
+    """
+    return Comment.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk,
+        is_approved=True).select_related('author__user')
+
+
+def get_comment_page(obj, after=None, size=None):
+    """Get a page of the approved comments to an object, oldest first. The
+    pages are addressed by a cursor, the id of the last comment of the
+    previous page, so that they do not shift when comments are added and
+    no comment before the page is counted or skipped by the query.
+
+    :param obj: commented object
+    :param after: integer id of the last comment of the previous page, None
+                  for the first page
+    :param size: integer number of comments per page, defaults to
+                 `COMMENTS_PAGE_SIZE`
+    :return: tuple (list of Comment objects, integer cursor of the next page
+             or None if there is no next page)
+    """
+    size = size or settings.COMMENTS_PAGE_SIZE
+    comments = get_comments(obj)
+    if after is not None:
+        comments = comments.filter(pk__gt=after)
+    comments = list(comments.order_by('pk')[:size + 1])
+    if len(comments) > size:
+        return comments[:size], comments[size - 1].pk
+    return comments, None
+
+
+@transaction.atomic
+def update_comment_count(content_type_id, object_id):
+    """Count the approved comments of a `Commentable` object. The object row
+    is locked before the count, so that the comments committed meanwhile by
+    concurrent transactions are counted too.
+
+    :param content_type_id: integer id of the ContentType of the object
+    :param object_id: integer id of the object
+    """
+    model = ContentType.objects.get_for_id(content_type_id).model_class()
+    if model is None or not issubclass(model, Commentable):
+        return
+    objects = model._default_manager.filter(pk=object_id)
+    if not objects.select_for_update().values_list('pk', flat=True):
+        return
+    count = Comment.objects.filter(
+        content_type_id=content_type_id, object_id=object_id,
+        is_approved=True).order_by().values('object_id').annotate(
+        count=Count('pk')).values('count')
+    objects.update(comment_count=Coalesce(Subquery(count, output_field=IntegerField()), 0))
+
+
+def get_orphaned_comments(content_type):
+    """Get the comments to objects of a content type that do not exist
+    anymore, with an anti-join on the table of the content type
+
+    :param content_type: ContentType object
+    :return: QuerySet of Comment objects
+    """
+    comments = Comment.objects.filter(content_type=content_type)
+    model = content_type.model_class()
+    if model is None:
+        # the model was removed, all its comments are orphaned
+        return comments
+    return comments.annotate(has_object=Exists(model._default_manager.filter(
+        pk=OuterRef('object_id')))).filter(has_object=False)
+
+
+def sweep_orphaned_comments(chunk_size=1000, dry_run=False):
+    """Delete the orphaned comments of every content type, at most
+    `chunk_size` comments per query
+
+    :param chunk_size: integer maximum number of comments deleted at a time
+    :param dry_run: if True, only count the orphaned comments
+    :return: dict mapping the content types to their number of orphaned
+             comments
+    """
+    content_type_ids = Comment.objects.order_by().values_list(
+        'content_type_id', flat=True).distinct()
+    swept = {}
+    for content_type in ContentType.objects.filter(pk__in=content_type_ids):
+        orphans = get_orphaned_comments(content_type)
+        if dry_run:
+            count = orphans.count()
+        else:
+            count = 0
+            while True:
+                pks = list(orphans.values_list('pk', flat=True)[:chunk_size])
+                if not pks:
+                    break
+                Comment.objects.filter(pk__in=pks).delete()
+                count += len(pks)
+        if count:
+            swept[content_type] = count
+    return swept
@@ -0,0 +1,28 @@
+# CKEditor uploads
+UPLOAD_MISSING_MSG = "No file was uploaded."
+UPLOAD_TOO_LARGE_MSG = "The file is too large, the maximum size is {0} MB."
+UPLOAD_INVALID_TYPE_MSG = "Invalid file type."
+
+# background jobs
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_STATUS_CHOICES = (
+    (JOB_QUEUED, "Queued"),
+    (JOB_RUNNING, "Running"),
+    (JOB_DONE, "Done"),
+    (JOB_FAILED, "Failed"),
+)
+
+# exports
+EXPORT_CSV = "csv"
+EXPORT_JSONL = "jsonl"
+EXPORT_CONTENT_TYPES = {
+    EXPORT_CSV: "text/csv; charset=utf-8",
+    EXPORT_JSONL: "application/x-ndjson; charset=utf-8",
+}
+
+# signed cookie pinning the reads of a user to the primary database, see common.routers
+REPLICA_PIN_COOKIE = "primary"
+REPLICA_PIN_SALT = "common.routers.pin"
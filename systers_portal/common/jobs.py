@@ -0,0 +1,330 @@
+"""Background jobs stored in the database.
+
+A job is a module level function decorated with `job`, queued with
+`enqueue` and run by the `run_workers` command. Since the job row is
+inserted in the current transaction, it only becomes visible to the workers
+once the transaction commits. Workers claim jobs with
+`SELECT ... FOR UPDATE SKIP LOCKED`, so that concurrent workers never
+block each other nor run the same job twice. A failing job is retried with
+an exponential backoff until it reaches its maximum number of attempts.
+"""
+import functools
+import json
+import logging
+import random
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from common.constants import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+from common.models import Job
+
+
+logger = logging.getLogger(__name__)
+
+
+def job(func):
+    """Mark a module level function as a job that can be queued"""
+    func.job_name = "{0}.{1}".format(func.__module__, func.__name__)
+    return func
+
+
+def recurring_job(interval_setting):
+    """Mark a module level function as a job run periodically. The job takes
+    a `reschedule` argument, True by default, to queue its next run once it
+    is done, whether it succeeded or not, so that a run failing all its
+    attempts does not stop the job. The first run is queued with
+    `schedule()`, e.g.::
+
+        @recurring_job('COMMENTS_SWEEP_INTERVAL')
+        def sweep_comments():
+            ...
+
+        sweep_comments.schedule()
+
+    :param interval_setting: string name of the setting with the integer
+                             number of seconds between two runs
+    :return: decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(reschedule=True):
+            try:
+                func()
+            finally:
+                if reschedule:
+                    wrapper.schedule()
+
+        def schedule():
+            """Queue the next run of the job, unless it is already queued
+
+            :return: Job object, or None if the run was already queued or if
+                     the jobs are not queued
+            """
+            if getattr(settings, 'JOBS_ALWAYS_EAGER', False):
+                return None
+            return enqueue(wrapper, dedup_key=wrapper.job_name,
+                           delay=getattr(settings, interval_setting))
+
+        wrapper.schedule = schedule
+        return job(wrapper)
+    return decorator
+
+
+def enqueue(func, *args, dedup_key=None, delay=0, max_attempts=None, **kwargs):
+    """Queue a job. The arguments must be JSON serializable.
+
+    :param func: function decorated with `job`
+    :param dedup_key: string key, the job is not queued if a queued job has
+                      the same key
+    :param delay: integer number of seconds to wait before running the job
+    :param max_attempts: integer number of times the job is tried, defaults
+                         to `JOBS_MAX_ATTEMPTS`
+    :return: Job object, or None if the job was run right away or was a
+             duplicate
+    """
+    if getattr(settings, 'JOBS_ALWAYS_EAGER', False):
+        func(*args, **kwargs)
+        return None
+    new_job = Job(name=func.job_name,
+                  payload=json.dumps({'args': args, 'kwargs': kwargs}, cls=DjangoJSONEncoder),
+                  dedup_key=dedup_key,
+                  max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+                  run_at=timezone.now() + timedelta(seconds=delay))
+    if dedup_key is None:
+        new_job.save()
+        return new_job
+    try:
+        with transaction.atomic():
+            new_job.save()
+    except IntegrityError:
+        return None
+    return new_job
+
+
+def get_job_function(name):
+    """Import the function of a job
+
+    :param name: string dotted path of the job function
+    :return: function
+    :raises ImportError: if the name is not a job
+    """
+    func = import_string(name)
+    if getattr(func, 'job_name', None) != name:
+        raise ImportError("{0} is not a job".format(name))
+    return func
+
+
+def get_retry_delay(attempts):
+    """Get the delay before retrying a job, doubling after each attempt up to
+    `JOBS_MAX_RETRY_DELAY`, with a random jitter to spread retries.
+
+    :param attempts: integer number of attempts so far
+    :return: float number of seconds
+    """
+    delay = min(settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1),
+                settings.JOBS_MAX_RETRY_DELAY)
+    return delay * random.uniform(1, 1.1)
+
+
+def claim_jobs(limit):
+    """Claim due jobs for the current worker, skipping the jobs locked by
+    other workers. The claimed jobs are marked as running and lose their
+    deduplication key, so that new jobs with the same key can be queued.
+
+    :param limit: integer maximum number of jobs to claim
+    :return: list of claimed Job objects
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(Job.objects.select_for_update(skip_locked=True).filter(
+            status=JOB_QUEUED, run_at__lte=now).order_by('run_at')[:limit])
+        if jobs:
+            Job.objects.filter(pk__in=[j.pk for j in jobs]).update(
+                status=JOB_RUNNING, date_started=now, dedup_key=None,
+                attempts=F('attempts') + 1)
+    for claimed in jobs:
+        claimed.status, claimed.date_started = JOB_RUNNING, now
+        claimed.attempts += 1
+    return jobs
+
+
+def run_job(claimed):
+    """Run a claimed job and record its outcome
+
+    :param claimed: Job object returned by `claim_jobs`
+    :return: True if the job succeeded, False otherwise
+    """
+    try:
+        payload = json.loads(claimed.payload)
+        get_job_function(claimed.name)(*payload['args'], **payload['kwargs'])
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Job %s failed on attempt %s:\n%s", claimed, claimed.attempts, error)
+        if claimed.attempts >= claimed.max_attempts:
+            Job.objects.filter(pk=claimed.pk).update(
+                status=JOB_FAILED, date_finished=timezone.now(), last_error=error)
+        else:
+            Job.objects.filter(pk=claimed.pk).update(
+                status=JOB_QUEUED, last_error=error, run_at=timezone.now() + timedelta(
+                    seconds=get_retry_delay(claimed.attempts)))
+        return False
+    Job.objects.filter(pk=claimed.pk).update(status=JOB_DONE, date_finished=timezone.now())
+    return True
+
+
+def requeue_stale_jobs():
+    """Put back in the queue the jobs of workers that died while running
+    them, i.e. running for longer than `JOBS_TIMEOUT` seconds. The stale jobs
+    that reached their maximum number of attempts are marked as failed
+    instead, so that a job killing its worker is not run forever.
+
+    :return: integer number of requeued jobs
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=JOB_RUNNING,
+                               date_started__lt=now - timedelta(seconds=settings.JOBS_TIMEOUT))
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=JOB_FAILED, date_finished=now,
+        last_error="Timed out after {0} seconds".format(settings.JOBS_TIMEOUT))
+    return stale.filter(attempts__lt=F('max_attempts')).update(status=JOB_QUEUED, run_at=now)
+
+
+def purge_finished_jobs():
+    """Delete the successful jobs finished more than `JOBS_RETENTION` seconds
+    ago, the failed ones are kept for inspection.
+
+    :return: integer number of deleted jobs
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_RETENTION)
+    deleted, _ = Job.objects.filter(status=JOB_DONE, date_finished__lt=cutoff).delete()
+    return deleted
+
+
+def work(should_stop, batch_size=10, poll_interval=1.0, once=False):
+    """Worker loop: claim and run jobs until `should_stop` returns True, or
+    until the queue is empty if `once` is set.
+
+    :param should_stop: callable returning True when the worker must exit
+    :param batch_size: integer number of jobs claimed at a time
+    :param poll_interval: float seconds to wait when the queue is empty
+    :param once: boolean, exit as soon as the queue is empty
+    :return: tuple (integer succeeded jobs, integer failed jobs)
+    """
+    succeeded = failed = 0
+    last_maintenance = None
+    while not should_stop():
+        if last_maintenance is None or \
+                time.monotonic() - last_maintenance > settings.JOBS_TIMEOUT / 2:
+            requeue_stale_jobs()
+            purge_finished_jobs()
+            last_maintenance = time.monotonic()
+        jobs = claim_jobs(batch_size)
+        if not jobs:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        for claimed in jobs:
+            if run_job(claimed):
+                succeeded += 1
+            else:
+                failed += 1
+    return succeeded, failed
+
+
+def get_metrics(window=60):
+    """Measure the state of the queue
+
+    :param window: integer number of seconds over which the throughput and
+                   the mean lag are measured
+    :return: dict with the number of jobs per status, `lag` the seconds the
+             oldest due job has been waiting, `throughput` the jobs finished
+             per second and `mean_lag` the mean seconds the jobs finished
+             during the window waited before starting
+    """
+    now = timezone.now()
+    since = now - timedelta(seconds=window)
+    metrics = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+    for status, count in Job.objects.order_by().values_list('status').annotate(
+            count=Count('pk')):
+        metrics[status] = count
+    oldest = Job.objects.filter(status=JOB_QUEUED, run_at__lte=now).aggregate(
+        oldest=Min('run_at'))['oldest']
+    metrics['lag'] = (now - oldest).total_seconds() if oldest else 0
+    finished = Job.objects.filter(status=JOB_DONE, date_finished__gte=since)
+    metrics['throughput'] = finished.count() / window
+    mean_lag = finished.aggregate(lag=Avg(ExpressionWrapper(
+        F('date_started') - F('run_at'), output_field=DurationField()),
+        output_field=DurationField()))['lag']
+    metrics['mean_lag'] = mean_lag.total_seconds() if mean_lag else 0
+    return metrics
+
+
+@job
+def send_email(subject, body, from_email, to, html_body=None):
+    """Send an email message
+
+    :param subject: string subject
+    :param body: string plain text body
+    :param from_email: string sender address
+    :param to: list of string recipient addresses
+    :param html_body: optional string HTML alternative of the body
+    """
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
+
+
+@recurring_job('COMMENTS_SWEEP_INTERVAL')
+def sweep_comments():
+    """Delete the orphaned comments, see `common.comments`"""
+    from common.comments import sweep_orphaned_comments
+
+    swept = sweep_orphaned_comments(chunk_size=settings.COMMENTS_SWEEP_CHUNK_SIZE)
+    for content_type, count in swept.items():
+        logger.info("Deleted %d orphaned comments to %s", count, content_type)
+
+
+@recurring_job('SESSIONS_PURGE_INTERVAL')
+def purge_sessions():
+    """Delete the expired sessions, see `common.sessions`"""
+    from common.sessions import purge_expired_sessions
+
+    count = purge_expired_sessions(batch_size=settings.SESSIONS_PURGE_BATCH_SIZE,
+                                   pause=settings.SESSIONS_PURGE_PAUSE)
+    logger.info("Deleted %d expired sessions", count)
+
+
+@job
+def process_upload(pending_name, blob_name):
+    """Process an uploaded image, see `common.uploads`
+
+    :param pending_name: string storage name of the uploaded image
+    :param blob_name: string storage name of the processed image
+    """
+    from common.uploads import process_pending_image
+
+    process_pending_image(pending_name, blob_name)
+
+
+@job
+def purge_cdn(keys):
+    """Purge the pages cached by the CDN, see `common.cdn`
+
+    :param keys: list of string surrogate keys of the pages
+    """
+    from common.cdn import get_purger
+
+    purger = get_purger()
+    if purger is not None:
+        purger.purge(keys)
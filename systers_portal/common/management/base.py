@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.utils import run_in_batches
+
+
+class BatchCommand(BaseCommand):
+    """Base of the commands processing rows in batches, with the `--batch-size`, `--pause` and
+    `--dry-run` options. The subclasses implement `count` and `run_batch`, the options they add
+    are read in `handle` before calling the one of this class."""
+    # names of the settings with the defaults of --batch-size and --pause
+    batch_size_setting = None
+    pause_setting = None
+    # e.g. "join requests", "archive" and "archived"
+    items = None
+    action = None
+    done = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, dest='batch_size',
+                            default=getattr(settings, self.batch_size_setting),
+                            help="Number of {0} to {1} per batch.".format(
+                                self.items, self.action))
+        parser.add_argument('--pause', type=float,
+                            default=getattr(settings, self.pause_setting),
+                            help="Seconds to wait between two batches.")
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run',
+                            help="Only count the {0} to {1}.".format(self.items, self.action))
+
+    def count(self):
+        """Count the rows to process
+
+        :return: integer number of rows
+        """
+        raise NotImplementedError
+
+    def run_batch(self, batch_size):
+        """Process a batch of rows
+
+        :param batch_size: integer maximum number of rows to process
+        :return: integer number of processed rows
+        """
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write("[dry run] {0} {1} to {2}".format(
+                self.count(), self.items, self.action))
+            return
+        count = run_in_batches(self.run_batch, options['batch_size'], options['pause'])
+        self.stdout.write("{0} {1} {2}".format(count, self.items, self.done))
@@ -0,0 +1,86 @@
+import json
+import shutil
+import tempfile
+import time
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from ckeditor_uploader.views import upload
+from PIL import Image
+
+from common.constants import JOB_QUEUED
+from common.jobs import process_upload
+from common.models import Job
+from common.views import CKEditorUploadView
+
+
+class Command(BaseCommand):
+    help = "Compare for how long the CKEditor upload of a large photo keeps " \
+           "a web worker busy, with the synchronous ckeditor_uploader view " \
+           "and with the view handing the processing to a background job."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uploads', type=int, default=10,
+                            help="Number of uploads per view.")
+        parser.add_argument('--width', type=int, default=4032,
+                            help="Width in pixels of the uploaded photo.")
+        parser.add_argument('--height', type=int, default=3024,
+                            help="Height in pixels of the uploaded photo.")
+
+    def handle(self, *args, **options):
+        photo = self.create_photo(options['width'], options['height'])
+        self.stdout.write("Uploading {0} photos of {1}x{2} pixels, {3} KB".format(
+            options['uploads'], options['width'], options['height'], len(photo) // 1024))
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root, JOBS_ALWAYS_EAGER=False):
+                self.run_benchmark("ckeditor_uploader", upload, photo, options['uploads'])
+                started = timezone.now()
+                self.run_benchmark("background jobs", CKEditorUploadView.as_view(), photo,
+                                   options['uploads'])
+                # run the jobs of the benchmark only, not the other queued jobs
+                queued = Job.objects.filter(name=process_upload.job_name, status=JOB_QUEUED,
+                                            date_created__gte=started)
+                start = time.perf_counter()
+                for queued_job in queued:
+                    process_upload(*json.loads(queued_job.payload)['args'])
+                self.stdout.write("background jobs: all images processed in {0:.2f} s".format(
+                    time.perf_counter() - start))
+                queued.delete()
+        finally:
+            shutil.rmtree(media_root)
+
+    @staticmethod
+    def create_photo(width, height):
+        output = BytesIO()
+        Image.merge('RGB', [
+            Image.linear_gradient('L').resize((width, height)),
+            Image.effect_noise((width, height), 32),
+            Image.radial_gradient('L').resize((width, height)),
+        ]).save(output, format='JPEG', quality=90)
+        return output.getvalue()
+
+    def run_benchmark(self, name, view, photo, uploads):
+        """Time the requests handled by a view, i.e. how long a web worker is
+        occupied by each upload."""
+        factory = RequestFactory()
+        durations = []
+        for i in range(uploads):
+            request = factory.post('/ckeditor/upload/', {
+                'upload': SimpleUploadedFile('photo{0}.jpg'.format(i), photo,
+                                             content_type='image/jpeg')})
+            request.user = User(username='benchmark')
+            start = time.perf_counter()
+            view(request)
+            durations.append(time.perf_counter() - start)
+            request.close()
+        durations.sort()
+        self.stdout.write("{0}: mean {1:.1f} ms, median {2:.1f} ms, max {3:.1f} ms, "
+                          "total {4:.2f} s".format(
+                              name, 1000 * sum(durations) / len(durations),
+                              1000 * durations[len(durations) // 2],
+                              1000 * durations[-1], sum(durations)))
@@ -0,0 +1,92 @@
+import re
+from collections import Counter
+from datetime import timedelta
+
+from ckeditor.fields import RichTextField
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.utils import timezone
+
+from common.models import StoredBlob
+from common.storage import BLOB_DIRECTORY, ContentAddressedStorage, blob_storage
+
+
+# blob names, or the names of their thumbnails, inside rich text URLs
+BLOB_NAME_RE = re.compile(r'({0}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/[0-9a-f]{{64}})(?:_thumb)?(\.\w+)'
+                          .format(BLOB_DIRECTORY))
+
+
+class Command(BaseCommand):
+    help = "Recompute the reference counts of the content addressed files " \
+           "and delete the files no rich text or file field refers to."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=int, default=24,
+                            help="Keep unreferenced files stored more recently "
+                                 "than this, they may be about to be used.")
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run',
+                            help="Only report the files that would be deleted.")
+
+    def handle(self, *args, **options):
+        references = self.count_references()
+        updated = self.update_ref_counts(references)
+        self.stdout.write("Updated the reference count of {0} files".format(updated))
+
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        unreferenced = StoredBlob.objects.filter(ref_count=0, date_stored__lt=cutoff)
+        if options['dry_run']:
+            for name in unreferenced.values_list('name', flat=True).iterator():
+                self.stdout.write("Would delete {0}".format(name))
+            return
+        deleted = 0
+        for pk in list(unreferenced.values_list('pk', flat=True)):
+            with transaction.atomic():
+                blob = StoredBlob.objects.select_for_update().filter(
+                    pk=pk, ref_count=0, date_stored__lt=cutoff).first()
+                if blob is not None:
+                    blob_storage.delete_blob(blob.name)
+                    blob.delete()
+                    deleted += 1
+        self.stdout.write("Deleted {0} unreferenced files".format(deleted))
+
+    @staticmethod
+    def count_references():
+        """Count the references to the content addressed files, from the file
+        fields using the storage and from the URLs inside rich text fields.
+
+        :return: Counter mapping blob names to their number of references
+        """
+        references = Counter()
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, models.FileField) and isinstance(
+                        field.storage, ContentAddressedStorage):
+                    names = model._default_manager.exclude(
+                        **{field.name: ''}).exclude(**{field.name + '__isnull': True})
+                    references.update(names.values_list(field.name, flat=True).iterator())
+                elif isinstance(field, RichTextField):
+                    texts = model._default_manager.filter(
+                        **{field.name + '__contains': BLOB_DIRECTORY + '/'})
+                    for text in texts.values_list(field.name, flat=True).iterator():
+                        references.update({"".join(match) for match in
+                                           BLOB_NAME_RE.findall(text)})
+        return references
+
+    @staticmethod
+    def update_ref_counts(references):
+        """Store the reference counts that changed, with one update per
+        distinct count.
+
+        :param references: Counter mapping blob names to their number of
+                           references
+        :return: integer number of updated blobs
+        """
+        changes = {}
+        blobs = StoredBlob.objects.values_list('pk', 'name', 'ref_count')
+        for pk, name, ref_count in blobs.iterator():
+            if references[name] != ref_count:
+                changes.setdefault(references[name], []).append(pk)
+        for ref_count, pks in changes.items():
+            StoredBlob.objects.filter(pk__in=pks).update(ref_count=ref_count)
+        return sum(len(pks) for pks in changes.values())
@@ -0,0 +1,31 @@
+from common.jobs import purge_sessions
+from common.management.base import BatchCommand
+from common.sessions import delete_expired_sessions, get_expired_sessions
+
+
+class Command(BatchCommand):
+    help = "Delete the expired sessions, in batches."
+    batch_size_setting = 'SESSIONS_PURGE_BATCH_SIZE'
+    pause_setting = 'SESSIONS_PURGE_PAUSE'
+    items = "expired sessions"
+    action = "delete"
+    done = "deleted"
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--schedule', action='store_true', dest='schedule',
+                            help="Also queue a background job purging the "
+                                 "sessions every SESSIONS_PURGE_INTERVAL "
+                                 "seconds.")
+
+    def count(self):
+        return get_expired_sessions().count()
+
+    def run_batch(self, batch_size):
+        return delete_expired_sessions(batch_size)
+
+    def handle(self, *args, **options):
+        super(Command, self).handle(*args, **options)
+        if options['schedule'] and not options['dry_run']:
+            if purge_sessions.schedule() is not None:
+                self.stdout.write("Scheduled the periodic purge")
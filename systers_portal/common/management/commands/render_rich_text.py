@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from common.models import RichTextArtifacts
+from common.utils import render_stored_rich_text
+
+
+class Command(BaseCommand):
+    help = "Render the stored excerpt, sanitized HTML body and word count of " \
+           "all the objects with rich text content."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Number of objects updated per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in apps.get_models():
+            if not issubclass(model, RichTextArtifacts):
+                continue
+            count = render_stored_rich_text(model, model.rich_text_field, model.excerpt_words,
+                                            batch_size)
+            self.stdout.write("{0}: rendered {1} objects".format(
+                model._meta.label, count))
@@ -0,0 +1,81 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from common.jobs import get_metrics, work
+
+
+def run_worker(stop_event, batch_size, poll_interval):
+    """Entry point of a worker process"""
+    # the parent process handles the signals and sets stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    try:
+        work(stop_event.is_set, batch_size=batch_size, poll_interval=poll_interval)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run a pool of processes running the queued background jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOBS_WORKERS,
+                            help="Number of worker processes.")
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help="Number of jobs a worker claims at a time.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds a worker waits when the queue is empty.")
+        parser.add_argument('--metrics-interval', type=int, default=60,
+                            help="Seconds between two reports of the queue metrics.")
+        parser.add_argument('--once', action='store_true', dest='once',
+                            help="Run the due jobs in this process and exit.")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            succeeded, failed = work(lambda: False, batch_size=options['batch_size'],
+                                     once=True)
+            self.stdout.write("{0} jobs succeeded, {1} failed".format(succeeded, failed))
+            return
+
+        stop_event = multiprocessing.Event()
+
+        def stop(signum, frame):
+            stop_event.set()
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        # the children must not share the connections of the parent
+        connections.close_all()
+        worker_args = (stop_event, options['batch_size'], options['poll_interval'])
+        workers = [multiprocessing.Process(target=run_worker, args=worker_args)
+                   for _ in range(options['processes'])]
+        for worker in workers:
+            worker.start()
+        self.stdout.write("Started {0} workers".format(len(workers)))
+
+        next_report = time.monotonic() + options['metrics_interval']
+        while not stop_event.wait(1):
+            for i, worker in enumerate(workers):
+                if not worker.is_alive():
+                    self.stderr.write("Worker {0} exited, restarting it".format(worker.pid))
+                    workers[i] = multiprocessing.Process(target=run_worker, args=worker_args)
+                    workers[i].start()
+            if time.monotonic() >= next_report:
+                self.report_metrics(options['metrics_interval'])
+                next_report = time.monotonic() + options['metrics_interval']
+
+        self.stdout.write("Stopping, waiting for the running jobs to finish")
+        for worker in workers:
+            worker.join()
+
+    def report_metrics(self, window):
+        metrics = get_metrics(window)
+        self.stdout.write(
+            "queued={queued} running={running} failed={failed} lag={lag:.1f}s "
+            "throughput={throughput:.2f}/s mean_lag={mean_lag:.1f}s".format(**metrics))
+        connections.close_all()
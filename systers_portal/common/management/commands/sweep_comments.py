@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.comments import sweep_orphaned_comments
+from common.jobs import sweep_comments
+
+
+class Command(BaseCommand):
+    help = "Delete the comments to objects that do not exist anymore."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, dest='chunk_size',
+                            default=settings.COMMENTS_SWEEP_CHUNK_SIZE,
+                            help="Number of comments deleted per query.")
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run',
+                            help="Only count the orphaned comments.")
+        parser.add_argument('--schedule', action='store_true', dest='schedule',
+                            help="Also queue a background job sweeping the "
+                                 "comments every COMMENTS_SWEEP_INTERVAL "
+                                 "seconds.")
+
+    def handle(self, *args, **options):
+        swept = sweep_orphaned_comments(chunk_size=options['chunk_size'],
+                                        dry_run=options['dry_run'])
+        prefix = "[dry run] " if options['dry_run'] else ""
+        for content_type, count in sorted(swept.items(), key=lambda item: item[0].pk):
+            self.stdout.write("{0}{1} orphaned comments to {2}".format(
+                prefix, count, content_type))
+        self.stdout.write("{0}{1} orphaned comments {2}".format(
+            prefix, sum(swept.values()), "found" if options['dry_run'] else "deleted"))
+        if options['schedule'] and not options['dry_run']:
+            if sweep_comments.schedule() is not None:
+                self.stdout.write("Scheduled the periodic sweep")
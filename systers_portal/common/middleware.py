@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.utils.cache import cc_delim_re
+from django.utils.deprecation import MiddlewareMixin
+
+from common import routers
+from common.constants import REPLICA_PIN_COOKIE, REPLICA_PIN_SALT
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """Let the reads of the safe requests go to the database replicas, see common.routers.
+    The requests which write pin their user to the primary database with a signed cookie."""
+    def process_request(self, request):
+        pinned = request.get_signed_cookie(
+            REPLICA_PIN_COOKIE, default=None, salt=REPLICA_PIN_SALT,
+            max_age=settings.DATABASE_REPLICA_PIN_SECONDS) is not None
+        routers.allow_replica_reads(request.method in SAFE_METHODS and not pinned)
+
+    def process_response(self, request, response):
+        if routers.has_written() or request.method not in SAFE_METHODS:
+            response.set_signed_cookie(
+                REPLICA_PIN_COOKIE, '1', salt=REPLICA_PIN_SALT,
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True)
+        routers.allow_replica_reads(False)
+        return response
+
+
+class PublicCacheMiddleware(MiddlewareMixin):
+    """Let the shared caches keep the public pages, see common.mixins.PublicCacheMixin.
+    Listed first, so that it sees the cookies set by the other middlewares.
+
+    The cookies and `Vary: Cookie` are removed from the public responses. A page showing a CSRF
+    token or the messages of the visitor is personal, its response is made private instead.
+    """
+    def process_response(self, request, response):
+        if not response.has_header('Surrogate-Key'):
+            return response
+        personal_cookies = (settings.SESSION_COOKIE_NAME, CookieStorage.cookie_name)
+        if request.META.get('CSRF_COOKIE_USED') or set(personal_cookies) & set(request.COOKIES):
+            del response['Surrogate-Key']
+            response['Cache-Control'] = 'private, max-age=0'
+            return response
+        response.cookies.clear()
+        if response.has_header('Vary'):
+            vary = [header for header in cc_delim_re.split(response['Vary'])
+                    if header.lower() != 'cookie']
+            if vary:
+                response['Vary'] = ', '.join(vary)
+            else:
+                del response['Vary']
+        return response
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 07:38
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('common', '0002_auto_20150420_1504'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date last modified'),
+        ),
+        migrations.AlterIndexTogether(
+            name='comment',
+            index_together=set([('content_type', 'object_id')]),
+        ),
+    ]
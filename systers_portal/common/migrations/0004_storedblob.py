@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 07:59
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_auto_20261019_0738'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True, verbose_name='Digest')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Name')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Size')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Reference count')),
+                ('date_created', models.DateTimeField(auto_now_add=True, verbose_name='Date created')),
+                ('date_stored', models.DateTimeField(auto_now=True, verbose_name='Date last stored')),
+            ],
+        ),
+    ]
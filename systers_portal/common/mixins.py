@@ -1,5 +1,16 @@
+import csv
+import hashlib
+import json
+
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 
+from common.comments import get_comment_page
+from common.constants import EXPORT_CONTENT_TYPES, EXPORT_CSV, EXPORT_JSONL
 from users.models import SystersUser
 
 
@@ -35,3 +46,175 @@ class UserDetailsMixin(object):
                 .format(self.__class__.__name__)
             )
         return self.community
+
+
+class ConditionalGetMixin(object):
+    """Mixin allows to answer conditional GET requests (`If-None-Match` and
+    `If-Modified-Since`) with 304 Not Modified before the view fetches its
+    objects and renders the template.
+
+    Only anonymous requests are handled, since the page of a logged in user
+    also depends on the user permissions and membership, which the validators
+    don't cover. The view is expected to override `get_validators()`.
+    """
+    def get(self, request, *args, **kwargs):
+        get = super(ConditionalGetMixin, self).get
+        if request.user.is_authenticated:
+            return get(request, *args, **kwargs)
+        validators = self.get_validators()
+        if validators is None:
+            return get(request, *args, **kwargs)
+        etag, last_modified = validators
+        conditional = condition(etag_func=lambda *a, **kw: etag,
+                                last_modified_func=lambda *a, **kw: last_modified)
+        return conditional(get)(request, *args, **kwargs)
+
+    def get_validators(self):
+        """Get the validators of the requested page. Should be computed with a
+        single query and without fetching the full objects.
+
+        :return: tuple (etag, last_modified) where etag is a string and
+                 last_modified a datetime object, or None if the object doesn't
+                 exist
+        :raises ImproperlyConfigured: if the method is not overridden
+        """
+        raise ImproperlyConfigured(
+            '{0} is missing the validators of the page. Override '
+            '{0}.get_validators()'.format(self.__class__.__name__))
+
+    def make_etag(self, *values):
+        """Make an ETag out of the values the page depends on.
+
+        :param values: values that change when the page changes
+        :return: string ETag
+        """
+        fingerprint = ":".join(str(value) for value in values)
+        return hashlib.md5(fingerprint.encode('utf-8')).hexdigest()
+
+
+class PublicCacheMixin(object):
+    """Mixin allows shared caches, like a CDN, to keep the page served to
+    anonymous visitors. The response is marked public for `CDN_S_MAXAGE`
+    seconds and its `Surrogate-Key` header names the objects the page depends
+    on, so that their changes purge it, see `common.cdn`.
+    `common.middleware.PublicCacheMiddleware` removes the cookies of the
+    response, or makes it private again if the page is personal after all.
+
+    The view is expected to implement `get_surrogate_keys()`, returning the
+    list of the surrogate keys of the objects the page depends on, see
+    `common.cdn.get_surrogate_key()`. CommunityMenuMixin and
+    MeetupLocationMixin implement it.
+    """
+    def get(self, request, *args, **kwargs):
+        response = super(PublicCacheMixin, self).get(request, *args, **kwargs)
+        if not request.user.is_authenticated and response.status_code in (200, 304):
+            patch_cache_control(response, public=True, max_age=0,
+                                s_maxage=settings.CDN_S_MAXAGE)
+            response['Surrogate-Key'] = ' '.join(self.get_surrogate_keys())
+        return response
+
+
+class CommentThreadMixin(object):
+    """Mixin adding a page of the approved comments to an object to the
+    context. The page starts after the comment whose id is given in the
+    `after` query string parameter, see `common.comments.get_comment_page`.
+    """
+
+    def get_comment_thread_context(self, obj):
+        """Get the context of the requested page of comments
+
+        :param obj: commented object
+        :return: dict with the `comments` of the page and the cursor of the
+                 next page as `comments_next`
+        """
+        after = self.request.GET.get('after', '')
+        comments, next_cursor = get_comment_page(
+            obj, after=int(after) if after.isdigit() else None)
+        return {'comments': comments, 'comments_next': next_cursor}
+
+
+class EchoBuffer(object):
+    """File-like object returning what is written to it, to get the lines of
+    a CSV writer without buffering them."""
+    def write(self, value):
+        return value
+
+
+class StreamingExportMixin(object):
+    """Mixin turning a list view into an export of its rows, streamed as CSV or
+    JSON Lines depending on the `format` URL keyword argument.
+
+    The rows are read with `values_list()` and `iterator()`, so that they are
+    fetched in chunks through a server-side cursor and never all held in
+    memory, and the header is sent before the query runs. Since the view
+    `get()` is replaced, the permissions of the list view still apply.
+    """
+    export_fields = ()
+    export_name = None
+    # CSV cells starting with these are evaluated as formulas by spreadsheets
+    formula_prefixes = ('=', '+', '-', '@', '\t', '\r')
+
+    def get(self, request, *args, **kwargs):
+        export_format = self.kwargs.get('format', EXPORT_CSV)
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise Http404("Unknown export format.")
+        # the query only runs once the response starts iterating the rows
+        rows = self.get_export_rows()
+        if export_format == EXPORT_JSONL:
+            content = self.stream_jsonl(rows)
+        else:
+            content = self.stream_csv(rows)
+        response = StreamingHttpResponse(content,
+                                         content_type=EXPORT_CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = 'attachment; filename="{0}.{1}"'.format(
+            self.get_export_name(), export_format)
+        return response
+
+    def get_export_name(self):
+        """Get the name of the exported file, without its extension
+
+        :return: string file name
+        :raises ImproperlyConfigured: if `export_name` is not set
+        """
+        if self.export_name is None:
+            raise ImproperlyConfigured(
+                '{0} is missing an export name. Define {0}.export_name or '
+                'override {0}.get_export_name()'.format(self.__class__.__name__))
+        return self.export_name
+
+    def get_export_queryset(self):
+        """Get the exported objects, by default the list view queryset
+
+        :return: QuerySet
+        """
+        return self.get_queryset()
+
+    def get_export_rows(self):
+        """Iterate over the exported rows
+
+        :return: iterator of tuples of field values
+        """
+        lookups = [lookup for _, lookup in self.export_fields]
+        return self.get_export_queryset().values_list(*lookups).iterator()
+
+    def stream_csv(self, rows):
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow([name for name, _ in self.export_fields])
+        for row in rows:
+            yield writer.writerow([self.escape_csv_value(value) for value in row])
+
+    def stream_jsonl(self, rows):
+        names = [name for name, _ in self.export_fields]
+        for row in rows:
+            yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+    def escape_csv_value(self, value):
+        """Prevent a user provided value from being run as a spreadsheet
+        formula.
+
+        :param value: field value
+        :return: the value, prefixed with a quote if it looks like a formula
+        """
+        if isinstance(value, str) and value.startswith(self.formula_prefixes):
+            return "'" + value
+        return value
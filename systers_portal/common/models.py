@@ -1,12 +1,60 @@
 from django.db import models
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.utils import timezone
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from ckeditor.fields import RichTextField
 
+from common.constants import JOB_QUEUED, JOB_STATUS_CHOICES
+from common.utils import render_rich_text
 from users.models import SystersUser
 
 
-class Post(models.Model):
+class RichTextArtifacts(models.Model):
+    """Abstract base class for models with a rich text field. On every save
+    the plain text excerpt, the sanitized HTML body and the word count of
+    the rich text are derived and stored, so that pages don't have to
+    process the raw HTML when they are rendered.
+
+    Subclasses set `rich_text_field` to the name of the rich text field and
+    optionally `excerpt_words` to the length of the excerpt.
+    """
+    excerpt = models.TextField(blank=True, editable=False,
+                               verbose_name="Excerpt")
+    body_html = models.TextField(blank=True, editable=False,
+                                 verbose_name="Rendered body")
+    word_count = models.PositiveIntegerField(default=0, editable=False,
+                                             verbose_name="Word count")
+
+    rich_text_field = None
+    excerpt_words = 50
+    artifact_fields = ('excerpt', 'body_html', 'word_count')
+
+    class Meta:
+        abstract = True
+
+    def get_rich_text_artifacts(self):
+        """Render the artifacts of the current rich text field value
+
+        :return: dict mapping artifact field names to their values
+        """
+        excerpt, body_html, word_count = render_rich_text(
+            getattr(self, self.rich_text_field), self.excerpt_words)
+        return {'excerpt': excerpt, 'body_html': body_html,
+                'word_count': word_count}
+
+    def save(self, *args, **kwargs):
+        """Override save to derive the rich text artifacts"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if self.rich_text_field not in update_fields:
+                return super(RichTextArtifacts, self).save(*args, **kwargs)
+            kwargs['update_fields'] = set(update_fields) | set(self.artifact_fields)
+        for field, value in self.get_rich_text_artifacts().items():
+            setattr(self, field, value)
+        return super(RichTextArtifacts, self).save(*args, **kwargs)
+
+
+class Post(RichTextArtifacts):
     """Abstract base class for postings like news and resources.
     This class can't be used in isolation.
     """
@@ -14,11 +62,13 @@ class Post(models.Model):
     title = models.CharField(max_length=255, verbose_name="Title")
     date_created = models.DateField(auto_now=False, auto_now_add=True,
                                     verbose_name="Date published")
-    date_modified = models.DateField(auto_now=True, auto_now_add=False,
-                                     verbose_name="Date last modified")
+    date_modified = models.DateTimeField(auto_now=True, auto_now_add=False,
+                                         verbose_name="Date last modified")
     author = models.ForeignKey(SystersUser, verbose_name="Author")
     content = RichTextField(verbose_name="Content")
 
+    rich_text_field = 'content'
+
     class Meta:
         abstract = True
 
@@ -28,6 +78,8 @@ class Comment(models.Model):
     Intended to be used for News and Resource models."""
     date_created = models.DateField(auto_now=False, auto_now_add=True,
                                     verbose_name="Date created")
+    date_modified = models.DateTimeField(auto_now=True, auto_now_add=False,
+                                         verbose_name="Date last modified")
     author = models.ForeignKey(SystersUser, verbose_name="Author")
     is_approved = models.BooleanField(default=True, verbose_name='Is approved')
     body = models.TextField(verbose_name="Body")
@@ -35,5 +87,77 @@ class Comment(models.Model):
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey()
 
+    class Meta:
+        index_together = (('content_type', 'object_id'),)
+
     def __str__(self):
         return "Comment by {0} to {1}".format(self.author, self.content_object)
+
+
+class Commentable(models.Model):
+    """Abstract base class for models with comments. The comments are
+    deleted along with the object, and `comment_count` keeps the number of
+    approved comments, see `common.comments.update_comment_count`, so that
+    lists can show it without querying the comments.
+
+    The fields of `counter_fields` are only changed by queries, never
+    written back by `save()` from a possibly stale instance.
+    """
+    comments = GenericRelation(Comment)
+    comment_count = models.PositiveIntegerField(default=0, editable=False,
+                                                verbose_name="Number of comments")
+
+    counter_fields = ('comment_count',)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """Override save to leave out the counter fields of an update"""
+        if not self._state.adding and not kwargs.get('force_insert') and \
+                kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields]
+        return super(Commentable, self).save(*args, **kwargs)
+
+
+class StoredBlob(models.Model):
+    """Index of the files kept by the content addressed storage. Every file
+    is stored once under the digest of its content, `ref_count` counts the
+    objects referring to it and is recomputed by the `collect_blobs`
+    command, which deletes the files that are not referred to anymore."""
+    digest = models.CharField(max_length=64, unique=True, verbose_name="Digest")
+    name = models.CharField(max_length=255, unique=True, verbose_name="Name")
+    size = models.PositiveIntegerField(default=0, verbose_name="Size")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Reference count")
+    date_created = models.DateTimeField(auto_now_add=True, verbose_name="Date created")
+    date_stored = models.DateTimeField(auto_now=True, verbose_name="Date last stored")
+
+    def __str__(self):
+        return self.name
+
+
+class Job(models.Model):
+    """Background job stored in the database, see `common.jobs`. A queued job
+    with a `dedup_key` prevents queueing another job with the same key until
+    a worker picks it up."""
+    name = models.CharField(max_length=255, verbose_name="Name")
+    payload = models.TextField(default='{}', verbose_name="Payload")
+    status = models.CharField(max_length=10, choices=JOB_STATUS_CHOICES, default=JOB_QUEUED,
+                              verbose_name="Status")
+    dedup_key = models.CharField(max_length=255, unique=True, null=True, blank=True,
+                                 verbose_name="Deduplication key")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Attempts")
+    max_attempts = models.PositiveSmallIntegerField(default=5, verbose_name="Maximum attempts")
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Run at")
+    date_created = models.DateTimeField(auto_now_add=True, verbose_name="Date created")
+    date_started = models.DateTimeField(null=True, blank=True, verbose_name="Date started")
+    date_finished = models.DateTimeField(null=True, blank=True, verbose_name="Date finished")
+    last_error = models.TextField(blank=True, verbose_name="Last error")
+
+    class Meta:
+        index_together = (('status', 'run_at'),)
+
+    def __str__(self):
+        return "{0} job {1}".format(self.name, self.pk)
@@ -0,0 +1,29 @@
+"""Request scoped resolution of the objects addressed by a URL.
+
+A view often needs the object of a URL keyword argument, like the meetup
+location of `slug`, in its permission check, its queryset, its form and its
+context. `resolve_object` fetches such an object at most once per request
+and keeps it on the request, so that the mixins and the methods of a view
+share it instead of querying it again.
+"""
+from django.db.models import Model
+from django.shortcuts import get_object_or_404
+
+
+def resolve_object(request, klass, **lookups):
+    """Get the object matching the lookups, fetched at most once per request.
+    The objects are kept per model and lookups, hence the queryset of the
+    first call for an object, e.g. its `select_related()`, is the one used.
+
+    :param request: HttpRequest object
+    :param klass: Model class, Manager or QuerySet of the object
+    :param lookups: lookups identifying the object, like `slug='foo'`
+    :return: model instance
+    :raises Http404: if no object matches the lookups
+    """
+    resolved = request.__dict__.setdefault('_resolved_objects', {})
+    model = klass if isinstance(klass, type) and issubclass(klass, Model) else klass.model
+    key = (model._meta.label_lower, frozenset(lookups.items()))
+    if key not in resolved:
+        resolved[key] = get_object_or_404(klass, **lookups)
+    return resolved[key]
@@ -0,0 +1,113 @@
+"""Routing of the reads to the database replicas.
+
+The reads of the safe requests, see `common.middleware.ReplicaRoutingMiddleware`,
+go to the healthy replicas of `DATABASE_REPLICAS`, everything else goes to
+the primary `default` database: the writes, the reads in a transaction, the
+reads following a write of the request and the reads outside of requests,
+like the ones of the background jobs.
+
+A user who wrote is pinned to the primary for `DATABASE_REPLICA_PIN_SECONDS`
+by a signed cookie, so that the replicas have caught up with the writes
+when the user reads from them again.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_state = threading.local()
+# replica alias: (healthy, monotonic time of the check)
+_health = {}
+_health_lock = threading.Lock()
+
+REPLICA_LAG_SQL = "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+
+
+def allow_replica_reads(allowed):
+    """Allow or forbid the reads of the current thread to go to the replicas, and forget its
+    writes
+
+    :param allowed: boolean
+    """
+    _state.replica_reads = allowed
+    _state.written = False
+
+
+def has_written():
+    """Check if the current thread wrote to the database since `allow_replica_reads()`
+
+    :return: boolean
+    """
+    return getattr(_state, 'written', False)
+
+
+def check_replica(alias):
+    """Check a replica accepts connections and does not lag more than
+    DATABASE_REPLICA_MAX_LAG seconds behind the primary.
+
+    :param alias: string alias of the replica database
+    :return: boolean, False as well if the replica settings are incomplete
+    """
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor != 'postgresql':
+                return True
+            cursor.execute(REPLICA_LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except (DatabaseError, ImproperlyConfigured):
+        connection.close()
+        return False
+    # no replay timestamp on a database which is not a replica. The timestamp also ages while
+    # the primary is idle, the reads then go to the primary, which is safe
+    return lag is None or lag <= settings.DATABASE_REPLICA_MAX_LAG
+
+
+def is_replica_healthy(alias):
+    """Check the health of a replica, at most once per DATABASE_REPLICA_CHECK_INTERVAL seconds
+    in each process
+
+    :param alias: string alias of the replica database
+    :return: boolean
+    """
+    now = time.monotonic()
+    with _health_lock:
+        healthy, checked = _health.get(alias, (None, None))
+        if checked is not None and now - checked < settings.DATABASE_REPLICA_CHECK_INTERVAL:
+            return healthy
+        # the other threads use the previous result until the check is done
+        _health[alias] = (bool(healthy), now)
+    healthy = check_replica(alias)
+    with _health_lock:
+        _health[alias] = (healthy, time.monotonic())
+    return healthy
+
+
+class ReplicaRouter(object):
+    """Send the allowed reads to a healthy replica and the rest to the primary"""
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'replica_reads', False) or has_written():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = [alias for alias in settings.DATABASE_REPLICAS if is_replica_healthy(alias)]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas have the data of the primary
+        databases = {DEFAULT_DB_ALIAS}.union(settings.DATABASE_REPLICAS)
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
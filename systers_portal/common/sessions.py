@@ -0,0 +1,38 @@
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from common.utils import run_in_batches
+
+
+def get_expired_sessions():
+    """Get the expired sessions
+
+    :return: queryset of Session objects
+    """
+    return Session.objects.filter(expire_date__lt=timezone.now())
+
+
+def delete_expired_sessions(batch_size):
+    """Delete a batch of expired sessions
+
+    :param batch_size: integer maximum number of sessions to delete
+    :return: integer number of deleted sessions
+    """
+    keys = list(get_expired_sessions().values_list('pk', flat=True)[:batch_size])
+    if keys:
+        Session.objects.filter(pk__in=keys).delete()
+    return len(keys)
+
+
+def purge_expired_sessions(batch_size=1000, pause=0, dry_run=False):
+    """Delete the expired sessions, at most `batch_size` sessions per query, so that the table is
+    not locked by a single large delete like the one of `manage.py clearsessions`
+
+    :param batch_size: integer maximum number of sessions deleted at a time
+    :param pause: float seconds to wait between two batches
+    :param dry_run: if True, only count the expired sessions
+    :return: integer number of expired sessions
+    """
+    if dry_run:
+        return get_expired_sessions().count()
+    return run_in_batches(delete_expired_sessions, batch_size, pause)
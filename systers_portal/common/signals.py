@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.models import News, Resource
+from common.cdn import get_dependent_surrogate_keys, purge_surrogate_keys
+from common.comments import update_comment_count
+from common.jobs import enqueue
+from common.models import Comment
+from community.models import CommunityPage
+from meetup.models import Meetup
+from users.feed import get_feed_item_type
+from users.jobs import fan_out_feed_item
+
+
+@receiver(post_save, sender=Comment, dispatch_uid="count_saved_comment")
+def count_saved_comment(sender, instance, **kwargs):
+    """Update the number of comments of the commented object"""
+    update_comment_count(instance.content_type_id, instance.object_id)
+
+
+@receiver(post_delete, sender=Comment, dispatch_uid="count_deleted_comment")
+def count_deleted_comment(sender, instance, **kwargs):
+    """Update the number of comments of the commented object"""
+    update_comment_count(instance.content_type_id, instance.object_id)
+
+
+@receiver(post_save, sender=News, dispatch_uid="fan_out_news")
+@receiver(post_save, sender=Resource, dispatch_uid="fan_out_resource")
+@receiver(post_save, sender=Meetup, dispatch_uid="fan_out_meetup")
+@receiver(post_save, sender=CommunityPage, dispatch_uid="fan_out_community_page")
+def fan_out_to_feeds(sender, instance, created, raw=False, **kwargs):
+    """Queue the writing of a new item to the activity feeds of its recipients"""
+    if created and not raw:
+        enqueue(fan_out_feed_item, get_feed_item_type(sender), instance.pk,
+                timezone.now().isoformat())
+
+
+@receiver(post_save, dispatch_uid="purge_cdn_saved")
+@receiver(post_delete, dispatch_uid="purge_cdn_deleted")
+def purge_cdn(sender, instance, **kwargs):
+    """Purge the public pages showing the object from the CDN"""
+    if settings.CDN_PURGER:
+        purge_surrogate_keys(get_dependent_surrogate_keys(instance))
@@ -0,0 +1,106 @@
+"""WSGI handler serving the collected static files.
+
+The files under STATIC_URL are answered from STATIC_ROOT before reaching
+Django, the other requests are passed to the wrapped application. The hashed
+files of the manifest never change, they are served with a one year immutable
+cache lifetime, the others with STATIC_MAX_AGE. The `.br` and `.gz` versions
+written by `collectstatic`, see common.storage, are served to the clients
+accepting them.
+"""
+import json
+import mimetypes
+import os
+import posixpath
+from email.utils import formatdate
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# precompressed versions, by order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_accept_encoding(header):
+    """Get the content codings accepted by a client
+
+    :param header: string value of the Accept-Encoding header
+    :return: set of string codings
+    """
+    codings = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        try:
+            if params.startswith('q=') and float(params[2:]) == 0:
+                continue
+        except ValueError:
+            continue
+        codings.add(coding.strip().lower())
+    return codings
+
+
+class StaticFilesApp(object):
+    """WSGI application serving the files of STATIC_ROOT and passing the other requests to
+    `application`"""
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = os.path.abspath(root or settings.STATIC_ROOT)
+        self.prefix = prefix or settings.STATIC_URL
+        self.hashed_names = self.load_hashed_names()
+
+    def load_hashed_names(self):
+        """Get the hashed names listed in the manifest of `collectstatic`
+
+        :return: set of string names
+        """
+        path = os.path.join(self.root, ManifestStaticFilesStorage.manifest_name)
+        try:
+            with open(path) as manifest:
+                return set(json.load(manifest).get('paths', {}).values())
+        except (IOError, ValueError):
+            return set()
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD') or not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        name = posixpath.normpath(path[len(self.prefix):]).lstrip('/')
+        full_path = os.path.join(self.root, *name.split('/'))
+        if name.startswith('..') or not os.path.isfile(full_path):
+            return self.application(environ, start_response)
+        return self.serve(environ, start_response, name, full_path)
+
+    def serve(self, environ, start_response, name, full_path):
+        content_type, _ = mimetypes.guess_type(full_path)
+        headers = [('Content-Type', content_type or 'application/octet-stream'),
+                   ('Vary', 'Accept-Encoding')]
+        accepted = parse_accept_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        for coding, suffix in ENCODINGS:
+            if coding in accepted and os.path.isfile(full_path + suffix):
+                full_path += suffix
+                headers.append(('Content-Encoding', coding))
+                break
+        if name in self.hashed_names:
+            headers.append(('Cache-Control', IMMUTABLE_CACHE_CONTROL))
+        else:
+            headers.append(('Cache-Control', 'public, max-age={0}'.format(
+                settings.STATIC_MAX_AGE)))
+        stat = os.stat(full_path)
+        headers.append(('Content-Length', str(stat.st_size)))
+        headers.append(('Last-Modified', formatdate(stat.st_mtime, usegmt=True)))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        static_file = open(full_path, 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(static_file, BLOCK_SIZE)
+        return self.iter_file(static_file)
+
+    @staticmethod
+    def iter_file(static_file):
+        with static_file:
+            for block in iter(lambda: static_file.read(BLOCK_SIZE), b''):
+                yield block
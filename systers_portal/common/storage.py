@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.deconstruct import deconstructible
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+BLOB_DIRECTORY = 'blobs'
+
+# extensions of the static files worth compressing, the images and the woff
+# fonts are compressed already
+COMPRESSED_EXTENSIONS = ('.css', '.js', '.svg', '.eot', '.ttf', '.otf', '.ico',
+                         '.json', '.txt', '.html', '.xml', '.map')
+
+
+def get_content_digest(content):
+    """Compute the SHA-256 digest of a file content, reading it by chunks
+
+    :param content: File object
+    :return: string hexadecimal digest
+    """
+    sha256 = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    content.seek(0)
+    return sha256.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage keeping each distinct content once, under the
+    SHA-256 digest of the content. Saving a file that is already stored
+    only increments the reference count of its `StoredBlob` entry. Since a
+    stored name always holds the same content, the files can be cached
+    forever.
+
+    Deleting a file only decrements its reference count, the files are
+    removed by the `collect_blobs` command once nothing refers to them.
+    """
+    def get_blob_name(self, digest, extension):
+        """Get the storage name of a content
+
+        :param digest: string hexadecimal SHA-256 digest of the content
+        :param extension: string file extension, with its leading dot
+        :return: string storage name
+        """
+        return '/'.join([BLOB_DIRECTORY, digest[:2], digest[2:4],
+                         digest + extension.lower()])
+
+    def get_available_name(self, name, max_length=None):
+        # the final name depends on the content, see _save()
+        return name
+
+    def _save(self, name, content):
+        digest, temporary_path = self._write_temporary(content)
+        blob_name = self.get_blob_name(digest, os.path.splitext(name)[1])
+        try:
+            blob, created = self.index_blob(digest, blob_name, content.size)
+            if not self.exists(blob.name):
+                full_path = self.path(blob.name)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(temporary_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return blob.name
+
+    def _write_temporary(self, content):
+        """Write a content to a temporary file next to the blobs, computing
+        its digest on the way.
+
+        :param content: File object
+        :return: tuple (string hexadecimal digest, string temporary path)
+        """
+        directory = self.path(BLOB_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = os.path.join(directory, '.{0}.part'.format(get_random_string(12)))
+        sha256 = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with open(temporary_path, 'wb') as temporary_file:
+            for chunk in content.chunks():
+                sha256.update(chunk)
+                temporary_file.write(chunk)
+        return sha256.hexdigest(), temporary_path
+
+    def index_blob(self, digest, blob_name, size):
+        """Add a reference to a blob in the index, creating its entry if the
+        content was not stored yet.
+
+        :param digest: string hexadecimal SHA-256 digest of the content
+        :param blob_name: string storage name of the content
+        :param size: integer size in bytes of the content
+        :return: tuple (StoredBlob object, True if the entry was created)
+        """
+        from common.models import StoredBlob
+        with transaction.atomic():
+            blob, created = StoredBlob.objects.get_or_create(
+                digest=digest, defaults={'name': blob_name, 'size': size or 0})
+            StoredBlob.objects.filter(pk=blob.pk).update(
+                ref_count=F('ref_count') + 1, date_stored=timezone.now())
+        return blob, created
+
+    def delete(self, name):
+        from common.models import StoredBlob
+        StoredBlob.objects.filter(name=name, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1)
+
+    def delete_blob(self, name):
+        """Remove the file of a blob, along with the CKEditor thumbnail
+        generated for it.
+
+        :param name: string storage name of the blob
+        """
+        root, extension = os.path.splitext(name)
+        for file_name in (name, '{0}_thumb{1}'.format(root, extension)):
+            super(ContentAddressedStorage, self).delete(file_name)
+
+
+blob_storage = ContentAddressedStorage()
+
+
+def write_compressed_siblings(path):
+    """Write the gzip and, if the `brotli` package is installed, the brotli
+    compressed versions of a file next to it, as `.gz` and `.br` files. A
+    version which is not smaller than the file is not written.
+
+    :param path: string path of the file
+    :return: list of string paths of the written files
+    """
+    with open(path, 'rb') as original:
+        content = original.read()
+    compressors = [('.gz', lambda data: gzip.compress(data, 9))]
+    if brotli is not None:
+        compressors.append(('.br', brotli.compress))
+    written = []
+    for suffix, compress in compressors:
+        compressed = compress(content)
+        if len(compressed) < len(content):
+            with open(path + suffix, 'wb') as compressed_file:
+                compressed_file.write(compressed)
+            written.append(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Static files storage saving the files under names containing a hash
+    of their content, see ManifestStaticFilesStorage, along with compressed
+    versions of the hashed files, served by `common.static.StaticFilesApp`.
+    """
+    def post_process(self, paths, dry_run=False, **options):
+        for processed in super(CompressedManifestStaticFilesStorage,
+                               self).post_process(paths, dry_run, **options):
+            yield processed
+        if dry_run:
+            return
+        # the final names, without the ones of the intermediate passes
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            if os.path.splitext(hashed_name)[1].lower() in COMPRESSED_EXTENSIONS:
+                write_compressed_siblings(self.path(hashed_name))
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from cities_light.models import City, Country
+
+from common.models import Comment
+from community.models import Community
+from meetup.models import Meetup, MeetupLocation, Rsvp, SupportRequest
+from membership.models import JoinRequest
+from users.models import SystersUser
+
+
+class AdminChangelistTestCase(TestCase):
+    def setUp(self):
+        User.objects.create_superuser(username='admin', email='admin@test.com',
+                                      password='foobar')
+        self.client.login(username='admin', password='foobar')
+        self.systers_user = SystersUser.objects.get(user__username='admin')
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  admin=self.systers_user)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location,
+            description="It's a test meetup location", sponsors="BarBaz")
+        self.meetup = Meetup.objects.create(
+            title='Foo', slug='foo', date=timezone.now().date(), time=timezone.now().time(),
+            description='Test', meetup_location=meetup_location)
+        self.count = 0
+
+    def add_rows(self, count):
+        """Add rows to every changelist, by distinct users"""
+        for i in range(self.count, self.count + count):
+            user = SystersUser.objects.get(user=User.objects.create(
+                username='user{0}'.format(i)))
+            support_request = SupportRequest.objects.create(volunteer=user,
+                                                            meetup=self.meetup)
+            Rsvp.objects.create(user=user, meetup=self.meetup)
+            JoinRequest.objects.create(user=user, community=self.community,
+                                       approved_by=self.systers_user)
+            for model, object_id in ((Meetup, self.meetup.pk),
+                                     (SupportRequest, support_request.pk)):
+                Comment.objects.create(
+                    author=user, body="Hi", object_id=object_id,
+                    content_type=ContentType.objects.get_for_model(model))
+        self.count += count
+
+    def test_changelists_constant_queries(self):
+        """Test the number of queries of the changelists does not depend on
+        the number of rows"""
+        for name in ('common_comment', 'meetup_rsvp', 'meetup_supportrequest',
+                     'membership_joinrequest', 'users_systersuser', 'blog_news'):
+            url = reverse('admin:{0}_changelist'.format(name))
+            self.add_rows(1)
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.add_rows(5)
+            with self.assertNumQueries(len(queries)):
+                self.client.get(url)
+
+    def test_indexed_search(self):
+        """Test the search looks up the search fields by prefix and the ids"""
+        self.add_rows(12)
+        url = reverse('admin:membership_joinrequest_changelist')
+        response = self.client.get(url, {'q': 'user1'})
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+        response = self.client.get(url, {'q': 'ser1'})
+        self.assertEqual(len(response.context['cl'].result_list), 0)
+        join_request = JoinRequest.objects.last()
+        response = self.client.get(url, {'q': str(join_request.pk)})
+        self.assertEqual(list(response.context['cl'].result_list), [join_request])
@@ -0,0 +1,95 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from common.cache import (TwoTierCache, bump_namespace, get_object_namespace,
+                          make_namespaced_key)
+from community.models import Community, CommunityPage
+from users.models import SystersUser
+
+
+class TwoTierCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.settings_override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'test-shared': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.location,
+            },
+        })
+        self.settings_override.enable()
+        self.cache = TwoTierCache('test-shared', {
+            'OPTIONS': {'MAX_ENTRIES': 2, 'LOCAL_TIMEOUT': 60}})
+        self.cache.clear()
+        self.cache.reset_stats()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.location)
+
+    def test_local_and_shared_hits(self):
+        """Test the entries are read from the LRU, then from the shared cache"""
+        self.assertIsNone(self.cache.get('foo'))
+        self.cache.set('foo', [1])
+        self.cache.get('foo').append(2)
+        self.assertEqual(self.cache.get('foo'), [1])
+        self.cache.set('bar', 2)
+        self.cache.set('baz', 3)
+        self.assertEqual(self.cache.get('foo'), [1])
+        self.assertEqual(self.cache.get_stats(), {
+            'local_hits': 2, 'shared_hits': 1, 'misses': 1, 'evictions': 2, 'entries': 2,
+            'hit_ratio': 0.75})
+
+    def test_writes_of_other_workers(self):
+        """Test the writes to the shared cache are seen once the local entries expire"""
+        self.cache.set('foo', 1)
+        caches['test-shared'].set('foo', 2)
+        self.assertEqual(self.cache.get('foo'), 1)
+        self.cache._local_timeout = 0
+        self.cache.set('bar', 1)
+        caches['test-shared'].set('bar', 2)
+        self.assertEqual(self.cache.get('bar'), 2)
+
+    def test_incr_delete(self):
+        """Test incrementing and deleting an entry updates both tiers"""
+        self.cache.set('foo', 1)
+        self.assertEqual(self.cache.incr('foo'), 2)
+        self.assertEqual(self.cache.get('foo'), 2)
+        self.assertEqual(caches['test-shared'].get('foo'), 2)
+        self.cache.delete('foo')
+        self.assertIsNone(self.cache.get('foo'))
+        self.assertRaises(ValueError, self.cache.incr, 'foo')
+
+
+class CacheNamespaceTestCase(TestCase):
+    def setUp(self):
+        self.systers_user = SystersUser.objects.get(
+            user=User.objects.create(username='foo'))
+        self.community = Community.objects.create(
+            name="Foo", slug="foo", order=1, admin=self.systers_user)
+
+    def test_bump_namespace(self):
+        """Test bumping a namespace changes its keys"""
+        key = make_namespaced_key('foo', 'bar')
+        self.assertEqual(make_namespaced_key('foo', 'bar'), key)
+        self.assertNotEqual(make_namespaced_key('foo', 'baz'), key)
+        bump_namespace('foo')
+        self.assertNotEqual(make_namespaced_key('foo', 'bar'), key)
+
+    def test_community_changes(self):
+        """Test the changes of a community and its pages bump its namespace"""
+        namespace = get_object_namespace(Community, self.community.pk)
+        key = make_namespaced_key(namespace, 'pages')
+        page = CommunityPage.objects.create(slug="page", title="Page", order=1,
+                                            author=self.systers_user,
+                                            community=self.community)
+        self.assertNotEqual(make_namespaced_key(namespace, 'pages'), key)
+        key = make_namespaced_key(namespace, 'pages')
+        page.delete()
+        self.assertNotEqual(make_namespaced_key(namespace, 'pages'), key)
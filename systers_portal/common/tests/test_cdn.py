@@ -0,0 +1,148 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.urlresolvers import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from common.models import Comment
+from meetup.models import Meetup, MeetupLocation
+from meetup.utils import approve_join_requests
+from users.models import SystersUser
+
+
+class StandInCache(HTTPServer):
+    """HTTP cache stand-in keeping the pages of the surrogate keys it is given
+    and forgetting them on purge"""
+    def __init__(self):
+        super(StandInCache, self).__init__(('127.0.0.1', 0), StandInCacheHandler)
+        self.pages = {}
+        self.purges = []
+
+    def store(self, response):
+        for key in response['Surrogate-Key'].split():
+            self.pages.setdefault(key, []).append(response.content)
+
+
+class StandInCacheHandler(BaseHTTPRequestHandler):
+    def do_PURGE(self):
+        keys = self.headers['Surrogate-Key'].split()
+        self.server.purges.append(keys)
+        for key in keys:
+            self.server.pages.pop(key, None)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class PublicCacheTestCase(TestCase):
+    def setUp(self):
+        self.systers_user = SystersUser.objects.get(
+            user=User.objects.create_user(username='foo', password='foobar'))
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location)
+        self.meetup = Meetup.objects.create(
+            title='Foo', slug='foo', date=timezone.now().date(), time=timezone.now().time(),
+            meetup_location=self.meetup_location)
+        self.url = reverse('view_meetup', kwargs={'slug': 'foo', 'meetup_slug': 'foo'})
+
+    def test_public_response(self):
+        """Test the anonymous pages are public, without cookies and with surrogate keys"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage=600', response['Cache-Control'])
+        self.assertEqual(response['Surrogate-Key'], 'meetuplocation-{0} meetup-{1}'.format(
+            self.meetup_location.pk, self.meetup.pk))
+        self.assertFalse(response.cookies)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Surrogate-Key', response)
+
+    def test_personal_response(self):
+        """Test the pages of the logged in users and of the visitors with messages are
+        private"""
+        self.client.cookies[CookieStorage.cookie_name] = 'foo'
+        response = self.client.get(self.url)
+        self.assertNotIn('Surrogate-Key', response)
+        self.assertIn('private', response['Cache-Control'])
+
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(self.url)
+        self.assertNotIn('Surrogate-Key', response)
+        self.assertNotIn('public', response.get('Cache-Control', ''))
+
+
+class PurgeTestCase(TestCase):
+    def setUp(self):
+        self.cache = StandInCache()
+        thread = threading.Thread(target=self.cache.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.settings_override = override_settings(
+            CDN_PURGER='common.cdn.HttpPurger',
+            CDN_PURGE_URL='http://127.0.0.1:{0}/'.format(self.cache.server_port))
+        self.settings_override.enable()
+
+        self.systers_user = SystersUser.objects.get(
+            user=User.objects.create(username='foo'))
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location)
+        self.meetup = Meetup.objects.create(
+            title='Foo', slug='foo', date=timezone.now().date(), time=timezone.now().time(),
+            meetup_location=self.meetup_location)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.cache.shutdown()
+        self.cache.server_close()
+
+    def test_purge_on_changes(self):
+        """Test the changes of the objects purge the pages showing them"""
+        url = reverse('view_meetup', kwargs={'slug': 'foo', 'meetup_slug': 'foo'})
+        self.cache.store(self.client.get(url))
+        meetup_key = 'meetup-{0}'.format(self.meetup.pk)
+        location_key = 'meetuplocation-{0}'.format(self.meetup_location.pk)
+        self.assertCountEqual(self.cache.pages, [meetup_key, location_key])
+
+        del self.cache.purges[:]
+        Comment.objects.create(author=self.systers_user, body="Bar",
+                               content_object=self.meetup)
+        self.assertIn([meetup_key, location_key], self.cache.purges)
+        self.assertFalse(self.cache.pages)
+
+        self.meetup_location.name = "Bar Systers"
+        self.meetup_location.save()
+        self.assertEqual(self.cache.purges[-1], [location_key])
+        self.assertFalse(self.cache.pages)
+
+    def test_purge_on_members_changes(self):
+        """Test adding and removing members and organizers purge the pages of the location"""
+        location_key = ['meetuplocation-{0}'.format(self.meetup_location.pk)]
+        other = SystersUser.objects.get(user=User.objects.create(username='bar'))
+        del self.cache.purges[:]
+        self.meetup_location.members.add(self.systers_user)
+        self.assertEqual(self.cache.purges, [location_key])
+        self.meetup_location.organizers.add(other)
+        self.meetup_location.members.remove(self.systers_user)
+        self.assertEqual(self.cache.purges, [location_key] * 3)
+        other.Organizers.clear()
+        self.assertEqual(self.cache.purges, [location_key] * 4)
+
+        # the bulk approval of the join requests skips the m2m_changed signal
+        self.meetup_location.join_requests.add(self.systers_user)
+        approve_join_requests(self.meetup_location)
+        self.assertEqual(self.cache.purges, [location_key] * 5)
+        self.assertEqual(approve_join_requests(self.meetup_location), 0)
+        self.assertEqual(len(self.cache.purges), 5)
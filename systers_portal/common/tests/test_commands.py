@@ -0,0 +1,185 @@
+import shutil
+import tempfile
+from datetime import timedelta
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.sessions.models import Session
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from blog.models import News
+from common.models import Comment, Job, StoredBlob
+from common.storage import blob_storage
+from community.models import Community
+from meetup.models import Meetup, MeetupLocation, SupportRequest
+from users.models import SystersUser
+
+
+class RenderRichTextCommandTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=1,
+                                                  admin=self.systers_user)
+        for i in range(3):
+            News.objects.create(slug="foo{0}".format(i), title="Bar",
+                                author=self.systers_user,
+                                content="<p>Hi <b>there</b></p>",
+                                community=self.community)
+        News.objects.update(excerpt="", body_html="", word_count=0)
+
+    def test_render_rich_text(self):
+        """Test the command backfills the rich text artifacts without touching
+        the modification dates"""
+        dates = list(News.objects.values_list('date_modified', flat=True))
+        out = StringIO()
+        call_command('render_rich_text', batch_size=2, stdout=out)
+        self.assertIn("blog.News: rendered 3 objects", out.getvalue())
+        for news in News.objects.all():
+            self.assertEqual(news.excerpt, "Hi there")
+            self.assertEqual(news.body_html, "<p>Hi <b>there</b></p>")
+            self.assertEqual(news.word_count, 2)
+        self.assertEqual(
+            list(News.objects.values_list('date_modified', flat=True)), dates)
+
+
+class CollectBlobsCommandTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        user = User.objects.create(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=user)
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  admin=self.systers_user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_collect_blobs(self):
+        """Test the command recounts references and deletes unused files"""
+        used = blob_storage.save('used.png', ContentFile(b'used'))
+        unused = blob_storage.save('unused.png', ContentFile(b'unused'))
+        picture = blob_storage.save('picture.png', ContentFile(b'picture'))
+        SystersUser.objects.filter(pk=self.systers_user.pk).update(profile_picture=picture)
+        News.objects.create(slug="foo", title="Bar", author=self.systers_user,
+                            community=self.community,
+                            content='<img src="/media/{0}"><img src="/media/{0}">'
+                                    '<a href="/media/{1}">'.format(used, used[:-4] + '_thumb.png'))
+        StoredBlob.objects.update(ref_count=5, date_stored=timezone.now() - timedelta(days=2))
+
+        out = StringIO()
+        call_command('collect_blobs', dry_run=True, stdout=out)
+        self.assertIn("Would delete {0}".format(unused), out.getvalue())
+        self.assertTrue(blob_storage.exists(unused))
+
+        call_command('collect_blobs', stdout=out)
+        self.assertIn("Deleted 1 unreferenced files", out.getvalue())
+        self.assertEqual(dict(StoredBlob.objects.values_list('name', 'ref_count')),
+                         {used: 1, picture: 1})
+        self.assertFalse(blob_storage.exists(unused))
+        self.assertTrue(blob_storage.exists(used))
+
+    def test_collect_blobs_grace_period(self):
+        """Test recently stored files are kept even if unreferenced"""
+        name = blob_storage.save('new.png', ContentFile(b'new'))
+        call_command('collect_blobs', stdout=StringIO())
+        self.assertTrue(blob_storage.exists(name))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 0)
+
+
+class SweepCommentsCommandTestCase(TestCase):
+    def setUp(self):
+        self.systers_user = SystersUser.objects.get(
+            user=User.objects.create(username='foo'))
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location,
+            description="It's a test meetup location", sponsors="BarBaz")
+        self.meetup = Meetup.objects.create(
+            title='Foo', slug='foo', date=timezone.now().date(), time=timezone.now().time(),
+            description='Test', meetup_location=self.meetup_location,
+            created_by=self.systers_user)
+        self.support_request = SupportRequest.objects.create(
+            volunteer=self.systers_user, meetup=self.meetup)
+
+    def add_comment(self, model, object_id):
+        return Comment.objects.create(
+            author=self.systers_user, body="Hi",
+            content_type=ContentType.objects.get_for_model(model), object_id=object_id)
+
+    def test_generic_relations_cascade(self):
+        """Test deleting a meetup location deletes the comments of its meetups"""
+        self.add_comment(Meetup, self.meetup.pk)
+        self.add_comment(SupportRequest, self.support_request.pk)
+        self.meetup_location.delete()
+        self.assertFalse(Comment.objects.exists())
+
+    def test_sweep_comments(self):
+        """Test deleting the orphaned comments in chunks"""
+        kept = [self.add_comment(Meetup, self.meetup.pk),
+                self.add_comment(SupportRequest, self.support_request.pk)]
+        for i in range(3):
+            self.add_comment(Meetup, self.meetup.pk + 100)
+        self.add_comment(SupportRequest, self.support_request.pk + 100)
+
+        out = StringIO()
+        call_command('sweep_comments', dry_run=True, stdout=out)
+        self.assertIn("[dry run] 4 orphaned comments found", out.getvalue())
+        self.assertEqual(Comment.objects.count(), 6)
+
+        out = StringIO()
+        call_command('sweep_comments', chunk_size=2, stdout=out)
+        self.assertIn("3 orphaned comments to meetup", out.getvalue())
+        self.assertIn("1 orphaned comments to support request", out.getvalue())
+        self.assertIn("4 orphaned comments deleted", out.getvalue())
+        self.assertCountEqual(Comment.objects.all(), kept)
+
+    @override_settings(JOBS_ALWAYS_EAGER=False)
+    def test_schedule_sweep_comments(self):
+        """Test the periodic sweep is queued once"""
+        call_command('sweep_comments', schedule=True, stdout=StringIO())
+        call_command('sweep_comments', schedule=True, stdout=StringIO())
+        job = Job.objects.get()
+        self.assertEqual(job.name, 'common.jobs.sweep_comments')
+        self.assertGreater(job.run_at, timezone.now())
+
+
+class PurgeSessionsCommandTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key='expired{0}'.format(i), session_data='',
+                                   expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='active', session_data='',
+                               expire_date=now + timedelta(days=1))
+
+    def test_purge_sessions(self):
+        """Test the expired sessions are deleted in several batches"""
+        out = StringIO()
+        call_command('purge_sessions', dry_run=True, stdout=out)
+        self.assertIn("[dry run] 5 expired sessions to delete", out.getvalue())
+        self.assertEqual(Session.objects.count(), 6)
+
+        out = StringIO()
+        call_command('purge_sessions', batch_size=2, pause=0, stdout=out)
+        self.assertIn("5 expired sessions deleted", out.getvalue())
+        self.assertQuerysetEqual(Session.objects.all(), ['active'],
+                                 transform=lambda session: session.pk)
+
+    @override_settings(JOBS_ALWAYS_EAGER=False)
+    def test_schedule_purge_sessions(self):
+        """Test the periodic purge is queued once"""
+        call_command('purge_sessions', schedule=True, stdout=StringIO())
+        call_command('purge_sessions', schedule=True, stdout=StringIO())
+        job = Job.objects.get()
+        self.assertEqual(job.name, 'common.jobs.purge_sessions')
+        self.assertGreater(job.run_at, timezone.now())
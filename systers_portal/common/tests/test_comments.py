@@ -0,0 +1,68 @@
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.utils import timezone
+
+from common.comments import get_comment_page
+from common.models import Comment
+from meetup.models import Meetup, MeetupLocation, SupportRequest
+from users.models import SystersUser
+
+
+class CommentThreadTestCase(TestCase):
+    def setUp(self):
+        self.systers_user = SystersUser.objects.get(
+            user=User.objects.create(username='foo'))
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz',
+                                       country=country)
+        meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location)
+        self.meetup = Meetup.objects.create(
+            title='Foo', slug='foo', date=timezone.now().date(),
+            time=timezone.now().time(), meetup_location=meetup_location)
+        self.comments = [Comment.objects.create(
+            author=self.systers_user, body="Comment {0}".format(i),
+            content_object=self.meetup, is_approved=i != 3) for i in range(6)]
+
+    def test_get_comment_page(self):
+        """Test paging through the approved comments with cursors"""
+        ContentType.objects.get_for_model(Meetup)
+        with self.assertNumQueries(1):
+            comments, after = get_comment_page(self.meetup, size=2)
+            self.assertEqual(comments[0].author.user.username, 'foo')
+        self.assertEqual(comments, self.comments[:2])
+        self.assertEqual(after, self.comments[1].pk)
+        comments, after = get_comment_page(self.meetup, after=after, size=2)
+        self.assertEqual(comments, [self.comments[2], self.comments[4]])
+        comments, after = get_comment_page(self.meetup, after=after, size=2)
+        self.assertEqual(comments, [self.comments[5]])
+        self.assertIsNone(after)
+
+    def test_comment_count(self):
+        """Test the number of approved comments follows the comment writes"""
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.comment_count, 5)
+        self.comments[3].is_approved = True
+        self.comments[3].save()
+        self.comments[0].delete()
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.comment_count, 5)
+
+        support_request = SupportRequest.objects.create(
+            volunteer=self.systers_user, meetup=self.meetup)
+        Comment.objects.create(author=self.systers_user, body="Bar",
+                               content_object=support_request)
+        support_request.refresh_from_db()
+        self.assertEqual(support_request.comment_count, 1)
+
+    def test_save_stale_object(self):
+        """Test saving a stale object does not overwrite its number of
+        comments"""
+        meetup = Meetup.objects.get(pk=self.meetup.pk)
+        Comment.objects.filter(pk=self.comments[0].pk).delete()
+        meetup.title = 'Bar'
+        meetup.save()
+        meetup.refresh_from_db()
+        self.assertEqual(meetup.comment_count, 4)
@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from common.constants import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+from common.jobs import (claim_jobs, enqueue, get_job_function, get_metrics, job,
+                         recurring_job, requeue_stale_jobs, run_job, work)
+from common.models import Job
+
+
+calls = []
+
+
+@job
+def record(value, suffix=''):
+    calls.append(value + suffix)
+
+
+@job
+def fail():
+    raise ValueError("Boom")
+
+
+@recurring_job('COMMENTS_SWEEP_INTERVAL')
+def record_periodically():
+    calls.append('tick')
+
+
+@recurring_job('COMMENTS_SWEEP_INTERVAL')
+def fail_periodically():
+    raise ValueError("Boom")
+
+
+@override_settings(JOBS_ALWAYS_EAGER=False)
+class JobsTestCase(TestCase):
+    def setUp(self):
+        del calls[:]
+
+    @override_settings(JOBS_ALWAYS_EAGER=True)
+    def test_enqueue_eager(self):
+        """Test jobs run right away when JOBS_ALWAYS_EAGER is set"""
+        self.assertIsNone(enqueue(record, 'foo', suffix='!'))
+        self.assertEqual(calls, ['foo!'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue(self):
+        """Test queueing and running a job"""
+        queued = enqueue(record, 'foo', suffix='!')
+        self.assertEqual(queued.name, record.job_name)
+        self.assertEqual(queued.status, JOB_QUEUED)
+        self.assertEqual(calls, [])
+        self.assertEqual(work(lambda: False, once=True), (1, 0))
+        self.assertEqual(calls, ['foo!'])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, JOB_DONE)
+        self.assertEqual(queued.attempts, 1)
+
+    def test_enqueue_delay(self):
+        """Test delayed jobs are not run before their time"""
+        enqueue(record, 'foo', delay=60)
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_dedup_key(self):
+        """Test a job is not queued twice with the same deduplication key"""
+        self.assertIsNotNone(enqueue(record, 'foo', dedup_key='foo'))
+        self.assertIsNone(enqueue(record, 'foo', dedup_key='foo'))
+        self.assertEqual(Job.objects.count(), 1)
+        # once picked up by a worker, the key can be used again
+        claimed = claim_jobs(10)
+        self.assertEqual(len(claimed), 1)
+        self.assertIsNotNone(enqueue(record, 'foo', dedup_key='foo'))
+
+    def test_recurring_job(self):
+        """Test a recurring job queues its next run once it is done"""
+        queued = record_periodically.schedule()
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIsNone(record_periodically.schedule())
+        self.assertEqual(get_job_function(record_periodically.job_name), record_periodically)
+        Job.objects.update(run_at=timezone.now())
+        self.assertEqual(work(lambda: False, once=True), (1, 0))
+        self.assertEqual(calls, ['tick'])
+        self.assertEqual(Job.objects.filter(status=JOB_QUEUED).count(), 1)
+        record_periodically(reschedule=False)
+        self.assertEqual(Job.objects.filter(status=JOB_QUEUED).count(), 1)
+
+    def test_recurring_job_failed(self):
+        """Test a recurring job queues its next run when a run fails all its attempts"""
+        queued = fail_periodically.schedule()
+        Job.objects.update(run_at=timezone.now(), max_attempts=1)
+        self.assertEqual(work(lambda: False, once=True), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, JOB_FAILED)
+        next_run = Job.objects.get(status=JOB_QUEUED)
+        self.assertEqual(next_run.dedup_key, fail_periodically.job_name)
+        self.assertGreater(next_run.run_at, timezone.now())
+
+    def test_claim_jobs(self):
+        """Test claimed jobs are marked as running in queue order"""
+        first = enqueue(record, 'foo')
+        second = enqueue(record, 'bar')
+        Job.objects.filter(pk=second.pk).update(run_at=first.run_at - timedelta(seconds=1))
+        claimed = claim_jobs(1)
+        self.assertEqual([j.pk for j in claimed], [second.pk])
+        self.assertEqual(Job.objects.get(pk=second.pk).status, JOB_RUNNING)
+        self.assertEqual([j.pk for j in claim_jobs(10)], [first.pk])
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_retry(self):
+        """Test failing jobs are retried with a backoff, then marked failed"""
+        queued = enqueue(fail, max_attempts=2)
+        self.assertFalse(run_job(claim_jobs(1)[0]))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, JOB_QUEUED)
+        self.assertIn("ValueError: Boom", queued.last_error)
+        self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=9))
+        Job.objects.update(run_at=timezone.now())
+        self.assertFalse(run_job(claim_jobs(1)[0]))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, JOB_FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_unknown_job(self):
+        """Test only functions marked as jobs can be run"""
+        with self.assertRaises(ImportError):
+            get_job_function('os.path.join')
+        Job.objects.create(name='os.path.join', payload='{"args": [], "kwargs": {}}',
+                           max_attempts=1)
+        self.assertEqual(work(lambda: False, once=True), (0, 1))
+
+    def test_requeue_stale_jobs(self):
+        """Test jobs running for too long are queued again"""
+        enqueue(record, 'foo')
+        claim_jobs(1)
+        self.assertEqual(requeue_stale_jobs(), 0)
+        Job.objects.update(date_started=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(Job.objects.get().status, JOB_QUEUED)
+
+    def test_fail_stale_jobs_out_of_attempts(self):
+        """Test stale jobs that reached their maximum attempts are marked as failed"""
+        enqueue(record, 'foo', max_attempts=1)
+        claim_jobs(1)
+        Job.objects.update(date_started=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 0)
+        stale_job = Job.objects.get()
+        self.assertEqual(stale_job.status, JOB_FAILED)
+        self.assertIn("Timed out", stale_job.last_error)
+        self.assertIsNotNone(stale_job.date_finished)
+
+    def test_metrics(self):
+        """Test the queue metrics"""
+        enqueue(record, 'foo')
+        enqueue(record, 'bar')
+        Job.objects.update(run_at=timezone.now() - timedelta(seconds=30))
+        run_job(claim_jobs(1)[0])
+        metrics = get_metrics(60)
+        self.assertEqual(metrics[JOB_QUEUED], 1)
+        self.assertEqual(metrics[JOB_DONE], 1)
+        self.assertGreaterEqual(metrics['lag'], 30)
+        self.assertEqual(metrics['throughput'], 1 / 60)
+        self.assertGreaterEqual(metrics['mean_lag'], 30)
+
+    def test_run_workers_once(self):
+        """Test the run_workers command running the due jobs"""
+        enqueue(record, 'foo')
+        enqueue(fail)
+        out = StringIO()
+        call_command('run_workers', once=True, stdout=out)
+        self.assertIn("1 jobs succeeded, 1 failed", out.getvalue())
+        self.assertEqual(calls, ['foo'])
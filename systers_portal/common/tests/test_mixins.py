@@ -3,7 +3,7 @@ from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase, RequestFactory
 from django.views.generic import TemplateView
 
-from common.mixins import UserDetailsMixin
+from common.mixins import ConditionalGetMixin, UserDetailsMixin
 from community.models import Community
 from users.models import SystersUser
 
@@ -53,3 +53,38 @@ class UserDetailsMixinTestCase(TestCase):
         context = response.context_data
         self.assertTrue(context.get('is_member'))
         self.assertEqual(context.get('join_request'), None)
+
+
+class ConditionalGetMixinTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_get_validators_not_overridden(self):
+        """Test mixin with no validators defined"""
+        class DummyView(ConditionalGetMixin, TemplateView):
+            template_name = "dummy"
+
+        request = self.factory.get("/dummy/")
+        request.user = AnonymousUser()
+        view = DummyView.as_view()
+        self.assertRaises(ImproperlyConfigured, view, request)
+
+    def test_get_not_modified(self):
+        """Test mixin answering with 304 if the ETag matches"""
+        class DummyView(ConditionalGetMixin, TemplateView):
+            template_name = "dummy"
+
+            def get_validators(self):
+                return self.make_etag("foo", 1), None
+
+        etag = '"{0}"'.format(DummyView().make_etag("foo", 1))
+        request = self.factory.get("/dummy/", HTTP_IF_NONE_MATCH=etag)
+        request.user = AnonymousUser()
+        response = DummyView.as_view()(request)
+        self.assertEqual(response.status_code, 304)
+
+        request = self.factory.get("/dummy/", HTTP_IF_NONE_MATCH='"bar"')
+        request.user = AnonymousUser()
+        response = DummyView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
@@ -28,3 +28,42 @@ class CommentModelTestCase(TestCase):
                                          content_type=related_object_type)
         self.assertEqual(str(comment),
                          "Comment by foo to Bar of Foo Community")
+
+
+class RichTextArtifactsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=1,
+                                                  admin=self.systers_user)
+        self.news = News.objects.create(
+            slug="foonews", title="Bar", author=self.systers_user,
+            content="<p>Hi <script>alert(1)</script>there!</p>",
+            community=self.community)
+
+    def test_artifacts_on_create(self):
+        """Test the rich text artifacts are stored when an object is created"""
+        news = News.objects.get(pk=self.news.pk)
+        self.assertEqual(news.excerpt, "Hi there!")
+        self.assertEqual(news.body_html, "<p>Hi there!</p>")
+        self.assertEqual(news.word_count, 2)
+
+    def test_artifacts_on_update(self):
+        """Test the rich text artifacts follow the rich text field changes"""
+        self.news.content = "<p>Hello</p>"
+        self.news.save()
+        news = News.objects.get(pk=self.news.pk)
+        self.assertEqual(news.excerpt, "Hello")
+        self.assertEqual(news.body_html, "<p>Hello</p>")
+        self.assertEqual(news.word_count, 1)
+
+    def test_artifacts_update_fields(self):
+        """Test the rich text artifacts are saved along with the rich text
+        field when update_fields is used"""
+        self.news.content = "<p>Hello</p>"
+        self.news.save(update_fields=['content'])
+        self.assertEqual(News.objects.get(pk=self.news.pk).excerpt, "Hello")
+        self.news.content = "<p>Bye</p>"
+        self.news.save(update_fields=['title'])
+        self.assertEqual(News.objects.get(pk=self.news.pk).excerpt, "Hello")
@@ -0,0 +1,33 @@
+from cities_light.models import City, Country
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from common.resolvers import resolve_object
+from meetup.mixins import resolve_meetup_location
+from meetup.models import MeetupLocation
+
+
+class ResolveObjectTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz',
+                                       country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location)
+        self.factory = RequestFactory()
+
+    def test_resolve_once_per_request(self):
+        """Test an object is fetched once per request and shared"""
+        request = self.factory.get('/')
+        with self.assertNumQueries(1):
+            meetup_location = resolve_meetup_location(request, 'foo')
+            self.assertIs(resolve_object(request, MeetupLocation, slug='foo'),
+                          meetup_location)
+        self.assertEqual(meetup_location, self.meetup_location)
+        with self.assertNumQueries(1):
+            resolve_meetup_location(self.factory.get('/'), 'foo')
+
+    def test_resolve_missing_object(self):
+        """Test a missing object raises Http404"""
+        self.assertRaises(Http404, resolve_object, self.factory.get('/'),
+                          MeetupLocation.objects.all(), slug='bar')
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from cities_light.models import City, Country
+from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import reverse
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from common import routers
+from common.constants import REPLICA_PIN_COOKIE
+from meetup.models import MeetupLocation
+
+
+@override_settings(DATABASE_REPLICAS=('replica',))
+class ReplicaRouterTestCase(TransactionTestCase):
+    def setUp(self):
+        routers._health.clear()
+        self.router = routers.ReplicaRouter()
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        MeetupLocation.objects.create(name="Foo Systers", slug="foo", location=location)
+
+    def tearDown(self):
+        routers.allow_replica_reads(False)
+
+    def test_db_for_read(self):
+        """Test the allowed reads go to the replica until the first write"""
+        self.assertEqual(self.router.db_for_read(MeetupLocation), 'default')
+        routers.allow_replica_reads(True)
+        self.assertEqual(self.router.db_for_read(MeetupLocation), 'replica')
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(MeetupLocation), 'default')
+        self.assertEqual(self.router.db_for_write(MeetupLocation), 'default')
+        self.assertEqual(self.router.db_for_read(MeetupLocation), 'default')
+        self.assertTrue(routers.has_written())
+
+    def test_unhealthy_replica(self):
+        """Test the reads go to the primary while the replica is unhealthy"""
+        routers.allow_replica_reads(True)
+        with patch('common.routers.check_replica', return_value=False) as check_replica:
+            self.assertEqual(self.router.db_for_read(MeetupLocation), 'default')
+            self.assertEqual(self.router.db_for_read(MeetupLocation), 'default')
+        self.assertEqual(check_replica.call_count, 1)
+        with override_settings(DATABASE_REPLICA_CHECK_INTERVAL=0):
+            self.assertEqual(self.router.db_for_read(MeetupLocation), 'replica')
+
+    def test_misconfigured_replica(self):
+        """Test the reads go to the primary when the replica settings are incomplete"""
+        routers.allow_replica_reads(True)
+        with patch.object(connections['replica'], 'cursor',
+                          side_effect=ImproperlyConfigured("settings.DATABASES is improperly "
+                                                           "configured.")):
+            self.assertEqual(self.router.db_for_read(MeetupLocation), 'default')
+        self.assertFalse(routers._health['replica'][0])
+
+    def test_read_your_writes(self):
+        """Test the requests following a write read from the primary"""
+        url = reverse('about_meetup_location', kwargs={'slug': 'foo'})
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries.captured_queries)
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+        response = self.client.post(reverse('account_login'))
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+        with CaptureQueriesContext(connections['replica']) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(queries.captured_queries)
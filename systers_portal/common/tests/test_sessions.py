@@ -0,0 +1,40 @@
+from cities_light.models import City, Country
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from meetup.models import MeetupLocation
+
+
+class SessionTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        MeetupLocation.objects.create(name="Foo Systers", slug="foo", location=location)
+        User.objects.create_user(username='foo', password='foobar')
+        self.url = reverse('about_meetup_location', kwargs={'slug': 'foo'})
+
+    def get_session_queries(self):
+        """Get the page and the queries it made to the sessions table"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, [query for query in queries.captured_queries
+                          if Session._meta.db_table in query['sql']]
+
+    def test_anonymous_requests(self):
+        """Test the pages of the anonymous visitors neither load nor create a session"""
+        response, queries = self.get_session_queries()
+        self.assertFalse(queries)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_cached_sessions(self):
+        """Test the sessions of the logged in users are read from the cache"""
+        self.client.login(username='foo', password='foobar')
+        response, queries = self.get_session_queries()
+        self.assertEqual(response.context['user'].username, 'foo')
+        self.assertFalse(queries)
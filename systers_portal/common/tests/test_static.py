@@ -0,0 +1,103 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from django.utils.six import StringIO
+
+from common.static import StaticFilesApp, parse_accept_encoding
+
+
+class StaticFilesTestCase(SimpleTestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.source, 'css'))
+        os.makedirs(os.path.join(self.source, 'img'))
+        self.css = b'body { background: url("../img/logo.png"); }\n' * 20
+        with open(os.path.join(self.source, 'css', 'site.css'), 'wb') as css:
+            css.write(self.css)
+        with open(os.path.join(self.source, 'img', 'logo.png'), 'wb') as logo:
+            logo.write(b'\x89PNG')
+        self.settings_override = override_settings(
+            STATIC_ROOT=self.root, STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATICFILES_STORAGE='common.storage.CompressedManifestStaticFilesStorage')
+        self.settings_override.enable()
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        with open(os.path.join(self.root, 'staticfiles.json')) as manifest:
+            self.paths = json.load(manifest)['paths']
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.source)
+        shutil.rmtree(self.root)
+
+    def request(self, path, accept_encoding=''):
+        """Request a path from the static files application
+
+        :return: tuple (string status, dict headers, bytes body)
+        """
+        response = {}
+
+        def application(environ, start_response):
+            start_response('404 Not Found', [])
+            return [b'Django']
+
+        def start_response(status, headers):
+            response['status'], response['headers'] = status, dict(headers)
+
+        app = StaticFilesApp(application)
+        body = b''.join(app({'REQUEST_METHOD': 'GET', 'PATH_INFO': path,
+                             'HTTP_ACCEPT_ENCODING': accept_encoding}, start_response))
+        return response['status'], response['headers'], body
+
+    def test_collectstatic(self):
+        """Test the static files are hashed and their hashed text files compressed"""
+        hashed_css = self.paths['css/site.css']
+        self.assertRegex(hashed_css, r'^css/site\.[0-9a-f]{12}\.css$')
+        with gzip.open(os.path.join(self.root, hashed_css + '.gz')) as compressed:
+            content = compressed.read()
+        self.assertIn(self.paths['img/logo.png'].encode(), content)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'css', 'site.css.gz')))
+        self.assertFalse(os.path.exists(os.path.join(
+            self.root, self.paths['img/logo.png'] + '.gz')))
+
+        template = Template("{% load staticfiles %}{% static 'css/site.css' %}")
+        self.assertEqual(template.render(Context()), '/static/' + hashed_css)
+
+    def test_serve_static_files(self):
+        """Test the hashed files are served compressed with an immutable lifetime"""
+        hashed_css = self.paths['css/site.css']
+        status, headers, body = self.request('/static/' + hashed_css, 'gzip, deflate, br')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Content-Type'], 'text/css')
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(int(headers['Content-Length']), len(body))
+        self.assertIn(b'logo.', gzip.decompress(body))
+
+        status, headers, body = self.request('/static/' + hashed_css, 'gzip;q=0')
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertIn(b'logo.', body)
+
+        status, headers, body = self.request('/static/css/site.css', 'gzip')
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(headers['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(body, self.css)
+
+    def test_pass_through(self):
+        """Test the requests for other paths reach the application"""
+        for path in ('/static/css/missing.css', '/static/../static/css/site.css',
+                     '/static/../../etc/passwd', '/meetup/'):
+            status, headers, body = self.request(path)
+            self.assertEqual(body, b'Django', path)
+
+    def test_parse_accept_encoding(self):
+        """Test parsing the codings accepted by a client"""
+        self.assertEqual(parse_accept_encoding('gzip, deflate;q=0.5, BR;q=0, x;q=a'),
+                         {'gzip', 'deflate'})
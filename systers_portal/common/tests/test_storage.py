@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from common.models import StoredBlob
+from common.storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.storage = ContentAddressedStorage()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_save(self):
+        """Test files are stored under the digest of their content"""
+        name = self.storage.save('uploads/banner.PNG', ContentFile(b'foo'))
+        self.assertEqual(name, 'blobs/2c/26/2c26b46b68ffc68ff99b453c1d30413413422d706483'
+                               'bfa0f98a5e886266e7ae.png')
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'foo')
+        blob = StoredBlob.objects.get()
+        self.assertEqual((blob.name, blob.size, blob.ref_count), (name, 3, 1))
+        self.assertEqual(self.storage.url(name), '/media/' + name)
+
+    def test_save_duplicate(self):
+        """Test a content saved twice is stored once and referenced twice"""
+        name = self.storage.save('foo.txt', ContentFile(b'foo'))
+        self.assertEqual(self.storage.save('bar.txt', ContentFile(b'foo')), name)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+        self.assertNotEqual(self.storage.save('foo.txt', ContentFile(b'bar')), name)
+        self.assertEqual(StoredBlob.objects.count(), 2)
+        # no temporary file is left behind
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'blobs'))), 2)
+
+    def test_delete(self):
+        """Test deleting a file only drops a reference to it"""
+        name = self.storage.save('foo.txt', ContentFile(b'foo'))
+        self.storage.delete(name)
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 0)
+        self.storage.delete_blob(name)
+        self.assertFalse(self.storage.exists(name))
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from common.models import StoredBlob
+from common.storage import blob_storage
+from common.uploads import (exif_transpose, get_pending_name, get_thumb_path, process_image,
+                            process_pending_image)
+
+
+class ProcessImageTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(self.directory, 'source.jpg')
+        self.target = os.path.join(self.directory, 'target.jpg')
+        # EXIF data with an upright orientation
+        exif = (b"Exif\x00\x00MM\x00*\x00\x00\x00\x08\x00\x01\x01\x12\x00\x03"
+                b"\x00\x00\x00\x01\x00\x01\x00\x00\x00\x00\x00\x00")
+        Image.new('RGB', (400, 200), 'blue').save(self.source, format='JPEG', exif=exif)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_process_image(self):
+        """Test an image is downscaled, stripped of EXIF data and thumbnailed"""
+        self.assertIn('exif', Image.open(self.source).info)
+        process_image(self.source, self.target, 100, (75, 75), 85)
+        self.assertFalse(os.path.exists(self.source))
+        image = Image.open(self.target)
+        self.assertEqual(image.size, (100, 50))
+        self.assertNotIn('exif', image.info)
+        self.assertEqual(Image.open(get_thumb_path(self.target)).size, (75, 75))
+        self.assertFalse(os.path.exists(self.target + '.partial'))
+
+    def test_exif_transpose(self):
+        """Test images are rotated according to their EXIF orientation"""
+        image = Image.new('RGB', (400, 200))
+        image._getexif = lambda: {0x0112: 6}
+        self.assertEqual(exif_transpose(image).size, (200, 400))
+        image._getexif = lambda: None
+        self.assertEqual(exif_transpose(image).size, (400, 200))
+
+
+@override_settings(CKEDITOR_IMAGE_MAX_DIMENSION=100)
+class ProcessPendingImageTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        output = BytesIO()
+        Image.new('RGB', (400, 200), 'blue').save(output, format='JPEG')
+        self.content = output.getvalue()
+        self.blob_name = blob_storage.get_blob_name('ab' * 32, '.jpg')
+        self.pending_name = get_pending_name(self.blob_name)
+        StoredBlob.objects.create(digest='ab' * 32, name=self.blob_name, ref_count=1)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_process_pending_image(self):
+        """Test a pending image is processed into its blob"""
+        default_storage.save(self.pending_name, ContentFile(self.content))
+        self.assertTrue(process_pending_image(self.pending_name, self.blob_name))
+        self.assertEqual(Image.open(blob_storage.path(self.blob_name)).size, (100, 50))
+        self.assertFalse(default_storage.exists(self.pending_name))
+        # a job of a concurrent upload only removes its pending image
+        default_storage.save(self.pending_name, ContentFile(self.content))
+        self.assertTrue(process_pending_image(self.pending_name, self.blob_name))
+        self.assertFalse(default_storage.exists(self.pending_name))
+
+    def test_process_truncated_image(self):
+        """Test a truncated image is dropped, so that the next upload starts over"""
+        default_storage.save(self.pending_name, ContentFile(self.content[:len(self.content) // 2]))
+        self.assertFalse(process_pending_image(self.pending_name, self.blob_name))
+        self.assertFalse(default_storage.exists(self.pending_name))
+        self.assertFalse(blob_storage.exists(self.blob_name))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 0)
@@ -0,0 +1,63 @@
+from django.test import TestCase
+
+from common.utils import is_safe_url, is_safe_style, render_rich_text
+
+
+class IsSafeUrlTestCase(TestCase):
+    def test_is_safe_url(self):
+        """Test relative URLs and URLs with allowed schemes are safe"""
+        self.assertTrue(is_safe_url("/foo/bar/"))
+        self.assertTrue(is_safe_url("foo.png"))
+        self.assertTrue(is_safe_url("https://systers.org/"))
+        self.assertTrue(is_safe_url("mailto:foo@bar.com"))
+        self.assertFalse(is_safe_url("javascript:alert(1)"))
+        self.assertFalse(is_safe_url(" java\tscript:alert(1)"))
+        self.assertFalse(is_safe_url("data:text/html;base64,Zm9v"))
+
+    def test_is_safe_style(self):
+        """Test styles that can load or execute code are not safe"""
+        self.assertTrue(is_safe_style("color: red; font-size: 12px"))
+        self.assertFalse(is_safe_style("width: expression(alert(1))"))
+        self.assertFalse(is_safe_style("background: URL (foo.png)"))
+
+
+class RenderRichTextTestCase(TestCase):
+    def test_render_rich_text(self):
+        """Test rendering the artifacts of a simple rich text"""
+        excerpt, body_html, word_count = render_rich_text(
+            "<p>Hello <strong>Systers</strong>!</p><p>Bye</p>", 50)
+        self.assertEqual(excerpt, "Hello Systers! Bye")
+        self.assertEqual(body_html,
+                         "<p>Hello <strong>Systers</strong>!</p><p>Bye</p>")
+        self.assertEqual(word_count, 3)
+
+    def test_render_rich_text_empty(self):
+        """Test rendering the artifacts of an empty rich text"""
+        self.assertEqual(render_rich_text("", 50), ("", "", 0))
+        self.assertEqual(render_rich_text(None, 50), ("", "", 0))
+
+    def test_excerpt_truncated(self):
+        """Test the excerpt is truncated to the number of words"""
+        excerpt, _, word_count = render_rich_text(
+            "<ul><li>one</li><li>two</li><li>three</li></ul>", 2)
+        self.assertEqual(excerpt, "one two ...")
+        self.assertEqual(word_count, 3)
+
+    def test_dangerous_markup_removed(self):
+        """Test scripts, event handlers and unsafe URLs are removed"""
+        _, body_html, _ = render_rich_text(
+            '<p onclick="alert(1)">Hi<script>alert(1)</script></p>'
+            '<a href="javascript:alert(1)" title="x">link</a>'
+            '<img src="/foo.png" onerror="alert(1)">'
+            '<iframe src="http://foo.com">frame</iframe><form>form</form>',
+            50)
+        self.assertEqual(body_html,
+                         '<p>Hi</p><a title="x">link</a><img src="/foo.png">'
+                         'form')
+
+    def test_text_escaped_and_tags_closed(self):
+        """Test text is escaped and tags left open are closed"""
+        excerpt, body_html, _ = render_rich_text(
+            "<p><em>1 &lt; 2 &amp; <b>3", 50)
+        self.assertEqual(excerpt, "1 < 2 & 3")
+        self.assertEqual(body_html, "<p><em>1 &lt; 2 &amp; <b>3</b></em></p>")
@@ -1,6 +1,19 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.contrib.auth.models import User
+from PIL import Image
+
+from common.constants import JOB_FAILED, JOB_QUEUED
+from common.jobs import work
+from common.models import Job, StoredBlob
+from common.views import serve_media
 
 
 class CommonViewsTestCase(TestCase):
@@ -42,3 +55,117 @@ class CommonViewsTestCase(TestCase):
         self.assertEqual(response.status_code, 302)
         # Log out the user
         self.client.logout()
+
+
+@override_settings(CKEDITOR_IMAGE_MAX_DIMENSION=100)
+class CKEditorUploadViewTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        User.objects.create_user(username='foo', password='foobar')
+        self.url = reverse('ckeditor_upload')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def create_upload(self, name='photo.jpg', image_format='JPEG'):
+        output = BytesIO()
+        Image.new('RGB', (400, 200), 'red').save(output, format=image_format)
+        return SimpleUploadedFile(name, output.getvalue())
+
+    def test_upload_anonymous(self):
+        """Test anonymous users can't upload"""
+        response = self.client.post(self.url, {'upload': self.create_upload()})
+        self.assertEqual(response.status_code, 403)
+
+    def test_upload_image(self):
+        """Test an uploaded image is processed and its URL returned"""
+        self.client.login(username='foo', password='foobar')
+        response = self.client.post(self.url, {'upload': self.create_upload()})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['uploaded'], 1)
+        self.assertEqual(data['fileName'], 'photo.jpg')
+        self.assertRegex(data['url'], r'^/media/blobs/\w\w/\w\w/[0-9a-f]{64}\.jpg$')
+        path = os.path.join(self.media_root, data['url'][len('/media/'):])
+        self.assertEqual(Image.open(path).size, (100, 50))
+        self.assertTrue(os.path.exists(path.replace('.jpg', '_thumb.jpg')))
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'uploads', '.pending')), [])
+
+    def test_upload_image_twice(self):
+        """Test an image uploaded twice is stored and processed once"""
+        self.client.login(username='foo', password='foobar')
+        upload = self.create_upload()
+        url = self.client.post(self.url, {'upload': upload}).json()['url']
+        upload.seek(0)
+        with patch('common.views.schedule_image_processing') as schedule:
+            response = self.client.post(self.url, {'upload': upload})
+        self.assertEqual(response.json()['url'], url)
+        self.assertFalse(schedule.called)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+
+    @override_settings(JOBS_ALWAYS_EAGER=False)
+    def test_upload_image_retried(self):
+        """Test a new upload of an image whose processing failed queues it again, once"""
+        self.client.login(username='foo', password='foobar')
+        upload = self.create_upload()
+        url = self.client.post(self.url, {'upload': upload}).json()['url']
+        path = os.path.join(self.media_root, url[len('/media/'):])
+        self.assertFalse(os.path.exists(path))
+        # the worker claiming the job released its deduplication key
+        Job.objects.update(status=JOB_FAILED, dedup_key=None)
+        for i in range(2):
+            upload.seek(0)
+            self.assertEqual(self.client.post(self.url, {'upload': upload}).json()['url'], url)
+        self.assertEqual(Job.objects.filter(status=JOB_QUEUED).count(), 1)
+        self.assertEqual(work(lambda: False, once=True), (1, 0))
+        self.assertEqual(Image.open(path).size, (100, 50))
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'uploads', '.pending')), [])
+
+    def test_upload_ckeditor_callback(self):
+        """Test the upload result is sent to the CKEditor callback"""
+        self.client.login(username='foo', password='foobar')
+        response = self.client.post(self.url + '?CKEditorFuncNum=3',
+                                    {'upload': self.create_upload()})
+        self.assertContains(response, "callFunction(3, '/media/blobs/")
+
+    def test_upload_file(self):
+        """Test files that are not images are stored as they are"""
+        self.client.login(username='foo', password='foobar')
+        upload = SimpleUploadedFile('notes.txt', b'Hello')
+        response = self.client.post(self.url, {'upload': upload})
+        path = os.path.join(self.media_root, response.json()['url'][len('/media/'):])
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'Hello')
+        with self.settings(CKEDITOR_ALLOW_NONIMAGE_FILES=False):
+            upload = SimpleUploadedFile('notes.txt', b'Hello')
+            response = self.client.post(self.url, {'upload': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['message'], "Invalid file type.")
+
+    @override_settings(CKEDITOR_UPLOAD_MAX_SIZE=1024)
+    def test_upload_too_large(self):
+        """Test uploads over the maximum size are rejected"""
+        self.client.login(username='foo', password='foobar')
+        upload = SimpleUploadedFile('big.txt', b'x' * 2048)
+        response = self.client.post(self.url, {'upload': upload})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(os.listdir(self.media_root), [])
+
+    def test_upload_missing(self):
+        """Test requests without upload are rejected"""
+        self.client.login(username='foo', password='foobar')
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 400)
+
+    def test_serve_blob(self):
+        """Test content addressed files are served with a long cache lifetime"""
+        self.client.login(username='foo', password='foobar')
+        upload = SimpleUploadedFile('notes.txt', b'Hello')
+        url = self.client.post(self.url, {'upload': upload}).json()['url']
+        with self.settings(DEBUG=True):
+            response = serve_media(RequestFactory().get(url), url[len('/media/'):],
+                                   document_root=self.media_root)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
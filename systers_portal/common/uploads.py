@@ -0,0 +1,181 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from PIL import Image, ImageOps
+
+from common.jobs import enqueue, process_upload
+from common.storage import blob_storage
+
+
+logger = logging.getLogger(__name__)
+
+# EXIF orientation tag and the transpositions restoring each orientation
+EXIF_ORIENTATION = 0x0112
+ORIENTATION_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+# image formats that are processed, animated GIFs are kept as uploaded
+PROCESSED_FORMATS = ('JPEG', 'PNG')
+PENDING_DIRECTORY = '.pending'
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """Upload handler that stops reading the request body as soon as the
+    received bytes go over `max_size`, instead of receiving the whole upload
+    and validating it afterwards. It must be placed before the handlers
+    storing the file."""
+    def __init__(self, max_size, request=None):
+        super(MaxSizeUploadHandler, self).__init__(request)
+        self.max_size = max_size
+        self.received = 0
+        self.exceeded = False
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        self.exceeded = content_length is not None and content_length > self.max_size
+        if self.exceeded:
+            # skip parsing, the body is not read at all
+            return QueryDict(encoding=encoding), MultiValueDict()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.exceeded = True
+            raise StopUpload(connection_reset=True)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def exif_transpose(image):
+    """Rotate and flip an image according to its EXIF orientation, so that it
+    is displayed the same way once the EXIF data is stripped.
+
+    :param image: PIL Image object
+    :return: PIL Image object
+    """
+    exif = image._getexif() if hasattr(image, '_getexif') else None
+    orientation = exif.get(EXIF_ORIENTATION) if exif else None
+    if orientation in ORIENTATION_TRANSPOSE:
+        return image.transpose(ORIENTATION_TRANSPOSE[orientation])
+    return image
+
+
+def get_thumb_path(path):
+    """Get the path of the thumbnail of an image, named the way the
+    ckeditor_uploader browser expects it
+
+    :param path: string image path
+    :return: string thumbnail path
+    """
+    return '{0}_thumb{1}'.format(*os.path.splitext(path))
+
+
+def process_image(source_path, target_path, max_dimension, thumbnail_size,
+                  quality):
+    """Downscale an uploaded image, strip its metadata and create its
+    thumbnail. The processed image is written to a temporary file and moved
+    to `target_path` at the end, so that `target_path` only exists once it is
+    complete. The thumbnail is written first.
+
+    :param source_path: string path of the uploaded image, removed at the end
+    :param target_path: string path of the processed image
+    :param max_dimension: integer maximum width and height in pixels
+    :param thumbnail_size: tuple (width, height) of the thumbnail
+    :param quality: integer JPEG quality
+    :return: string target_path
+    """
+    image = Image.open(source_path)
+    image_format = image.format
+    image = exif_transpose(image)
+    if image_format == 'JPEG' and image.mode not in ('L', 'RGB'):
+        image = image.convert('RGB')
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    thumbnail = ImageOps.fit(image, thumbnail_size, Image.LANCZOS)
+    thumbnail.save(get_thumb_path(target_path), format=image_format)
+
+    partial_path = '{0}.partial'.format(target_path)
+    image.save(partial_path, format=image_format, quality=quality, optimize=True)
+    os.replace(partial_path, target_path)
+    os.remove(source_path)
+    return target_path
+
+
+def get_pending_name(blob_name):
+    """Get the storage name under which an uploaded image waits to be processed
+
+    :param blob_name: string storage name of the processed image
+    :return: string storage name of the uploaded image
+    """
+    return os.path.join(settings.CKEDITOR_UPLOAD_PATH, PENDING_DIRECTORY,
+                        os.path.basename(blob_name))
+
+
+def schedule_image_processing(pending_name, blob_name):
+    """Queue the processing of an uploaded image, unless it is already queued
+
+    :param pending_name: string storage name of the uploaded image
+    :param blob_name: string storage name of the processed image
+    :return: Job object, or None if the image was processed right away or was
+             already queued
+    """
+    return enqueue(process_upload, pending_name, blob_name,
+                   dedup_key='process_upload:{0}'.format(pending_name))
+
+
+def is_readable_image(path):
+    """Check an image can be decoded, e.g. it is not truncated
+
+    :param path: string path of the image
+    :return: boolean
+    """
+    try:
+        with Image.open(path) as image:
+            image.load()
+    except (IOError, SyntaxError):
+        return False
+    return True
+
+
+def process_pending_image(pending_name, blob_name):
+    """Process an uploaded image into its blob, see `process_image`. An image
+    which can't be decoded won't be processed by a retry either, its pending
+    file is removed and its reference is dropped from the blob index, so that
+    the next upload of the same content starts over. The other errors are
+    raised and the job is retried, the pending file is kept until then.
+
+    :param pending_name: string storage name of the uploaded image
+    :param blob_name: string storage name of the processed image
+    :return: True if the blob is stored, False otherwise
+    """
+    if blob_storage.exists(blob_name):
+        # processed by the job of a concurrent upload of the same content
+        default_storage.delete(pending_name)
+        return True
+    if not default_storage.exists(pending_name):
+        return False
+    source_path = default_storage.path(pending_name)
+    if not is_readable_image(source_path):
+        logger.error("The upload %s is not a readable image", blob_name)
+        default_storage.delete(pending_name)
+        blob_storage.delete(blob_name)
+        return False
+    process_image(source_path, blob_storage.path(blob_name),
+                  settings.CKEDITOR_IMAGE_MAX_DIMENSION,
+                  getattr(settings, 'THUMBNAIL_SIZE', (75, 75)),
+                  getattr(settings, 'IMAGE_QUALITY', 85))
+    return True
@@ -0,0 +1,195 @@
+import time
+from html import escape
+from html.parser import HTMLParser
+
+from django.db import transaction
+from django.utils.text import Truncator
+
+
+# tags and attributes produced by the CKEditor toolbar configured in settings
+ALLOWED_TAGS = {
+    'a', 'abbr', 'address', 'b', 'blockquote', 'br', 'caption', 'cite',
+    'code', 'del', 'div', 'em', 'font', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'hr', 'i', 'img', 'ins', 'li', 'ol', 'p', 'pre', 's', 'small', 'span',
+    'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th',
+    'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    '*': {'class', 'dir', 'id', 'style', 'title'},
+    'a': {'href', 'name', 'target'},
+    'font': {'color', 'face', 'size'},
+    'img': {'alt', 'height', 'src', 'width'},
+    'ol': {'start', 'type'},
+    'table': {'align', 'border', 'cellpadding', 'cellspacing', 'summary'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto', 'ftp'}
+# tags dropped together with their content
+DROPPED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'applet',
+                'noscript', 'template'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# tags that separate words when the HTML is converted to plain text
+BLOCK_TAGS = {
+    'address', 'blockquote', 'br', 'caption', 'div', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'hr', 'li', 'ol', 'p', 'pre', 'table', 'td', 'th', 'tr', 'ul',
+}
+
+
+def is_safe_url(url):
+    """Check if the URL of a link or of an image is safe to be rendered
+
+    :param url: string URL
+    :return: True if the URL is relative or has an allowed scheme, False
+             otherwise
+    """
+    url = "".join(url.split()).lower()
+    if ':' not in url.split('/', 1)[0]:
+        return True
+    return url.split(':', 1)[0] in ALLOWED_URL_SCHEMES
+
+
+def is_safe_style(style):
+    """Check if an inline style is safe to be rendered
+
+    :param style: string style attribute value
+    :return: True if the style can't load or execute anything, False otherwise
+    """
+    style = "".join(style.split()).lower()
+    return not any(token in style for token in ('expression', 'url(',
+                                                'javascript:', '@import'))
+
+
+class RichTextParser(HTMLParser):
+    """HTML parser that builds at the same time a sanitized copy of the HTML
+    and its plain text version."""
+    def __init__(self):
+        super(RichTextParser, self).__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.dropped_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropped_depth += 1
+            return
+        if self.dropped_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES['*'] | ALLOWED_ATTRIBUTES.get(tag, set())
+        html_attrs = []
+        for name, value in attrs:
+            value = value or ''
+            if name not in allowed:
+                continue
+            if name in URL_ATTRIBUTES and not is_safe_url(value):
+                continue
+            if name == 'style' and not is_safe_style(value):
+                continue
+            html_attrs.append(' {0}="{1}"'.format(name, escape(value)))
+        self.html.append('<{0}{1}>'.format(tag, ''.join(html_attrs)))
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropped_depth = max(self.dropped_depth - 1, 0)
+            return
+        if self.dropped_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if tag not in self.open_tags:
+            return
+        # close the tags left open inside the closed one
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append('</{0}>'.format(open_tag))
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropped_depth:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super(RichTextParser, self).close()
+        while self.open_tags:
+            self.html.append('</{0}>'.format(self.open_tags.pop()))
+
+
+def render_rich_text(html, excerpt_words):
+    """Derive from a rich text HTML the artifacts needed to display it
+
+    :param html: string HTML produced by the rich text editor
+    :param excerpt_words: number of words of the excerpt
+    :return: tuple (excerpt, body_html, word_count) where excerpt is a plain
+             text string, body_html the sanitized HTML string and word_count
+             the number of words of the text
+    """
+    parser = RichTextParser()
+    parser.feed(html or '')
+    parser.close()
+    words = "".join(parser.text).split()
+    excerpt = Truncator(" ".join(words)).words(excerpt_words, truncate=' ...')
+    return excerpt, "".join(parser.html), len(words)
+
+
+def render_stored_rich_text(model, rich_text_field, excerpt_words, batch_size=500):
+    """Render the stored artifacts of all the objects of a model in primary
+    key order, one batch per transaction. The objects are updated with a
+    queryset update so that `auto_now` dates are left untouched. Since only
+    the field names are needed, the historical models of the migrations can
+    be rendered too.
+
+    :param model: model class with the rich text artifact fields
+    :param rich_text_field: string name of the rich text field
+    :param excerpt_words: number of words of the excerpt
+    :param batch_size: number of objects per batch
+    :return: number of rendered objects
+    """
+    count = 0
+    last_pk = 0
+    queryset = model._default_manager.order_by('pk').values_list('pk', rich_text_field)
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return count
+        with transaction.atomic():
+            for pk, html in batch:
+                excerpt, body_html, word_count = render_rich_text(html, excerpt_words)
+                model._default_manager.filter(pk=pk).update(
+                    excerpt=excerpt, body_html=body_html, word_count=word_count)
+        count += len(batch)
+        last_pk = batch[-1][0]
+
+
+def run_in_batches(run_batch, batch_size, pause=0):
+    """Process items in batches until a batch is not full, so that no single
+    query or transaction handles all of them
+
+    :param run_batch: function processing at most the integer batch size of
+                      items and returning the integer number it processed
+    :param batch_size: integer maximum number of items per batch
+    :param pause: float seconds to wait between two batches
+    :return: integer number of processed items
+    """
+    count = 0
+    while True:
+        processed = run_batch(batch_size)
+        count += processed
+        if processed < batch_size:
+            return count
+        time.sleep(pause)
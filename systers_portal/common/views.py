@@ -1,6 +1,24 @@
-from django.views.generic import TemplateView
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.html import escape, escapejs
+from django.views.generic import TemplateView, View
 from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.static import serve
 from allauth.account.views import LogoutView
+from braces.views import LoginRequiredMixin
+from PIL import Image
+
+from common.constants import (UPLOAD_INVALID_TYPE_MSG, UPLOAD_MISSING_MSG,
+                              UPLOAD_TOO_LARGE_MSG)
+from common.storage import BLOB_DIRECTORY, blob_storage, get_content_digest
+from common.uploads import (MaxSizeUploadHandler, PROCESSED_FORMATS, get_pending_name,
+                            schedule_image_processing)
 
 
 class IndexView(TemplateView):
@@ -27,3 +45,104 @@ class Logout(LogoutView):
 
     def post(self, *args, **kwargs):
         return super().post(*args, **kwargs)
+
+
+def serve_media(request, path, document_root=None):
+    """Serve media files in development. Content addressed files never
+    change, they are served with a one year immutable cache lifetime."""
+    response = serve(request, path, document_root=document_root)
+    if path.startswith(BLOB_DIRECTORY + '/'):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+class CKEditorUploadView(LoginRequiredMixin, View):
+    """Upload a file from CKEditor. The upload is streamed to a temporary file
+    and stopped as soon as it goes over `CKEDITOR_UPLOAD_MAX_SIZE`. Files are
+    kept by the content addressed storage, so an upload of a content that is
+    already stored reuses it. Images are downscaled, stripped of their
+    metadata and thumbnailed by a background job, the response is sent right
+    away with the URL the processed image will have once it is ready.
+
+    The uploads are shared by all the users, there is no file browser
+    listing the uploads of a user."""
+    http_method_names = ['post']
+    raise_exception = True
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        return super(CKEditorUploadView, self).dispatch(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        size_handler = MaxSizeUploadHandler(settings.CKEDITOR_UPLOAD_MAX_SIZE, request)
+        request.upload_handlers = [size_handler, TemporaryFileUploadHandler(request)]
+        uploaded_file = request.FILES.get('upload')
+        if size_handler.exceeded:
+            max_size = settings.CKEDITOR_UPLOAD_MAX_SIZE // (1024 * 1024)
+            return self.error_response(UPLOAD_TOO_LARGE_MSG.format(max_size), status=413)
+        if uploaded_file is None:
+            return self.error_response(UPLOAD_MISSING_MSG)
+
+        image_format = self.get_image_format(uploaded_file)
+        if image_format is None and not getattr(settings, 'CKEDITOR_ALLOW_NONIMAGE_FILES',
+                                                True):
+            return self.error_response(UPLOAD_INVALID_TYPE_MSG)
+
+        if image_format in PROCESSED_FORMATS:
+            filename = self.store_image(uploaded_file)
+        else:
+            filename = blob_storage.save(uploaded_file.name, uploaded_file)
+        return self.success_response(uploaded_file.name, blob_storage.url(filename))
+
+    @staticmethod
+    def store_image(uploaded_file):
+        """Store an uploaded image under the digest of the uploaded content.
+        The image is processed until this content is stored. An image whose
+        processing failed or is still pending is queued again, the queued
+        jobs are not duplicated.
+
+        :param uploaded_file: UploadedFile object
+        :return: string storage name of the processed image
+        """
+        digest = get_content_digest(uploaded_file)
+        filename = blob_storage.get_blob_name(
+            digest, os.path.splitext(uploaded_file.name)[1])
+        blob, created = blob_storage.index_blob(digest, filename, uploaded_file.size)
+        if not blob_storage.exists(blob.name):
+            pending_name = get_pending_name(blob.name)
+            if not default_storage.exists(pending_name):
+                pending_name = default_storage.save(pending_name, uploaded_file)
+            schedule_image_processing(pending_name, blob.name)
+        return blob.name
+
+    @staticmethod
+    def get_image_format(uploaded_file):
+        """Get the image format of an uploaded file, reading only its header
+
+        :param uploaded_file: UploadedFile object
+        :return: string PIL image format or None if the file is not an image
+        """
+        try:
+            image_format = Image.open(uploaded_file).format
+        except IOError:
+            image_format = None
+        uploaded_file.seek(0)
+        return image_format
+
+    def success_response(self, filename, url):
+        ck_func_num = self.request.GET.get('CKEditorFuncNum')
+        if ck_func_num:
+            return HttpResponse(
+                "<script type='text/javascript'>window.parent.CKEDITOR.tools."
+                "callFunction({0}, '{1}');</script>".format(
+                    escape(ck_func_num), escapejs(url)))
+        return JsonResponse({'uploaded': 1, 'fileName': filename, 'url': url})
+
+    def error_response(self, message, status=400):
+        ck_func_num = self.request.GET.get('CKEditorFuncNum')
+        if ck_func_num:
+            return HttpResponse(
+                "<script type='text/javascript'>window.parent.CKEDITOR.tools."
+                "callFunction({0}, '', '{1}');</script>".format(
+                    escape(ck_func_num), escapejs(message)))
+        return JsonResponse({'uploaded': 0, 'error': {'message': message}}, status=status)
@@ -5,6 +5,8 @@ from community.models import Community, CommunityPage, RequestCommunity
 
 
 class CommunityAdmin(GuardedModelAdmin):
+    raw_id_fields = ('admin', 'members')
+
     def save_model(self, request, obj, form, change):
         """Override this method in order to be able to add the community admin
         to members list via admin panel."""
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class CommunityConfig(AppConfig):
+    name = 'community'
+
+    def ready(self):
+        import community.signals  # noqa
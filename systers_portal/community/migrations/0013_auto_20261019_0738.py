@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 07:38
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0012_requestcommunity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='communitypage',
+            name='date_modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date last modified'),
+        ),
+    ]
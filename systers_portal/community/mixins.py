@@ -1,7 +1,11 @@
+from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
+from common.cache import get_object_namespace, get_or_set_namespaced
+from common.cdn import get_surrogate_key
+from common.resolvers import resolve_object
 from community.constants import DEFAULT_COMMUNITY_ACTIVE_PAGE
-from community.models import CommunityPage
+from community.models import Community, CommunityPage
 
 
 class CommunityMenuMixin(object):
@@ -17,8 +21,11 @@ class CommunityMenuMixin(object):
     def get_context_data(self, **kwargs):
         context = super(CommunityMenuMixin, self).get_context_data(**kwargs)
         community = self.get_community()
-        pages = CommunityPage.objects.filter(community=community).\
-            order_by('order')
+        pages = get_or_set_namespaced(
+            get_object_namespace(Community, community.pk), ('pages',),
+            lambda: list(CommunityPage.objects.filter(
+                community=community).order_by('order').only('slug', 'title')),
+            settings.OBJECT_CACHE_TIMEOUT)
         context['pages'] = pages
 
         page_slug = self.get_page_slug()
@@ -46,6 +53,19 @@ class CommunityMenuMixin(object):
             )
         return self.community
 
+    def get_surrogate_keys(self):
+        """Get the surrogate key of the community, see
+        common.mixins.PublicCacheMixin
+
+        :return: list of string surrogate keys
+        """
+        community = getattr(self, 'object', None)
+        if not isinstance(community, Community):
+            # not fetched when answering a conditional request
+            community = resolve_object(self.request, Community,
+                                       slug=self.kwargs['slug'])
+        return [get_surrogate_key(Community, community.pk)]
+
     def get_page_slug(self):
         """Get a community page.
 
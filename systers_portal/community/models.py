@@ -63,8 +63,9 @@ class Community(models.Model):
     def __init__(self, *args, **kwargs):
         super(Community, self).__init__(*args, **kwargs)
         self.__original_name = self.name
-        if self.admin_id is not None:
-            self.__original_admin = self.admin
+        # only the id, fetching the admin of every loaded community would
+        # cost a query per row
+        self.__original_admin_id = self.admin_id
 
     @property
     def original_name(self):
@@ -72,7 +73,13 @@ class Community(models.Model):
 
     @property
     def original_admin(self):
-        return self.__original_admin
+        """SystersUser object of the admin when the community was loaded, or
+        None for a new community"""
+        if self.__original_admin_id is None:
+            return None
+        if self.__original_admin_id == self.admin_id:
+            return self.admin
+        return SystersUser.objects.get(pk=self.__original_admin_id)
 
     def get_absolute_url(self):
         """Absolute url to a Community main page"""
@@ -90,7 +97,7 @@ class Community(models.Model):
 
         :return: True if community changed admin, False otherwise
         """
-        return self.admin != self.original_admin
+        return self.admin_id != self.__original_admin_id
 
     def add_member(self, systers_user):
         """Add community member
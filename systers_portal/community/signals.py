@@ -3,7 +3,9 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.shortcuts import get_object_or_404
 
+from common.cache import bump_namespace, get_object_namespace
 from community.constants import COMMUNITY_ADMIN
+from community.models import Community, CommunityPage
 from community.utils import (create_groups, assign_permissions, remove_groups,
                              rename_groups)
 from community.permissions import (groups_templates, group_permissions)
@@ -43,3 +45,18 @@ def manage_community_groups(sender, instance, created, **kwargs):
 def remove_community_groups(sender, instance, **kwargs):
     """Remove user groups for a particular Community instance"""
     remove_groups(instance.name)
+
+
+@receiver(post_save, sender=Community, dispatch_uid="invalidate_community_cache")
+@receiver(post_delete, sender=Community, dispatch_uid="invalidate_deleted_community_cache")
+def invalidate_community_cache(sender, instance, **kwargs):
+    """Invalidate the data cached in the namespace of the community"""
+    bump_namespace(get_object_namespace(Community, instance.pk))
+
+
+@receiver(post_save, sender=CommunityPage, dispatch_uid="invalidate_page_community_cache")
+@receiver(post_delete, sender=CommunityPage,
+          dispatch_uid="invalidate_deleted_page_community_cache")
+def invalidate_page_community_cache(sender, instance, **kwargs):
+    """Invalidate the data cached in the namespace of the community of the page"""
+    bump_namespace(get_object_namespace(Community, instance.community_id))
@@ -490,6 +490,26 @@ class CommunityPageViewTestCase(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.context['active_page'], 'page2')
 
+    def test_get_community_page_view_conditional_get(self):
+        """Test conditional GET requests to a community page"""
+        url = reverse('view_community_page', kwargs={'slug': 'foo',
+                                                     'page_slug': 'page'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        page = CommunityPage.objects.get(slug="page")
+        page.content = "New content"
+        page.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "New content")
+
     def test_join_button_snippet(self):
         """Test the rendering of join button snippet"""
         url = reverse('view_community_page', kwargs={'slug': 'foo',
@@ -815,6 +835,25 @@ class CommunityUsersViewTestCase(TestCase):
         self.assertContains(response, 'Remove')
         self.assertContains(response, 'Transfer ownership')
 
+    def test_community_users_export_view(self):
+        """Test exporting the community members requires the permissions to
+        list them"""
+        url = reverse('export_community_users', kwargs={'slug': 'foo', 'format': 'csv'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        self.user.email = 'foo@test.com'
+        self.user.save()
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename="foo-users.csv"')
+        lines = b"".join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0], "username,first_name,last_name,email,date_joined")
+        self.assertTrue(lines[1].startswith("foo,,,foo@test.com,"))
+        self.assertEqual(len(lines), 2)
+
 
 class UserPermissionGroupsViewTestCase(TestCase):
     def setUp(self):
@@ -4,6 +4,7 @@ from community.views import (CommunityLandingView, EditCommunityProfileView,
                              ViewCommunityProfileView, CommunityPageView,
                              AddCommunityPageView, EditCommunityPageView,
                              DeleteCommunityPageView, CommunityUsersView,
+                             CommunityUsersExportView,
                              UserPermissionGroupsView, RequestCommunityView,
                              NewCommunityRequestsListView, ApproveRequestCommunityView,
                              RejectRequestCommunityView, ViewCommunityRequestView,
@@ -41,6 +42,8 @@ urlpatterns = [
         CommunityPageView.as_view(), name="view_community_page"),
     url(r'^(?P<slug>[\w-]+)/users/$', CommunityUsersView.as_view(),
         name="community_users"),
+    url(r'^(?P<slug>[\w-]+)/users/export/(?P<format>csv|jsonl)/$',
+        CommunityUsersExportView.as_view(), name="export_community_users"),
     url(r'^(?P<slug>[\w-]+)/user/(?P<username>[\w.@+-]+)/permissions/$',
         UserPermissionGroupsView.as_view(), name="user_permission_groups"),
 ]
@@ -10,7 +10,10 @@ from community.constants import (ORDER_NULL_MSG, ORDER_ALREADY_EXISTS_MSG,
                                  SLUG_ALREADY_EXISTS_MSG, ORDER_NULL,
                                  SLUG_ALREADY_EXISTS, ORDER_ALREADY_EXISTS, OK,
                                  SUCCESS_MSG)
-from common.mixins import UserDetailsMixin
+from common.cdn import get_surrogate_key
+from common.mixins import (ConditionalGetMixin, PublicCacheMixin, StreamingExportMixin,
+                           UserDetailsMixin)
+from common.resolvers import resolve_object
 from community.forms import (EditCommunityForm, AddCommunityPageForm,
                              EditCommunityPageForm, PermissionGroupsForm,
                              RequestCommunityForm, EditCommunityRequestForm,
@@ -34,8 +37,7 @@ class RequestCommunityView(LoginRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         """Add the communities requested by the user to the context"""
         context = super(RequestCommunityView, self).get_context_data(**kwargs)
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = resolve_object(self.request, SystersUser, user=self.request.user)
         self.community_requests = RequestCommunity.objects.filter(
             user=self.systersuser)
         context['community_requests'] = self.community_requests
@@ -76,10 +78,9 @@ class ViewCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to view the community request.
         The permission holds true for superusers."""
-        self.community_request = get_object_or_404(
-            RequestCommunity, slug=self.kwargs['slug'])
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.community_request = resolve_object(
+            self.request, RequestCommunity, slug=self.kwargs['slug'])
+        self.systersuser = resolve_object(self.request, SystersUser, user=self.request.user)
         return self.systersuser == self.community_request.user or request.user.is_superuser
 
 
@@ -105,10 +106,9 @@ class EditCommunityRequestView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit the community request.
         The permission holds true for superusers."""
-        self.community_request = get_object_or_404(
-            RequestCommunity, slug=self.kwargs['slug'])
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.community_request = resolve_object(
+            self.request, RequestCommunity, slug=self.kwargs['slug'])
+        self.systersuser = resolve_object(self.request, SystersUser, user=self.request.user)
         return self.systersuser == self.community_request.user or request.user.is_superuser
 
 
@@ -125,8 +125,7 @@ class ApproveRequestCommunityView(LoginRequiredMixin, StaffuserRequiredMixin,
         * Sets the requestor as the community admin
         * Sets the RequestCommunity object's is_approved field to True.
         """
-        community_request = get_object_or_404(
-            RequestCommunity, slug=self.kwargs['slug'])
+        community_request = resolve_object(self.request, RequestCommunity, slug=self.kwargs['slug'])
         new_community = Community()
         community_request_fields = community_request.get_fields()
         self.order_community_request = community_request.order
@@ -140,7 +139,7 @@ class ApproveRequestCommunityView(LoginRequiredMixin, StaffuserRequiredMixin,
 
         self.systersuser = community_request.user
         new_community.admin = self.systersuser
-        self.admin = get_object_or_404(SystersUser, user=self.request.user)
+        self.admin = resolve_object(self.request, SystersUser, user=self.request.user)
         status, message, level = self.process_request()
         if status == OK:
             new_community.save()
@@ -190,8 +189,7 @@ class RejectRequestCommunityView(LoginRequiredMixin, StaffuserRequiredMixin, Del
         """Supply the success URL in case of successful submit"""
         messages.add_message(self.request, messages.INFO,
                              "Community request successfullly rejected!")
-        community_request = get_object_or_404(
-            RequestCommunity, slug=self.kwargs['slug'])
+        community_request = resolve_object(self.request, RequestCommunity, slug=self.kwargs['slug'])
         community_request.delete()
         return reverse('unapproved_community_requests')
 
@@ -207,8 +205,7 @@ class NewCommunityRequestsListView(LoginRequiredMixin, StaffuserRequiredMixin, L
         """Add RequestCommunity object to the context"""
         context = super(NewCommunityRequestsListView,
                         self).get_context_data(**kwargs)
-        self.systersuser = get_object_or_404(
-            SystersUser, user=self.request.user)
+        self.systersuser = resolve_object(self.request, SystersUser, user=self.request.user)
         context['requestor'] = self.systersuser
         return context
 
@@ -231,7 +228,7 @@ class CommunityLandingView(RedirectView):
         * if a Community has at least one page, redirect to the page with the
           lowest order (aka first page)
         """
-        community = get_object_or_404(Community, slug=kwargs['slug'])
+        community = resolve_object(self.request, Community, slug=kwargs['slug'])
         community_pages = CommunityPage.objects.filter(
             community=community).order_by('order')
         if community_pages.exists():
@@ -244,11 +241,15 @@ class CommunityLandingView(RedirectView):
                            kwargs={'slug': community.slug})
 
 
-class ViewCommunityProfileView(DetailView):
+class ViewCommunityProfileView(PublicCacheMixin, DetailView):
     """Community profile view"""
     template_name = "community/view_profile.html"
     model = Community
 
+    def get_surrogate_keys(self):
+        """Get the surrogate key of the community"""
+        return [get_surrogate_key(Community, self.object.pk)]
+
 
 class EditCommunityProfileView(LoginRequiredMixin, PermissionRequiredMixin,
                                UpdateView):
@@ -268,15 +269,28 @@ class EditCommunityProfileView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to change community
         profile. The permission holds true for superusers."""
-        community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        community = resolve_object(self.request, Community, slug=self.kwargs['slug'])
         return request.user.has_perm("change_community", community)
 
 
-class CommunityPageView(UserDetailsMixin, CommunityMenuMixin, DetailView):
+class CommunityPageView(PublicCacheMixin, ConditionalGetMixin, UserDetailsMixin,
+                        CommunityMenuMixin, DetailView):
     """Community page view"""
     template_name = "community/page.html"
     model = Community
 
+    def get_validators(self):
+        """Compute the page validators from the CommunityPage modification
+        date"""
+        page = CommunityPage.objects.filter(
+            community__slug=self.kwargs['slug'],
+            slug=self.kwargs['page_slug']).\
+            values_list('pk', 'date_modified').first()
+        if page is None:
+            return None
+        pk, date_modified = page
+        return self.make_etag("page", pk, date_modified), date_modified
+
     def get_context_data(self, **kwargs):
         """Add to the context CommunityPage object"""
         context = super(CommunityPageView, self).get_context_data(**kwargs)
@@ -325,7 +339,7 @@ class AddCommunityView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     def check_permissions(self, request):
         """Check if the request user has the permissions to add a new community.
         The permission holds true for superusers."""
-        self.systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.systersuser = resolve_object(request, SystersUser, user=request.user)
         return request.user.has_perm("add_community")
 
 
@@ -365,7 +379,7 @@ class AddCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to add new community
         page. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = resolve_object(self.request, Community, slug=self.kwargs['slug'])
         return request.user.has_perm("add_community_page", self.community)
 
 
@@ -395,7 +409,7 @@ class EditCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to edit community
         news. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = resolve_object(self.request, Community, slug=self.kwargs['slug'])
         return request.user.has_perm("change_community_page",
                                      self.community)
 
@@ -426,7 +440,7 @@ class DeleteCommunityPageView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permissions to delete community
         page. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = resolve_object(self.request, Community, slug=self.kwargs['slug'])
         return request.user.has_perm("delete_community_page", self.community)
 
 
@@ -453,7 +467,7 @@ class CommunityUsersView(LoginRequiredMixin, PermissionRequiredMixin,
         """Check if the request user has the permission to manage community
         users (add, change, delete). The permission holds true for
         superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = resolve_object(self.request, Community, slug=self.kwargs['slug'])
         add_perm = request.user.has_perm("add_community_systersuser",
                                          self.community)
         change_perm = request.user.has_perm("change_community_systersuser",
@@ -463,6 +477,19 @@ class CommunityUsersView(LoginRequiredMixin, PermissionRequiredMixin,
         return add_perm and change_perm and delete_perm
 
 
+class CommunityUsersExportView(StreamingExportMixin, CommunityUsersView):
+    """Export Community users as CSV or JSON Lines"""
+    export_fields = (('username', 'user__username'), ('first_name', 'user__first_name'),
+                     ('last_name', 'user__last_name'), ('email', 'user__email'),
+                     ('date_joined', 'user__date_joined'))
+
+    def get_export_name(self):
+        return "{0}-users".format(self.community.slug)
+
+    def get_export_queryset(self):
+        return self.get_queryset().order_by('pk')
+
+
 class UserPermissionGroupsView(LoginRequiredMixin, PermissionRequiredMixin,
                                FormView):
     """Manage user permission groups"""
@@ -503,6 +530,6 @@ class UserPermissionGroupsView(LoginRequiredMixin, PermissionRequiredMixin,
     def check_permissions(self, request):
         """Check if the request user has the permission to change user
         permission groups. The permission holds true for superusers."""
-        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        self.community = resolve_object(self.request, Community, slug=self.kwargs['slug'])
         return request.user.has_perm("change_community_systersuser",
                                      self.community)
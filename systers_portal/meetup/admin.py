@@ -1,9 +1,46 @@
 from django.contrib import admin
 
+from common.admin import IndexedSearchAdmin
 from meetup.models import MeetupLocation, Meetup, Rsvp, SupportRequest
+from meetup.utils import save_rsvp
 
 
-admin.site.register(MeetupLocation)
-admin.site.register(Meetup)
-admin.site.register(Rsvp)
-admin.site.register(SupportRequest)
+class MeetupLocationAdmin(IndexedSearchAdmin):
+    list_display = ('name', 'slug', 'location')
+    list_select_related = ('location',)
+    raw_id_fields = ('location', 'organizers', 'members', 'join_requests')
+    search_fields = ('name', 'slug')
+
+
+class MeetupAdmin(IndexedSearchAdmin):
+    list_display = ('title', 'meetup_location', 'date', 'created_by')
+    list_filter = ('meetup_location',)
+    list_select_related = ('meetup_location', 'created_by__user')
+    raw_id_fields = ('meetup_location', 'created_by')
+    search_fields = ('slug',)
+
+
+class RsvpAdmin(IndexedSearchAdmin):
+    list_display = ('user', 'meetup', 'coming', 'plus_one', 'waitlisted', 'last_updated')
+    list_filter = ('coming', 'plus_one', 'waitlisted')
+    list_select_related = ('user__user', 'meetup')
+    raw_id_fields = ('user', 'meetup')
+    readonly_fields = ('waitlisted',)
+    search_fields = ('user__user__username', 'meetup__slug')
+
+    def save_model(self, request, obj, form, change):
+        save_rsvp(obj)
+
+
+class SupportRequestAdmin(IndexedSearchAdmin):
+    list_display = ('volunteer', 'meetup', 'is_approved')
+    list_filter = ('is_approved',)
+    list_select_related = ('volunteer__user', 'meetup')
+    raw_id_fields = ('volunteer', 'meetup')
+    search_fields = ('volunteer__user__username', 'meetup__slug')
+
+
+admin.site.register(MeetupLocation, MeetupLocationAdmin)
+admin.site.register(Meetup, MeetupAdmin)
+admin.site.register(Rsvp, RsvpAdmin)
+admin.site.register(SupportRequest, SupportRequestAdmin)
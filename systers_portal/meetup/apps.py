@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class MeetupConfig(AppConfig):
+    name = 'meetup'
+
+    def ready(self):
+        import meetup.signals  # noqa
@@ -15,3 +15,48 @@ SLUG_ALREADY_EXISTS_MSG = "Slug {0} already exists, please choose a different sl
 NAME_ALREADY_EXISTS_MSG = "Name {0} already exists, please choose a different name."
 SUCCESS_MSG = "Meetup Location created successfully!"
 ERROR_MSG = "Something went wrong. Please try again"
+
+# notification email subjects
+NEW_ORGANIZER_SUBJECT = "You are now an organizer of {0}"
+RSVP_PROMOTED_SUBJECT = "You have a seat at {0}"
+
+# RSVP status
+RSVP_OK = "rsvp_ok"
+RSVP_WAITLISTED = "rsvp_waitlisted"
+RSVP_PLUS_ONE_FULL = "rsvp_plus_one_full"
+
+# messages about RSVPs
+RSVP_OK_MSG = "Success"
+RSVP_WAITLISTED_MSG = "The meetup is full, you are on the waitlist. You will get an email if a " \
+                      "seat becomes available."
+RSVP_PLUS_ONE_FULL_MSG = "The meetup is full, you keep your seat but there is no seat left for " \
+                         "your plus one."
+RSVP_MESSAGES = {
+    RSVP_OK: RSVP_OK_MSG,
+    RSVP_WAITLISTED: RSVP_WAITLISTED_MSG,
+    RSVP_PLUS_ONE_FULL: RSVP_PLUS_ONE_FULL_MSG,
+}
+
+# tabs of the list of RSVPs
+GOING = "going"
+PLUS_ONE = "plus_one"
+NOT_GOING = "not_going"
+RSVP_TABS = (
+    (GOING, "Going"),
+    (PLUS_ONE, "Plus one"),
+    (NOT_GOING, "Not going"),
+)
+
+# cache namespace of the RSVPs of a meetup
+RSVPS_CACHE_NAMESPACE = "meetup:{0}:rsvps"
+
+# bulk moderation of join requests
+APPROVE = "approve"
+REJECT = "reject"
+JOIN_REQUEST_ACTION_CHOICES = (
+    (APPROVE, "Approve"),
+    (REJECT, "Reject"),
+)
+JOIN_REQUESTS_APPROVED_MSG = "{0} join requests approved."
+JOIN_REQUESTS_REJECTED_MSG = "{0} join requests rejected."
+NO_JOIN_REQUEST_SELECTED_MSG = "Select the join requests to approve or reject."
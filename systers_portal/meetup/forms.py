@@ -8,6 +8,8 @@ from common.helpers import SubmitCancelFormHelper
 from meetup.models import Meetup, MeetupLocation, Rsvp, SupportRequest, RequestMeetupLocation
 from users.models import SystersUser
 from common.models import Comment
+from meetup.constants import JOIN_REQUEST_ACTION_CHOICES, NO_JOIN_REQUEST_SELECTED_MSG
+from meetup.utils import save_rsvp
 
 
 class RequestMeetupLocationForm(ModelFormWithHelper):
@@ -40,7 +42,7 @@ class AddMeetupForm(ModelFormWithHelper):
     """
     class Meta:
         model = Meetup
-        fields = ('title', 'slug', 'date', 'time', 'venue', 'description')
+        fields = ('title', 'slug', 'date', 'time', 'venue', 'capacity', 'description')
         widgets = {'date': forms.DateInput(attrs={'type': 'text', 'class': 'datepicker'}),
                    'time': forms.TimeInput(attrs={'type': 'text', 'class': 'timepicker'})}
         helper_class = SubmitCancelFormHelper
@@ -82,7 +84,7 @@ class EditMeetupForm(ModelFormWithHelper):
     """Form to edit Meetup"""
     class Meta:
         model = Meetup
-        fields = ('title', 'slug', 'date', 'time', 'description', 'venue')
+        fields = ('title', 'slug', 'date', 'time', 'description', 'venue', 'capacity')
         widgets = {'date': forms.DateInput(attrs={'type': 'date', 'class': 'datepicker'}),
                    'time': forms.TimeInput(attrs={'type': 'time', 'class': 'timepicker'})}
         helper_class = SubmitCancelFormHelper
@@ -117,6 +119,35 @@ class AddMeetupLocationMemberForm(ModelFormWithHelper):
             raise forms.ValidationError("Enter username of an existing user")
 
 
+class JoinRequestsModerationForm(forms.Form):
+    """Form to approve or reject several join requests to a meetup location at once"""
+    action = forms.ChoiceField(choices=JOIN_REQUEST_ACTION_CHOICES)
+    join_requests = forms.ModelMultipleChoiceField(queryset=SystersUser.objects.none(),
+                                                   required=False)
+    select_all = forms.BooleanField(required=False)
+
+    def __init__(self, *args, **kwargs):
+        meetup_location = kwargs.pop('meetup_location')
+        super(JoinRequestsModerationForm, self).__init__(*args, **kwargs)
+        self.fields['join_requests'].queryset = meetup_location.join_requests.all()
+
+    def clean(self):
+        """Check that some join requests are selected"""
+        cleaned_data = super(JoinRequestsModerationForm, self).clean()
+        if not cleaned_data.get('select_all') and not cleaned_data.get('join_requests'):
+            raise forms.ValidationError(NO_JOIN_REQUEST_SELECTED_MSG)
+        return cleaned_data
+
+    def get_systersuser_ids(self):
+        """Get the ids of the users whose join requests are selected
+
+        :return: list of integer SystersUser ids, or None if all the join requests are selected
+        """
+        if self.cleaned_data['select_all']:
+            return None
+        return [systersuser.pk for systersuser in self.cleaned_data['join_requests']]
+
+
 class AddMeetupLocationForm(ModelFormWithHelper):
     """Form to create new Meetup Location"""
     class Meta:
@@ -181,12 +212,13 @@ class RsvpForm(ModelFormWithHelper):
         super(RsvpForm, self).__init__(*args, **kwargs)
 
     def save(self, commit=True):
-        """Override save to add user and meetup to the instance"""
+        """Override save to add user and meetup to the instance, and to take the seats of the
+        meetup. The RSVP status is kept in `status`."""
         instance = super(RsvpForm, self).save(commit=False)
         instance.user = SystersUser.objects.get(user=self.user)
         instance.meetup = self.meetup
         if commit:
-            instance.save()
+            self.status = save_rsvp(instance)
         return instance
 
 
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMessage
+from django.template.loader import render_to_string
+
+from common.jobs import job
+from meetup.constants import NEW_ORGANIZER_SUBJECT, RSVP_PROMOTED_SUBJECT
+from meetup.models import Meetup, MeetupLocation, Rsvp
+from users.models import SystersUser
+
+
+def get_email_context(meetup_location, systersuser):
+    return {
+        'meetup_location': meetup_location,
+        'systersuser': systersuser,
+        'domain': Site.objects.get_current().domain,
+        'protocol': getattr(settings, 'ACCOUNT_DEFAULT_HTTP_PROTOCOL', 'http'),
+    }
+
+
+@job
+def notify_new_organizer(meetup_location_pk, systersuser_pk):
+    """Notify a user that they were made an organizer of a meetup location
+
+    :param meetup_location_pk: primary key of the MeetupLocation object
+    :param systersuser_pk: primary key of the SystersUser made organizer
+    """
+    meetup_location = MeetupLocation.objects.get(pk=meetup_location_pk)
+    systersuser = SystersUser.objects.select_related('user').get(pk=systersuser_pk)
+    if not systersuser.user.email:
+        return
+    context = get_email_context(meetup_location, systersuser)
+    EmailMessage(NEW_ORGANIZER_SUBJECT.format(meetup_location),
+                 render_to_string('meetup/email/new_organizer.txt', context),
+                 to=[systersuser.user.email]).send()
+
+
+@job
+def notify_rsvp_promoted(meetup_pk, rsvp_pks):
+    """Notify the users whose RSVPs left the waitlist of a meetup that they have a seat
+
+    :param meetup_pk: primary key of the Meetup object
+    :param rsvp_pks: list of primary keys of the promoted Rsvp objects
+    """
+    meetup = Meetup.objects.select_related('meetup_location').get(pk=meetup_pk)
+    rsvps = Rsvp.objects.filter(pk__in=rsvp_pks, waitlisted=False).select_related('user__user')
+    for rsvp in rsvps:
+        if not rsvp.user.user.email:
+            continue
+        context = get_email_context(meetup.meetup_location, rsvp.user)
+        context['meetup'] = meetup
+        EmailMessage(RSVP_PROMOTED_SUBJECT.format(meetup),
+                     render_to_string('meetup/email/rsvp_promoted.txt', context),
+                     to=[rsvp.user.user.email]).send()
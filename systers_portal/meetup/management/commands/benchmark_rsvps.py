@@ -0,0 +1,99 @@
+import threading
+import time
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from meetup.models import Meetup, MeetupLocation, Rsvp
+from meetup.utils import save_rsvp
+from users.models import SystersUser
+
+
+class Command(BaseCommand):
+    help = "RSVP concurrently to a meetup created for the benchmark, as in the minute a " \
+           "popular meetup is announced. Report the throughput and check the meetup is not " \
+           "overbooked. The benchmark data is deleted afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rsvps', type=int, default=500,
+                            help="Number of RSVPs, one per user.")
+        parser.add_argument('--capacity', type=int, default=100,
+                            help="Capacity of the meetup.")
+        parser.add_argument('--threads', type=int, default=20,
+                            help="Number of concurrent clients, each with its own database "
+                                 "connection.")
+        parser.add_argument('--plus-one-every', type=int, default=4, dest='plus_one_every',
+                            help="One RSVP in this many comes with a plus one, 0 for none.")
+
+    def handle(self, *args, **options):
+        meetup, systersuser_ids = self.create_data(options['rsvps'], options['capacity'])
+        try:
+            every = options['plus_one_every']
+            rsvps = [Rsvp(user_id=pk, meetup_id=meetup.pk, plus_one=bool(every) and i % every == 0)
+                     for i, pk in enumerate(systersuser_ids)]
+            durations = []
+            start = time.perf_counter()
+            threads = [threading.Thread(target=self.rsvp, args=(
+                rsvps[i::options['threads']], durations)) for i in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            self.report(meetup, len(rsvps), elapsed, sorted(durations))
+        finally:
+            self.delete_data(meetup, systersuser_ids)
+
+    @staticmethod
+    def rsvp(rsvps, durations):
+        """Save RSVPs one after the other, on the database connection of the thread"""
+        try:
+            for rsvp in rsvps:
+                start = time.perf_counter()
+                save_rsvp(rsvp)
+                durations.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+
+    @transaction.atomic
+    def create_data(self, rsvps, capacity):
+        country = Country.objects.create(name='Benchmark', continent='EU')
+        city = City.objects.create(name='Benchmark', display_name='Benchmark', country=country)
+        meetup_location = MeetupLocation.objects.create(
+            name="Benchmark Systers", slug="benchmark-systers", location=city)
+        meetup = Meetup.objects.create(
+            title="Benchmark", slug="benchmark-rsvps", date=timezone.now().date(),
+            time=timezone.now().time(), meetup_location=meetup_location, capacity=capacity)
+        # bulk_create skips the post_save signal creating the SystersUser objects
+        User.objects.bulk_create([User(username='benchmark-rsvps-{0}'.format(i))
+                                  for i in range(rsvps)])
+        user_ids = list(User.objects.filter(username__startswith='benchmark-rsvps-').values_list(
+            'pk', flat=True))
+        SystersUser.objects.bulk_create([SystersUser(user_id=pk) for pk in user_ids])
+        return meetup, list(SystersUser.objects.filter(user_id__in=user_ids).values_list(
+            'pk', flat=True))
+
+    @transaction.atomic
+    def delete_data(self, meetup, systersuser_ids):
+        country = meetup.meetup_location.location.country
+        meetup.meetup_location.delete()
+        User.objects.filter(systersuser__pk__in=systersuser_ids).delete()
+        country.delete()
+
+    def report(self, meetup, rsvps, elapsed, durations):
+        meetup.refresh_from_db()
+        admitted = Rsvp.objects.filter(meetup=meetup, waitlisted=False)
+        seats = admitted.count() + admitted.filter(plus_one=True).count()
+        waitlisted = Rsvp.objects.filter(meetup=meetup, waitlisted=True).count()
+        self.stdout.write("{0} RSVPs in {1:.2f} s, {2:.0f} RSVPs/s, median {3:.1f} ms, "
+                          "max {4:.1f} ms".format(rsvps, elapsed, rsvps / elapsed,
+                                                  1000 * durations[len(durations) // 2],
+                                                  1000 * durations[-1]))
+        self.stdout.write("{0} of {1} seats taken, {2} RSVPs waitlisted".format(
+            meetup.seats_taken, meetup.capacity, waitlisted))
+        if seats != meetup.seats_taken or seats > meetup.capacity:
+            raise CommandError("Overbooked: {0} seats admitted, {1} seats counted, capacity "
+                               "{2}".format(seats, meetup.seats_taken, meetup.capacity))
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 07:38
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0013_auto_20180224_2101'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rsvp',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Last Update'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 08:53
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def count_seats_taken(apps, schema_editor):
+    """Count the seats taken by the existing RSVPs, plus ones included"""
+    Meetup = apps.get_model('meetup', 'Meetup')
+    Rsvp = apps.get_model('meetup', 'Rsvp')
+    seats = {}
+    for meetup_id, plus_one in Rsvp.objects.filter(coming=True).values_list(
+            'meetup_id', 'plus_one').iterator():
+        seats[meetup_id] = seats.get(meetup_id, 0) + (2 if plus_one else 1)
+    for meetup_id, seats_taken in seats.items():
+        Meetup.objects.filter(pk=meetup_id).update(seats_taken=seats_taken)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0015_auto_20261019_0745'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Maximum number of attendees, plus ones included. Leave empty for no limit.', null=True, verbose_name='Capacity'),
+        ),
+        migrations.AddField(
+            model_name='meetup',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Seats taken'),
+        ),
+        migrations.AddField(
+            model_name='rsvp',
+            name='waitlisted',
+            field=models.BooleanField(default=False, verbose_name='Waitlisted'),
+        ),
+        migrations.RunPython(count_seats_taken, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 09:07
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def count_comments(apps, schema_editor):
+    """Count the approved comments of the existing meetups and support requests"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Comment = apps.get_model('common', 'Comment')
+    for model_name in ('meetup', 'supportrequest'):
+        content_type = ContentType.objects.filter(app_label='meetup', model=model_name).first()
+        if content_type is None:
+            continue
+        model = apps.get_model('meetup', model_name)
+        counts = Comment.objects.filter(content_type=content_type, is_approved=True).order_by(
+            ).values_list('object_id').annotate(count=models.Count('pk'))
+        for object_id, count in counts:
+            model.objects.filter(pk=object_id).update(comment_count=count)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0005_auto_20261019_0804'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('meetup', '0016_rsvp_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetup',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of comments'),
+        ),
+        migrations.AddField(
+            model_name='supportrequest',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of comments'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
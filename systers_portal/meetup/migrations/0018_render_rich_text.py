@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from common.utils import render_stored_rich_text
+
+
+def render_rich_text(apps, schema_editor):
+    """Backfill the rich text artifacts of the objects saved before they existed"""
+    render_stored_rich_text(apps.get_model('meetup', 'MeetupLocation'), 'description', 50)
+    render_stored_rich_text(apps.get_model('meetup', 'Meetup'), 'description', 30)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0017_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(render_rich_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 10:18
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import meetup.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0018_render_rich_text'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rsvp',
+            name='meetup',
+            field=models.ForeignKey(on_delete=meetup.models.cascade_meetup_rsvps, to='meetup.Meetup', verbose_name='Meetup'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 11:25
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_waitlisted_at(apps, schema_editor):
+    """Keep the order of the existing waitlists, which were promoted by last update"""
+    Rsvp = apps.get_model('meetup', 'Rsvp')
+    Rsvp.objects.filter(waitlisted=True).update(waitlisted_at=F('last_updated'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetup', '0019_rsvp_meetup_on_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rsvp',
+            name='waitlisted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Waitlisted at'),
+        ),
+        migrations.RunPython(set_waitlisted_at, migrations.RunPython.noop),
+    ]
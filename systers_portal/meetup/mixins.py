@@ -1,5 +1,31 @@
 from django.core.exceptions import ImproperlyConfigured
 
+from common.cdn import get_surrogate_key
+from common.resolvers import resolve_object
+from meetup.models import Meetup, MeetupLocation
+
+
+def resolve_meetup_location(request, slug):
+    """Get the MeetupLocation of a slug, fetched at most once per request
+
+    :param request: HttpRequest object
+    :param slug: string slug of the MeetupLocation
+    :return: MeetupLocation object
+    :raises Http404: if there is no MeetupLocation with this slug
+    """
+    return resolve_object(request, MeetupLocation, slug=slug)
+
+
+def resolve_meetup(request, slug):
+    """Get the Meetup of a slug along with its MeetupLocation, fetched at most once per request
+
+    :param request: HttpRequest object
+    :param slug: string slug of the Meetup
+    :return: Meetup object
+    :raises Http404: if there is no Meetup with this slug
+    """
+    return resolve_object(request, Meetup.objects.select_related('meetup_location'), slug=slug)
+
 
 class MeetupLocationMixin(object):
     """Mixin to add information about MeetupLocation to context, as per the slug"""
@@ -11,13 +37,30 @@ class MeetupLocationMixin(object):
         return context
 
     def get_meetup_location(self):
-        """Get a MeetupLocaiton object.
+        """Get a MeetupLocaiton object, by default the one of the `slug` URL keyword argument.
 
         :return: MeetupLocaiton object
-        :raises ImproperlyConfigured: if MeetupLocaiton is set to None
+        :raises ImproperlyConfigured: if MeetupLocaiton is set to None and the URL has no slug
         """
         if self.meetup_location is None:
+            if 'slug' in getattr(self, 'kwargs', {}):
+                return resolve_meetup_location(self.request, self.kwargs['slug'])
             raise ImproperlyConfigured('{0} is missing a meetup_location. Define '
                                        '{0}.meetup_location or override {0}.get_meetup_location()'
                                        .format(self.__class__.__name__)
                                        )
+        return self.meetup_location
+
+    def get_surrogate_keys(self):
+        """Get the surrogate key of the MeetupLocation, see common.mixins.PublicCacheMixin
+
+        :return: list of string surrogate keys
+        """
+        return [get_surrogate_key(MeetupLocation, self.get_meetup_location().pk)]
+
+    def get_meetup(self):
+        """Get the Meetup of the `meetup_slug` URL keyword argument.
+
+        :return: Meetup object
+        """
+        return resolve_meetup(self.request, self.kwargs['meetup_slug'])
@@ -3,10 +3,11 @@ from cities_light.models import City
 from ckeditor.fields import RichTextField
 
 
+from common.models import Commentable, RichTextArtifacts
 from users.models import SystersUser
 
 
-class MeetupLocation(models.Model):
+class MeetupLocation(RichTextArtifacts):
     """Manage details of Meetup Location groups"""
     name = models.CharField(max_length=255, unique=True, verbose_name="Name")
     slug = models.SlugField(max_length=150, unique=True, verbose_name="Slug")
@@ -25,6 +26,8 @@ class MeetupLocation(models.Model):
                                            verbose_name="Join Requests",
                                            blank=True)
 
+    rich_text_field = 'description'
+
     class Meta:
         permissions = (
             ('add_meetup_location_member', 'Add meetup location member'),
@@ -82,7 +85,7 @@ class RequestMeetupLocation(models.Model):
         return self.name
 
 
-class Meetup(models.Model):
+class Meetup(RichTextArtifacts, Commentable):
     """Manage details of Meetups of MeetupLocations"""
     title = models.CharField(max_length=50, verbose_name="Title",)
     slug = models.SlugField(max_length=50, unique=True, verbose_name="Slug")
@@ -93,17 +96,49 @@ class Meetup(models.Model):
     meetup_location = models.ForeignKey(MeetupLocation, verbose_name="Meetup Location")
     created_by = models.ForeignKey(SystersUser, null=True, verbose_name="Created By")
     last_updated = models.DateTimeField(auto_now=True, verbose_name="Last Update")
+    capacity = models.PositiveIntegerField(
+        blank=True, null=True, verbose_name="Capacity",
+        help_text="Maximum number of attendees, plus ones included. Leave empty for no limit.")
+    seats_taken = models.PositiveIntegerField(default=0, editable=False,
+                                              verbose_name="Seats taken")
+
+    rich_text_field = 'description'
+    excerpt_words = 30
+    # seats_taken is only changed by the RSVP admission queries, see `meetup.utils.save_rsvp`
+    counter_fields = ('comment_count', 'seats_taken')
 
     def __str__(self):
         return self.title
 
+    @property
+    def seats_left(self):
+        """Number of seats left, or None if the meetup has no capacity"""
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.seats_taken, 0)
+
+
+def cascade_meetup_rsvps(collector, field, sub_objs, using):
+    """Delete the RSVPs of the deleted meetups, marking them as deleted along with their
+    meetup, so that their seats are not given back one RSVP at a time, see
+    `meetup.signals.release_rsvp_seats`"""
+    for rsvp in sub_objs:
+        rsvp.meetup_deleted = True
+    models.CASCADE(collector, field, sub_objs, using)
+
 
 class Rsvp(models.Model):
     """ Users RSVP for particular meetup """
     user = models.ForeignKey(SystersUser, verbose_name="User")
-    meetup = models.ForeignKey(Meetup, verbose_name="Meetup")
+    meetup = models.ForeignKey(Meetup, on_delete=cascade_meetup_rsvps, verbose_name="Meetup")
     coming = models.BooleanField(default=True)
     plus_one = models.BooleanField(default=False)
+    waitlisted = models.BooleanField(default=False, verbose_name="Waitlisted")
+    # when the RSVP joined the waitlist, kept while it stays waitlisted and used to promote the
+    # waitlist in order, see `meetup.utils.promote_waitlist`
+    waitlisted_at = models.DateTimeField(null=True, blank=True, editable=False,
+                                         verbose_name="Waitlisted at")
+    last_updated = models.DateTimeField(auto_now=True, verbose_name="Last Update")
 
     class Meta:
         unique_together = (('user', 'meetup'),)
@@ -111,8 +146,15 @@ class Rsvp(models.Model):
     def __str__(self):
         return "{0} RSVP for meetup {1}".format(self.user, self.meetup)
 
+    @property
+    def seats(self):
+        """Number of seats the RSVP asks for"""
+        if not self.coming:
+            return 0
+        return 2 if self.plus_one else 1
+
 
-class SupportRequest(models.Model):
+class SupportRequest(Commentable):
     """Manage details of various volunteering activities"""
     volunteer = models.ForeignKey(SystersUser, verbose_name="Volunteer")
     meetup = models.ForeignKey(Meetup, verbose_name="Meetup")
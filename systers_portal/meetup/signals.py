@@ -1,11 +1,16 @@
+from django.conf import settings
 from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import get_object_or_404
 
-from meetup.models import MeetupLocation
+from common.cache import bump_namespace, get_object_namespace
+from common.models import Comment
+from meetup.models import Meetup, MeetupLocation, Rsvp
 from meetup.constants import MEMBER, ORGANIZER
-from meetup.utils import (create_groups, assign_permissions, remove_groups)
+from meetup.utils import (create_groups, assign_permissions, remove_groups, release_seats,
+                          promote_waitlist, invalidate_rsvps_cache, purge_meetup_location_pages)
 from users.models import SystersUser
 
 
@@ -79,3 +84,70 @@ def delete_meetup_location_organizers(sender, **kwargs):
         organizers_group = get_object_or_404(Group, name=ORGANIZER.format(instance.name))
         if systersuser.is_group_member(organizers_group.name):
             systersuser.leave_group(organizers_group)
+
+
+@receiver(m2m_changed, sender=MeetupLocation.members.through,
+          dispatch_uid="purge_cdn_members")
+@receiver(m2m_changed, sender=MeetupLocation.organizers.through,
+          dispatch_uid="purge_cdn_organizers")
+def purge_cdn_meetup_location_members(sender, instance, action, reverse, pk_set, **kwargs):
+    """Purge the public pages of the meetup locations whose members or organizers changed"""
+    if not settings.CDN_PURGER or action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        purge_meetup_location_pages([instance.pk])
+    elif pk_set is not None:
+        purge_meetup_location_pages(pk_set)
+    else:
+        # the meetup locations of a user whose memberships are about to be cleared
+        field = 'members' if sender is MeetupLocation.members.through else 'organizers'
+        purge_meetup_location_pages(MeetupLocation.objects.filter(
+            **{field: instance}).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Rsvp, dispatch_uid="invalidate_rsvps_cache")
+def invalidate_meetup_rsvps_cache(sender, instance, **kwargs):
+    """Invalidate the cached RSVPs of the meetup"""
+    invalidate_rsvps_cache(instance.meetup_id)
+
+
+@receiver(post_delete, sender=Rsvp, dispatch_uid="release_rsvp_seats")
+def release_rsvp_seats(sender, instance, **kwargs):
+    """Give back the seats of a deleted RSVP and offer them to the waitlist, and invalidate the
+    cached RSVPs of the meetup. Nothing is left to update when the meetup itself is deleted."""
+    if getattr(instance, 'meetup_deleted', False):
+        return
+    invalidate_rsvps_cache(instance.meetup_id)
+    if instance.waitlisted or not instance.seats:
+        return
+    release_seats(instance.meetup_id, instance.seats)
+    promote_waitlist(instance.meetup_id)
+
+
+@receiver(post_save, sender=MeetupLocation, dispatch_uid="invalidate_meetup_location_cache")
+@receiver(post_delete, sender=MeetupLocation,
+          dispatch_uid="invalidate_deleted_meetup_location_cache")
+def invalidate_meetup_location_cache(sender, instance, **kwargs):
+    """Invalidate the data cached in the namespace of the meetup location"""
+    bump_namespace(get_object_namespace(MeetupLocation, instance.pk))
+
+
+@receiver(post_save, sender=Meetup, dispatch_uid="invalidate_meetup_location_meetups_cache")
+@receiver(post_delete, sender=Meetup,
+          dispatch_uid="invalidate_deleted_meetup_location_meetups_cache")
+def invalidate_meetup_location_meetups_cache(sender, instance, **kwargs):
+    """Invalidate the data cached in the namespace of the meetup location of the meetup"""
+    bump_namespace(get_object_namespace(MeetupLocation, instance.meetup_location_id))
+
+
+@receiver(post_save, sender=Comment, dispatch_uid="invalidate_meetup_comments_cache")
+@receiver(post_delete, sender=Comment, dispatch_uid="invalidate_deleted_meetup_comments_cache")
+def invalidate_meetup_comments_cache(sender, instance, **kwargs):
+    """Invalidate the data cached in the namespace of the meetup location of a commented
+    meetup, the cached meetups show their number of comments"""
+    if instance.content_type_id != ContentType.objects.get_for_model(Meetup).pk:
+        return
+    location_id = Meetup.objects.filter(pk=instance.object_id).values_list(
+        'meetup_location_id', flat=True).first()
+    if location_id is not None:
+        bump_namespace(get_object_namespace(MeetupLocation, location_id))
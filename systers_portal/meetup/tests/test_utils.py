@@ -1,12 +1,24 @@
-from django.test import TestCase
-from django.contrib.auth.models import Group
+import threading
+
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import Group, User
 from guardian.shortcuts import get_perms
 from cities_light.models import City, Country
 
-from meetup.models import MeetupLocation
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from meetup.constants import MEMBER, RSVP_OK, RSVP_PLUS_ONE_FULL, RSVP_WAITLISTED
+from meetup.models import Meetup, MeetupLocation, Rsvp
 from meetup.permissions import groups_templates, group_permissions
 from meetup.utils import (create_groups, assign_permissions, remove_groups,
-                          get_groups)
+                          get_groups, approve_join_requests, reject_join_requests,
+                          promote_waitlist, save_rsvp)
+from users.models import SystersUser
 
 
 class UtilsTestCase(TestCase):
@@ -62,3 +74,252 @@ class UtilsTestCase(TestCase):
                            list(group.permissions.all())]
             group_perms += get_perms(group, meetup_location)
             self.assertCountEqual(group_perms, value)
+
+
+class JoinRequestsUtilsTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location,
+            description="It's a test meetup location", sponsors="BarBaz")
+        self.requesters = []
+        for i in range(3):
+            user = User.objects.create(username='user{0}'.format(i))
+            systersuser = SystersUser.objects.get(user=user)
+            self.meetup_location.join_requests.add(systersuser)
+            self.requesters.append(systersuser)
+
+    def test_approve_join_requests(self):
+        """Test approving some and then all the join requests of a meetup location"""
+        count = approve_join_requests(self.meetup_location, [self.requesters[0].pk])
+        self.assertEqual(count, 1)
+        self.assertEqual(list(self.meetup_location.members.all()), [self.requesters[0]])
+        self.assertEqual(self.meetup_location.join_requests.count(), 2)
+        self.assertTrue(self.requesters[0].is_group_member(MEMBER.format("Foo Systers")))
+
+        self.assertEqual(approve_join_requests(self.meetup_location), 2)
+        self.assertEqual(self.meetup_location.members.count(), 3)
+        self.assertFalse(self.meetup_location.join_requests.exists())
+        group = Group.objects.get(name=MEMBER.format("Foo Systers"))
+        self.assertEqual(group.user_set.count(), 3)
+        self.assertEqual(approve_join_requests(self.meetup_location), 0)
+
+    def test_reject_join_requests(self):
+        """Test rejecting join requests of a meetup location"""
+        count = reject_join_requests(self.meetup_location, [self.requesters[0].pk])
+        self.assertEqual(count, 1)
+        self.assertEqual(reject_join_requests(self.meetup_location), 2)
+        self.assertFalse(self.meetup_location.join_requests.exists())
+        self.assertFalse(self.meetup_location.members.exists())
+
+    def test_approve_join_requests_constant_queries(self):
+        """Test the number of queries does not depend on the number of join requests"""
+        approve_join_requests(self.meetup_location, [self.requesters[0].pk])
+        with CaptureQueriesContext(connection) as queries:
+            approve_join_requests(self.meetup_location, [self.requesters[1].pk])
+        for i in range(3, 13):
+            user = User.objects.create(username='user{0}'.format(i))
+            self.meetup_location.join_requests.add(SystersUser.objects.get(user=user))
+        with self.assertNumQueries(len(queries)):
+            approve_join_requests(self.meetup_location)
+
+
+class RsvpCapacityTestCase(TestCase):
+    def setUp(self):
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location,
+            description="It's a test meetup location", sponsors="BarBaz")
+        self.meetup = Meetup.objects.create(title='Foo', slug='foo', date=timezone.now().date(),
+                                            time=timezone.now().time(),
+                                            meetup_location=meetup_location, capacity=3)
+        self.users = []
+        for i in range(4):
+            user = User.objects.create(username='user{0}'.format(i),
+                                       email='user{0}@test.com'.format(i))
+            self.users.append(SystersUser.objects.get(user=user))
+
+    def rsvp(self, i, **kwargs):
+        rsvp = Rsvp.objects.filter(user=self.users[i], meetup=self.meetup).first() or \
+            Rsvp(user=self.users[i], meetup=self.meetup)
+        for name, value in kwargs.items():
+            setattr(rsvp, name, value)
+        return rsvp, save_rsvp(rsvp)
+
+    def test_save_rsvp(self):
+        """Test RSVPs are admitted until the meetup is full, then waitlisted"""
+        self.assertEqual(self.rsvp(0, plus_one=True)[1], RSVP_OK)
+        self.assertEqual(self.rsvp(1)[1], RSVP_OK)
+        rsvp, status = self.rsvp(2)
+        self.assertEqual(status, RSVP_WAITLISTED)
+        self.assertTrue(rsvp.waitlisted)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 3)
+        self.assertEqual(self.meetup.seats_left, 0)
+
+        # a not coming RSVP takes no seat and is never waitlisted
+        rsvp, status = self.rsvp(3, coming=False)
+        self.assertEqual(status, RSVP_OK)
+        self.assertFalse(rsvp.waitlisted)
+
+    def test_upsert_rsvp(self):
+        """Test saving a new RSVP object of a user who already RSVP'd updates the RSVP"""
+        save_rsvp(Rsvp(user=self.users[0], meetup=self.meetup, plus_one=True))
+        status = save_rsvp(Rsvp(user=self.users[0], meetup=self.meetup))
+        self.assertEqual(status, RSVP_OK)
+        rsvp = Rsvp.objects.get(meetup=self.meetup)
+        self.assertFalse(rsvp.plus_one)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 1)
+
+    def test_save_rsvp_queries(self):
+        """Test an RSVP is saved with the upsert, the UPDATE of the seats and the UPDATE of the
+        RSVP, within the savepoint of save_rsvp"""
+        with self.assertNumQueries(5):
+            save_rsvp(Rsvp(user=self.users[0], meetup=self.meetup))
+        with self.assertNumQueries(5):
+            save_rsvp(Rsvp(user=self.users[0], meetup=self.meetup, plus_one=True))
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 2)
+
+    def test_plus_one_full(self):
+        """Test an admitted user keeps the seat when the plus one does not fit"""
+        self.rsvp(0)
+        self.rsvp(1, plus_one=True)
+        rsvp, status = self.rsvp(0, plus_one=True)
+        self.assertEqual(status, RSVP_PLUS_ONE_FULL)
+        self.assertFalse(rsvp.waitlisted)
+        self.assertFalse(rsvp.plus_one)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 3)
+
+    def test_promote_waitlist(self):
+        """Test the seats given back go to the waitlist, oldest first, and only to the RSVPs
+        that fit"""
+        self.rsvp(0, plus_one=True)
+        self.rsvp(1)
+        self.rsvp(2, plus_one=True)
+        self.rsvp(3)
+        rsvp, status = self.rsvp(1, coming=False)
+        self.assertEqual(status, RSVP_OK)
+        self.assertEqual(list(Rsvp.objects.filter(waitlisted=True).values_list(
+            'user', flat=True)), [self.users[2].pk])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user3@test.com'])
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 3)
+
+        Rsvp.objects.get(user=self.users[0]).delete()
+        self.assertFalse(Rsvp.objects.filter(waitlisted=True).exists())
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 3)
+
+    def test_resubmit_waitlisted_rsvp(self):
+        """Test a waitlisted RSVP saved again keeps its place in the waitlist"""
+        self.rsvp(0, plus_one=True)
+        self.rsvp(1)
+        self.rsvp(2)
+        self.rsvp(3)
+        waitlisted_at = Rsvp.objects.get(user=self.users[2]).waitlisted_at
+        self.assertIsNotNone(waitlisted_at)
+        rsvp, status = self.rsvp(2, plus_one=True)
+        self.assertEqual(status, RSVP_WAITLISTED)
+        self.assertEqual(Rsvp.objects.get(user=self.users[2]).waitlisted_at, waitlisted_at)
+        self.rsvp(2, plus_one=False)
+
+        self.rsvp(1, coming=False)
+        self.assertEqual(list(Rsvp.objects.filter(waitlisted=True).values_list(
+            'user', flat=True)), [self.users[3].pk])
+        self.assertIsNone(Rsvp.objects.get(user=self.users[2]).waitlisted_at)
+
+    def test_delete_meetup(self):
+        """Test deleting a meetup does not give back the seats of its RSVPs one at a time"""
+        def create_meetup(slug, users):
+            meetup = Meetup.objects.create(title=slug, slug=slug, date=timezone.now().date(),
+                                           time=timezone.now().time(),
+                                           meetup_location=self.meetup.meetup_location)
+            for user in users:
+                Rsvp.objects.create(user=user, meetup=meetup)
+            return meetup
+
+        self.rsvp(0)
+        self.meetup.delete()
+        meetup = create_meetup('bar', self.users[:1])
+        with CaptureQueriesContext(connection) as queries:
+            meetup.delete()
+        meetup = create_meetup('baz', self.users)
+        with self.assertNumQueries(len(queries)):
+            meetup.delete()
+        self.assertFalse(Rsvp.objects.exists())
+
+    def test_raise_capacity(self):
+        """Test raising the capacity of a meetup lets the waitlist in"""
+        for i in range(4):
+            self.rsvp(i)
+        self.meetup.capacity = None
+        self.meetup.save()
+        self.assertEqual(len(promote_waitlist(self.meetup.pk)), 1)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 4)
+
+    def test_save_meetup(self):
+        """Test saving a stale meetup does not overwrite the seats taken"""
+        meetup = Meetup.objects.get(pk=self.meetup.pk)
+        self.rsvp(0)
+        meetup.title = 'Bar'
+        meetup.save()
+        meetup.refresh_from_db()
+        self.assertEqual(meetup.seats_taken, 1)
+
+
+class RsvpCapacityStressTestCase(TransactionTestCase):
+    def test_concurrent_rsvps(self):
+        """Test concurrent RSVPs, each on its own database connection, do not overbook a
+        meetup"""
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        meetup_location = MeetupLocation.objects.create(name="Foo Systers", slug="foo",
+                                                        location=location)
+        meetup = Meetup.objects.create(title='Foo', slug='foo', date=timezone.now().date(),
+                                       time=timezone.now().time(),
+                                       meetup_location=meetup_location, capacity=25)
+        rsvps = []
+        for i in range(60):
+            user = User.objects.create(username='user{0}'.format(i))
+            rsvps.append(Rsvp(user=SystersUser.objects.get(user=user), meetup=meetup,
+                              plus_one=i % 3 == 0))
+        statuses = []
+
+        def run(rsvps):
+            try:
+                statuses.extend(save_rsvp(rsvp) for rsvp in rsvps)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(rsvps[i::10],)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(statuses), 60)
+        meetup.refresh_from_db()
+        admitted = Rsvp.objects.filter(meetup=meetup, waitlisted=False)
+        seats = admitted.count() + admitted.filter(plus_one=True).count()
+        self.assertEqual(meetup.seats_taken, seats)
+        self.assertLessEqual(seats, 25)
+        # the last free seat can only be left by RSVPs with a plus one
+        self.assertGreaterEqual(seats, 24)
+        self.assertEqual(Rsvp.objects.filter(meetup=meetup, waitlisted=True).count(),
+                         statuses.count(RSVP_WAITLISTED))
+
+    def test_benchmark_rsvps(self):
+        """Test the benchmark command reports the throughput and cleans up"""
+        out = StringIO()
+        call_command('benchmark_rsvps', rsvps=30, capacity=10, threads=5, stdout=out)
+        self.assertIn("30 RSVPs in", out.getvalue())
+        self.assertIn("of 10 seats taken", out.getvalue())
+        self.assertFalse(Meetup.objects.exists())
+        self.assertFalse(User.objects.filter(username__startswith='benchmark').exists())
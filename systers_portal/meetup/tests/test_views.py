@@ -1,6 +1,13 @@
+import csv
+import io
+import json
+
 from django.contrib.auth.models import User
+from django.core import mail
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from cities_light.models import City, Country
 from django.contrib.contenttypes.models import ContentType
@@ -106,6 +113,36 @@ class MeetupViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
         response = self.client.get(incorrect_pair_url)
         self.assertEqual(response.status_code, 404)
 
+    def test_view_meetup_conditional_get(self):
+        """Test conditional GET requests to a meetup, which should take into account the
+        comments and rsvps of the meetup"""
+        url = reverse('view_meetup', kwargs={'slug': 'foo', 'meetup_slug': 'foo-bar-baz'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        comment = Comment.objects.create(author=self.systers_user, content_object=self.meetup,
+                                         body="Bar")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Bar")
+        etag = response['ETag']
+
+        comment.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        Rsvp.objects.create(user=self.systers_user, meetup=self.meetup)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['coming_no'], 1)
+
 
 class MeetupLocationMembersViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
     def test_view_meetup_location_members_view(self):
@@ -120,6 +157,58 @@ class MeetupLocationMembersViewTestCase(MeetupLocationViewBaseTestCase, TestCase
         self.assertEqual(response.status_code, 404)
 
 
+class MeetupLocationMembersExportViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
+    def setUp(self):
+        super(MeetupLocationMembersExportViewTestCase, self).setUp()
+        self.user2 = User.objects.create_user(username='bar', password='barbar',
+                                              email='bar@test.com', first_name='=1+1')
+        self.meetup_location.members.add(SystersUser.objects.get(user=self.user2))
+
+    def test_export_csv(self):
+        """Test streaming the members of a meetup location as CSV"""
+        url = reverse('export_members_meetup_location', kwargs={'slug': 'foo', 'format': 'csv'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+        self.client.login(username='bar', password='barbar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename="foo-members.csv"')
+        content = b"".join(response.streaming_content).decode('utf-8')
+        self.assertEqual(content.splitlines(), [
+            "username,first_name,last_name,email,organizer",
+            "foo,,,user@test.com,True",
+            "bar,'=1+1,,bar@test.com,False"])
+
+    def test_export_csv_tab_and_carriage_return(self):
+        """Test the values starting with a tab or a carriage return are escaped in CSV"""
+        User.objects.filter(pk=self.user2.pk).update(first_name='\t=1+1', last_name='\r=2+2')
+        self.client.login(username='foo', password='foobar')
+        url = reverse('export_members_meetup_location', kwargs={'slug': 'foo', 'format': 'csv'})
+        content = b"".join(self.client.get(url).streaming_content).decode('utf-8')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[2], ['bar', "'\t=1+1", "'\r=2+2", 'bar@test.com', 'False'])
+
+    def test_export_jsonl(self):
+        """Test streaming the members of a meetup location as JSON Lines"""
+        self.client.login(username='foo', password='foobar')
+        url = reverse('export_members_meetup_location', kwargs={'slug': 'foo', 'format': 'jsonl'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'username': 'foo', 'first_name': '', 'last_name': '', 'email': 'user@test.com',
+             'organizer': True},
+            {'username': 'bar', 'first_name': '=1+1', 'last_name': '', 'email': 'bar@test.com',
+             'organizer': False}])
+
+
 class AddMeetupViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
     def test_get_add_meetup_view(self):
         """Test GET request to add a new meetup"""
@@ -269,6 +358,28 @@ class UpcomingMeetupsViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
         self.assertContains(response, "Bar Baz")
         self.assertEqual(len(response.context['meetup_list']), 2)
 
+    def test_cached_upcoming_meetups(self):
+        """Test the upcoming meetups are cached until a meetup of the location changes"""
+        url = reverse('upcoming_meetups', kwargs={'slug': 'foo'})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse([query for query in queries.captured_queries
+                          if 'FROM "{0}"'.format(Meetup._meta.db_table) in query['sql']])
+        self.meetup2.title = 'Baz Qux'
+        self.meetup2.save()
+        self.assertContains(self.client.get(url), "Baz Qux")
+
+    def test_cached_upcoming_meetups_comment_count(self):
+        """Test the cached upcoming meetups are invalidated when their comments change"""
+        url = reverse('upcoming_meetups', kwargs={'slug': 'foo'})
+        self.client.get(url)
+        Comment.objects.create(author=self.systers_user, is_approved=True, body="Bar",
+                               content_object=self.meetup2)
+        response = self.client.get(url)
+        counts = {meetup.pk: meetup.comment_count for meetup in response.context['meetup_list']}
+        self.assertEqual(counts[self.meetup2.pk], 1)
+
 
 class PastMeetupListViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
     def setUp(self):
@@ -481,6 +592,18 @@ class MakeMeetupLocationOrganizerViewTestCase(MeetupLocationViewBaseTestCase, Te
         self.assertEqual(len(self.meetup_location.members.all()), 2)
         self.assertEqual(len(self.meetup_location.organizers.all()), 2)
 
+    def test_make_organizer_notification(self):
+        """Test the new organizer is notified by email"""
+        self.user2.email = 'baz@test.com'
+        self.user2.save()
+        self.client.login(username='foo', password='foobar')
+        url = reverse("make_organizer_meetup_location",
+                      kwargs={'slug': 'foo', 'username': 'baz'})
+        self.client.get(url)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['baz@test.com'])
+        self.assertEqual(mail.outbox[0].subject, "You are now an organizer of Foo Systers")
+
 
 class JoinMeetupLocationViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
     def setUp(self):
@@ -491,6 +614,16 @@ class JoinMeetupLocationViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
         self.user3 = User.objects.create_user(username='bar', password='barbar')
         self.systers_user3 = SystersUser.objects.get(user=self.user3)
 
+    def test_join_request_notification(self):
+        """Test the organizers are not emailed right away, the join request is
+        part of their next digest"""
+        self.client.login(username='bar', password='barbar')
+        url = reverse('join_meetup_location', kwargs={'slug': 'foo', 'username': 'bar'})
+        self.client.get(url)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(self.meetup_location.join_requests.filter(pk=self.systers_user3.pk)
+                        .exists())
+
     def test_view_join_meetup_location_view(self):
         """
         Test join meetup location view for three cases:
@@ -566,6 +699,70 @@ class MeetupLocationJoinRequestsViewTestCase(MeetupLocationViewBaseTestCase, Tes
         self.assertTemplateUsed(response, "meetup/join_requests.html")
         self.assertEqual(len(response.context['requests']), 1)
 
+    def test_meetup_location_join_requests_pagination(self):
+        """Test the join requests are paginated oldest first"""
+        for i in range(25):
+            user = User.objects.create(username='user{0}'.format(i))
+            self.meetup_location.join_requests.add(SystersUser.objects.get(user=user))
+        self.client.login(username='foo', password='foobar')
+        url = reverse('join_requests_meetup_location', kwargs={'slug': 'foo'})
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['requests']), 20)
+        self.assertEqual(response.context['requests'][0].systersuser, self.systers_user2)
+        self.assertContains(response, "Select all 26 join requests")
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual(len(response.context['requests']), 6)
+
+        self.client.login(username='baz', password='bazbar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_moderate_meetup_location_join_requests(self):
+        """Test approving and rejecting the selected join requests"""
+        users = [User.objects.create(username='user{0}'.format(i)) for i in range(3)]
+        systersusers = [SystersUser.objects.get(user=user) for user in users]
+        for systersuser in systersusers:
+            self.meetup_location.join_requests.add(systersuser)
+        url = reverse('moderate_join_requests_meetup_location', kwargs={'slug': 'foo'})
+
+        self.client.login(username='baz', password='bazbar')
+        response = self.client.post(url, {'action': 'approve', 'select_all': 'on'})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 405)
+        response = self.client.post(url, {'action': 'approve'})
+        self.assertEqual(self.meetup_location.join_requests.count(), 4)
+        response = self.client.post(url + '?page=1', {
+            'action': 'approve', 'join_requests': [systersusers[0].pk, systersusers[1].pk]})
+        self.assertRedirects(response, '/meetup/foo/join_requests/?page=1')
+        self.assertEqual(self.meetup_location.members.count(), 3)
+        self.assertTrue(systersusers[1].is_group_member("Foo Systers: Member"))
+        response = self.client.post(url, {'action': 'reject',
+                                          'join_requests': [systersusers[2].pk]})
+        self.assertRedirects(response, '/meetup/foo/join_requests/')
+        self.assertEqual(self.meetup_location.join_requests.count(), 1)
+        response = self.client.post(url, {'action': 'approve', 'select_all': 'on'})
+        self.assertFalse(self.meetup_location.join_requests.exists())
+        self.assertEqual(self.meetup_location.members.count(), 4)
+
+    def test_export_meetup_location_join_requests(self):
+        """Test only the organizers can export the join requests"""
+        url = reverse('export_join_requests_meetup_location',
+                      kwargs={'slug': 'foo', 'format': 'jsonl'})
+        self.client.login(username='baz', password='bazbar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = b"".join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['username'], 'baz')
+
 
 class ApproveMeetupLocationJoinRequestsViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
     def setUp(self):
@@ -1147,6 +1344,62 @@ class RsvpMeetupViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
         self.assertTrue(rsvp[0].user, self.systers_user)
         self.assertTrue(rsvp[0].meetup, self.meetup)
 
+    def test_change_rsvp(self):
+        """Test a second RSVP of the same user updates the first one"""
+        self.client.login(username='foo', password='foobar')
+        url = reverse("rsvp_meetup", kwargs={'slug': 'foo', 'meetup_slug': 'foo-bar-baz'})
+        self.client.post(url, data={'coming': True, 'plus_one': True})
+        self.assertEqual(self.client.get(url).context['form'].initial,
+                         {'coming': True, 'plus_one': True})
+        response = self.client.post(url, data={'coming': False})
+        self.assertEqual(response.status_code, 302)
+        rsvp = Rsvp.objects.get(meetup=self.meetup)
+        self.assertFalse(rsvp.coming)
+        self.meetup.refresh_from_db()
+        self.assertEqual(self.meetup.seats_taken, 0)
+
+    def test_post_rsvp_full_meetup(self):
+        """Test an RSVP to a full meetup is waitlisted and left out of the going list"""
+        self.meetup.capacity = 0
+        self.meetup.save()
+        self.client.login(username='foo', password='foobar')
+        url = reverse("rsvp_meetup", kwargs={'slug': 'foo', 'meetup_slug': 'foo-bar-baz'})
+        response = self.client.post(url, data={'coming': True, 'plus_one': False}, follow=True)
+        self.assertContains(response, "you are on the waitlist")
+        self.assertTrue(Rsvp.objects.get(meetup=self.meetup).waitlisted)
+        self.assertEqual(response.context['coming_no'], 0)
+        self.assertEqual(response.context['waitlisted_no'], 1)
+        response = self.client.get(reverse("rsvp_going", kwargs={
+            'slug': 'foo', 'meetup_slug': 'foo-bar-baz'}))
+        self.assertEqual(len(response.context['rsvp_list']), 0)
+
+
+class RsvpMeetupJsonViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
+    def test_rsvp_meetup_json_view(self):
+        """Test one-click RSVPs answered with JSON"""
+        url = reverse("rsvp_meetup_json", kwargs={'slug': 'foo', 'meetup_slug': 'foo-bar-baz'})
+        response = self.client.post(url, data={'coming': True})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='foo', password='foobar')
+        self.assertEqual(self.client.get(url).status_code, 405)
+        response = self.client.post(url, data={'coming': True, 'plus_one': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'rsvp_ok', 'message': 'Success',
+                                           'coming': True, 'plus_one': True,
+                                           'waitlisted': False})
+        response = self.client.post(url, data={'coming': False})
+        self.assertFalse(response.json()['coming'])
+        self.assertEqual(Rsvp.objects.filter(meetup=self.meetup).count(), 1)
+
+        url = reverse("rsvp_meetup_json", kwargs={'slug': 'foo', 'meetup_slug': 'bar'})
+        self.assertEqual(self.client.post(url, data={'coming': True}).status_code, 404)
+        # a meetup of another meetup location
+        MeetupLocation.objects.create(name="Bar Systers", slug="bar", location=self.location,
+                                      description="It's another meetup location")
+        url = reverse("rsvp_meetup_json", kwargs={'slug': 'bar', 'meetup_slug': 'foo-bar-baz'})
+        self.assertEqual(self.client.post(url, data={'coming': True}).status_code, 404)
+
 
 class RsvpGoingViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
     def setUp(self):
@@ -1164,6 +1417,67 @@ class RsvpGoingViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
         self.assertContains(response, str(self.systers_user))
         self.assertEqual(len(response.context['rsvp_list']), 1)
 
+    def test_rsvp_going_tabs(self):
+        """Test the tabs, the pagination and the caching of the RSVPs of a meetup"""
+        for i in range(40):
+            user = User.objects.create(username='user{0}'.format(i))
+            Rsvp.objects.create(user=SystersUser.objects.get(user=user), meetup=self.meetup,
+                                coming=i % 5 != 0, plus_one=i % 2 == 0)
+        self.client.login(username='foo', password='foobar')
+        url = reverse("rsvp_going", kwargs={'slug': 'foo', 'meetup_slug': 'foo-bar-baz'})
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual(len(response.context['rsvp_list']), 3)
+        self.assertEqual(response.context['tabs'], [('going', 'Going', 33),
+                                                    ('plus_one', 'Plus one', 16),
+                                                    ('not_going', 'Not going', 8)])
+        self.assertContains(response, "?tab=going&amp;page=1")
+        response = self.client.get(url, {'tab': 'not_going'})
+        self.assertEqual(len(response.context['rsvp_list']), 8)
+        self.assertFalse(response.context['is_paginated'])
+
+        # the pages and counts come from the cache until the next RSVP
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'tab': 'not_going'})
+        self.assertFalse([query for query in queries.captured_queries
+                          if Rsvp._meta.db_table in query['sql']])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'page': 1})
+        self.assertEqual(len(response.context['rsvp_list']), 30)
+        rsvp_queries = [query['sql'] for query in queries.captured_queries
+                        if Rsvp._meta.db_table in query['sql']]
+        self.assertEqual(len(rsvp_queries), 1)
+        self.assertIn('LIMIT 30', rsvp_queries[0])
+        self.rsvp1.coming = False
+        self.rsvp1.save()
+        response = self.client.get(url, {'tab': 'not_going'})
+        self.assertEqual(len(response.context['rsvp_list']), 9)
+
+
+class RsvpGoingExportViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
+    def setUp(self):
+        super(RsvpGoingExportViewTestCase, self).setUp()
+        Rsvp.objects.create(user=self.systers_user, meetup=self.meetup, coming=True,
+                            plus_one=True)
+        self.user2 = User.objects.create_user(username='bar', password='barbar')
+        Rsvp.objects.create(user=SystersUser.objects.get(user=self.user2), meetup=self.meetup,
+                            coming=False)
+
+    def test_export_rsvp_going(self):
+        """Test only the organizers can export the members going to a meetup"""
+        url = reverse('export_rsvp_going', kwargs={'slug': 'foo', 'meetup_slug': 'foo-bar-baz',
+                                                   'format': 'csv'})
+        self.client.login(username='bar', password='barbar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0], "username,first_name,last_name,email,plus_one,last_updated")
+        self.assertTrue(lines[1].startswith("foo,,,user@test.com,True,"))
+
 
 class AddSupportRequestViewTestCase(MeetupLocationViewBaseTestCase, TestCase):
     def test_get_add_support_request_view(self):
@@ -1,15 +1,19 @@
 from django.conf.urls import url
 
 from meetup.views import (MeetupLocationAboutView, MeetupLocationList, MeetupView,
-                          MeetupLocationMembersView, AddMeetupView, DeleteMeetupView,
+                          MeetupLocationMembersView, MeetupLocationMembersExportView,
+                          AddMeetupView, DeleteMeetupView,
                           EditMeetupView, UpcomingMeetupsView, PastMeetupListView,
                           MeetupLocationSponsorsView, RemoveMeetupLocationMemberView,
                           AddMeetupLocationMemberView, RemoveMeetupLocationOrganizerView,
                           MakeMeetupLocationOrganizerView, ApproveMeetupLocationJoinRequestView,
                           RejectMeetupLocationJoinRequestView, MeetupLocationJoinRequestsView,
+                          MeetupLocationJoinRequestsExportView,
+                          ModerateMeetupLocationJoinRequestsView,
                           AddMeetupLocationView, EditMeetupLocationView, DeleteMeetupLocationView,
                           JoinMeetupLocationView, AddMeetupCommentView, EditMeetupCommentView,
-                          DeleteMeetupCommentView, RsvpMeetupView, RsvpGoingView,
+                          DeleteMeetupCommentView, RsvpMeetupView, RsvpMeetupJsonView,
+                          RsvpGoingView, RsvpGoingExportView,
                           AddSupportRequestView, EditSupportRequestView, DeleteSupportRequestView,
                           SupportRequestView, SupportRequestsListView, ApproveSupportRequestView,
                           RejectSupportRequestView, UnapprovedSupportRequestsListView,
@@ -28,6 +32,8 @@ urlpatterns = [
         name='past_meetups'),
     url(r'^(?P<slug>[\w-]+)/members/$', MeetupLocationMembersView.as_view(),
         name='members_meetup_location'),
+    url(r'^(?P<slug>[\w-]+)/members/export/(?P<format>csv|jsonl)/$',
+        MeetupLocationMembersExportView.as_view(), name='export_members_meetup_location'),
     url(r'^(?P<slug>[\w-]+)/add/$', AddMeetupView.as_view(), name='add_meetup'),
     url(r'^(?P<slug>[\w-]+)/(?P<meetup_slug>[\w-]+)/delete/$', DeleteMeetupView.as_view(),
         name='delete_meetup'),
@@ -59,6 +65,12 @@ urlpatterns = [
         name='join_meetup_location'),
     url(r'^(?P<slug>[\w-]+)/join_requests/$', MeetupLocationJoinRequestsView.as_view(),
         name='join_requests_meetup_location'),
+    url(r'^(?P<slug>[\w-]+)/join_requests/export/(?P<format>csv|jsonl)/$',
+        MeetupLocationJoinRequestsExportView.as_view(),
+        name='export_join_requests_meetup_location'),
+    url(r'^(?P<slug>[\w-]+)/join_requests/moderate/$',
+        ModerateMeetupLocationJoinRequestsView.as_view(),
+        name='moderate_join_requests_meetup_location'),
     url(r'^(?P<slug>[\w-]+)/join_requests/approve/(?P<username>[\w.@+-]+)/$',
         ApproveMeetupLocationJoinRequestView.as_view(),
         name='approve_join_request_meetup_location'),
@@ -81,8 +93,12 @@ urlpatterns = [
         name="delete_meetup_comment"),
     url(r'^(?P<slug>[\w-]+)/(?P<meetup_slug>[\w-]+)/rsvp/$', RsvpMeetupView.as_view(),
         name="rsvp_meetup"),
+    url(r'^(?P<slug>[\w-]+)/(?P<meetup_slug>[\w-]+)/rsvp/json/$', RsvpMeetupJsonView.as_view(),
+        name="rsvp_meetup_json"),
     url(r'^(?P<slug>[\w-]+)/(?P<meetup_slug>[\w-]+)/going/$', RsvpGoingView.as_view(),
         name="rsvp_going"),
+    url(r'^(?P<slug>[\w-]+)/(?P<meetup_slug>[\w-]+)/going/export/(?P<format>csv|jsonl)/$',
+        RsvpGoingExportView.as_view(), name="export_rsvp_going"),
     url(r'^(?P<slug>[\w-]+)/(?P<meetup_slug>[\w-]+)/add_support_request/$',
         AddSupportRequestView.as_view(),
         name='add_support_request'),
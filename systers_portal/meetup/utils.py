@@ -1,8 +1,19 @@
-from django.contrib.auth.models import Group, Permission
-from django.db import transaction
+from django.contrib.auth.models import Group, Permission, User
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from guardian.shortcuts import assign_perm
 
+from common.cache import bump_namespace, make_namespaced_key
+from common.cdn import get_surrogate_key, purge_surrogate_keys
+from common.jobs import enqueue
+from meetup.constants import (MEMBER, RSVP_OK, RSVP_PLUS_ONE_FULL, RSVP_WAITLISTED,
+                              RSVPS_CACHE_NAMESPACE)
+from meetup.jobs import notify_rsvp_promoted
+from meetup.models import Meetup, MeetupLocation, Rsvp
 from meetup.permissions import groups_templates, group_permissions
+from users.models import SystersUser
 
 
 @transaction.atomic
@@ -56,3 +67,263 @@ def assign_permissions(meetup_location, groups):
                 group.save()
             else:
                 assign_perm(perm, group, meetup_location)
+
+
+def add_users_to_group(group, user_ids):
+    """Add users to a group with a single insert, skipping the users who are
+    already members of the group
+
+    :param group: Group object
+    :param user_ids: list of integer User ids
+    """
+    through = User.groups.through
+    in_group = set(through.objects.filter(group=group, user_id__in=user_ids).values_list(
+        'user_id', flat=True))
+    through.objects.bulk_create([through(group=group, user_id=pk) for pk in user_ids
+                                 if pk not in in_group])
+
+
+def add_members(meetup_location, systersuser_ids):
+    """Add users to the members of a meetup location and to its members group, without
+    the per user work of the `m2m_changed` signal handlers. Their join requests are removed.
+
+    :param meetup_location: MeetupLocation object
+    :param systersuser_ids: list of integer SystersUser ids
+    :return: list of integer ids of the SystersUser objects that were not members yet
+    """
+    through = MeetupLocation.members.through
+    members = set(through.objects.filter(
+        meetuplocation=meetup_location, systersuser_id__in=systersuser_ids).values_list(
+        'systersuser_id', flat=True))
+    added = [pk for pk in systersuser_ids if pk not in members]
+    through.objects.bulk_create([through(meetuplocation=meetup_location, systersuser_id=pk)
+                                 for pk in added])
+    MeetupLocation.join_requests.through.objects.filter(
+        meetuplocation=meetup_location, systersuser_id__in=systersuser_ids).delete()
+    if added:
+        group, _ = Group.objects.get_or_create(name=MEMBER.format(meetup_location.name))
+        add_users_to_group(group, list(SystersUser.objects.filter(pk__in=added).values_list(
+            'user_id', flat=True)))
+        purge_meetup_location_pages([meetup_location.pk])
+    return added
+
+
+def purge_meetup_location_pages(meetup_location_ids):
+    """Purge the public pages of meetup locations from the CDN, see `common.cdn`
+
+    :param meetup_location_ids: iterable of integer MeetupLocation ids
+    :return: Job object, or None if the purge was run right away, was already queued or if no
+             purger is configured
+    """
+    return purge_surrogate_keys([get_surrogate_key(MeetupLocation, pk)
+                                 for pk in meetup_location_ids])
+
+
+@transaction.atomic
+def approve_join_requests(meetup_location, systersuser_ids=None):
+    """Approve pending join requests to a meetup location in one transaction
+
+    :param meetup_location: MeetupLocation object
+    :param systersuser_ids: list of integer SystersUser ids, or None to approve all the
+                            pending join requests
+    :return: integer number of approved join requests
+    """
+    pending = list(get_pending_join_requests(meetup_location, systersuser_ids).values_list(
+        'systersuser_id', flat=True))
+    if pending:
+        add_members(meetup_location, pending)
+    return len(pending)
+
+
+@transaction.atomic
+def reject_join_requests(meetup_location, systersuser_ids=None):
+    """Reject pending join requests to a meetup location in one transaction
+
+    :param meetup_location: MeetupLocation object
+    :param systersuser_ids: list of integer SystersUser ids, or None to reject all the
+                            pending join requests
+    :return: integer number of rejected join requests
+    """
+    deleted, _ = get_pending_join_requests(meetup_location, systersuser_ids).delete()
+    return deleted
+
+
+def get_pending_join_requests(meetup_location, systersuser_ids=None):
+    """Get the join requests to a meetup location, oldest first
+
+    :param meetup_location: MeetupLocation object
+    :param systersuser_ids: list of integer SystersUser ids, or None for all the join
+                            requests
+    :return: QuerySet of the join requests m2m through model
+    """
+    join_requests = MeetupLocation.join_requests.through.objects.filter(
+        meetuplocation=meetup_location).order_by('pk')
+    if systersuser_ids is not None:
+        join_requests = join_requests.filter(systersuser_id__in=systersuser_ids)
+    return join_requests
+
+
+def reserve_seats(meetup_id, seats, held=0):
+    """Take seats of a meetup if enough are left, giving back the seats already held by the
+    RSVP, with a single conditional UPDATE. The UPDATE locks the meetup row until the end of the
+    transaction, so concurrent RSVPs to the same meetup wait for each other on that row only,
+    and PostgreSQL checks the condition again on the latest version of the row.
+
+    :param meetup_id: integer id of the Meetup
+    :param seats: integer number of seats
+    :param held: integer number of seats the RSVP held
+    :return: True if the seats were taken, False if the meetup is full, in which case the held
+             seats are not given back
+    """
+    if seats == held:
+        return True
+    seats_taken = Greatest(F('seats_taken') - held, 0) + seats if held else \
+        F('seats_taken') + seats
+    return Meetup.objects.filter(
+        Q(capacity__isnull=True) | Q(capacity__gte=seats_taken),
+        pk=meetup_id).update(seats_taken=seats_taken) == 1
+
+
+def release_seats(meetup_id, seats):
+    """Give back seats of a meetup
+
+    :param meetup_id: integer id of the Meetup
+    :param seats: integer number of seats
+    """
+    if seats:
+        Meetup.objects.filter(pk=meetup_id).update(
+            seats_taken=Greatest(F('seats_taken') - seats, 0))
+
+
+RSVP_UPSERT_SQL = """
+INSERT INTO {table} (user_id, meetup_id, coming, plus_one, waitlisted, last_updated)
+VALUES (%s, %s, false, false, true, %s)
+ON CONFLICT (user_id, meetup_id) DO UPDATE SET user_id = EXCLUDED.user_id
+RETURNING id, coming, plus_one, waitlisted, waitlisted_at
+"""
+
+
+def lock_rsvp(rsvp):
+    """Lock the row of the RSVP of a user to a meetup, inserting it if it does not exist yet, in
+    a single `INSERT ... ON CONFLICT DO UPDATE` on PostgreSQL. Concurrent RSVPs of the same user
+    wait for each other on this row. Other databases fall back to a locking SELECT and an
+    INSERT.
+
+    The upsert does not write the values of the RSVP: the seats to take from the meetup depend
+    on the seats the RSVP held before, which RETURNING cannot give once the row is updated, and
+    whether the RSVP is waitlisted is only known after taking them. The inserted row is a
+    placeholder, waitlisted and not coming, i.e. holding no seat, which `save_rsvp` updates in
+    the same transaction.
+
+    :param rsvp: Rsvp object, its `pk` is set to the id of the row
+    :return: Rsvp object with the previous `coming`, `plus_one`, `waitlisted` and
+             `waitlisted_at` of the RSVP
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(RSVP_UPSERT_SQL.format(table=Rsvp._meta.db_table),
+                           [rsvp.user_id, rsvp.meetup_id, timezone.now()])
+            rsvp.pk, coming, plus_one, waitlisted, waitlisted_at = cursor.fetchone()
+        previous = Rsvp(coming=coming, plus_one=plus_one, waitlisted=waitlisted,
+                        waitlisted_at=waitlisted_at)
+    else:
+        previous = Rsvp.objects.select_for_update().filter(
+            user_id=rsvp.user_id, meetup_id=rsvp.meetup_id).first()
+        if previous is None:
+            previous = Rsvp.objects.create(user_id=rsvp.user_id, meetup_id=rsvp.meetup_id,
+                                           coming=False, waitlisted=True)
+        rsvp.pk = previous.pk
+    return previous
+
+
+@transaction.atomic
+def save_rsvp(rsvp):
+    """Create or update the RSVP of a user to a meetup, taking the seats of the attendee and of
+    the plus one. An RSVP which does not fit in the seats left is waitlisted, unless the
+    attendee already had a seat and only the plus one does not fit. A waitlisted RSVP which is
+    saved again keeps its place in the waitlist. The seats given back are offered to the
+    waitlist.
+
+    This takes three queries, the upsert of `lock_rsvp`, the UPDATE of the seats of the meetup
+    and the UPDATE of the RSVP, plus the promotion of the waitlist when seats are given back.
+
+    :param rsvp: Rsvp object
+    :return: string RSVP status: RSVP_OK, RSVP_WAITLISTED or RSVP_PLUS_ONE_FULL
+    """
+    previous = lock_rsvp(rsvp)
+    held = 0 if previous.waitlisted else previous.seats
+    status = RSVP_OK
+    rsvp.waitlisted = False
+    if not reserve_seats(rsvp.meetup_id, rsvp.seats, held):
+        if held and rsvp.plus_one and reserve_seats(rsvp.meetup_id, 1, held):
+            rsvp.plus_one = False
+            status = RSVP_PLUS_ONE_FULL
+        else:
+            release_seats(rsvp.meetup_id, held)
+            rsvp.waitlisted = True
+            status = RSVP_WAITLISTED
+    rsvp.waitlisted_at = (previous.waitlisted_at or timezone.now()) if rsvp.waitlisted else None
+    rsvp.save(force_update=True)
+    if held > (0 if rsvp.waitlisted else rsvp.seats):
+        promote_waitlist(rsvp.meetup_id)
+    return status
+
+
+@transaction.atomic
+def promote_waitlist(meetup_id):
+    """Give the seats left of a meetup to the waitlisted RSVPs, in the order they joined the
+    waitlist, skipping the ones that do not fit, and notify their users
+
+    :param meetup_id: integer id of the Meetup
+    :return: list of integer ids of the promoted Rsvp objects
+    """
+    meetup = Meetup.objects.select_for_update().filter(pk=meetup_id).values(
+        'capacity', 'seats_taken').first()
+    if meetup is None:
+        return []
+    seats_left = None
+    if meetup['capacity'] is not None:
+        seats_left = meetup['capacity'] - meetup['seats_taken']
+        if seats_left <= 0:
+            return []
+    # the RSVPs being changed right now are skipped, their users are waiting for the meetup row
+    waitlist = Rsvp.objects.select_for_update(skip_locked=True).filter(
+        meetup_id=meetup_id, coming=True, waitlisted=True).order_by(
+        'waitlisted_at', 'pk').values_list('pk', 'plus_one')
+    promoted, seats = [], 0
+    for pk, plus_one in waitlist.iterator():
+        needed = 2 if plus_one else 1
+        if seats_left is not None:
+            if needed > seats_left:
+                continue
+            seats_left -= needed
+        promoted.append(pk)
+        seats += needed
+        if seats_left == 0:
+            break
+    if promoted:
+        Rsvp.objects.filter(pk__in=promoted).update(waitlisted=False, waitlisted_at=None,
+                                                    last_updated=timezone.now())
+        Meetup.objects.filter(pk=meetup_id).update(seats_taken=F('seats_taken') + seats)
+        invalidate_rsvps_cache(meetup_id)
+        enqueue(notify_rsvp_promoted, meetup_id, promoted)
+    return promoted
+
+
+def get_rsvps_cache_key(meetup_id, *parts):
+    """Get a cache key for data about the RSVPs of a meetup. The key is in the RSVPs namespace
+    of the meetup, so that it changes with every RSVP write.
+
+    :param meetup_id: integer id of the Meetup
+    :param parts: strings identifying the data
+    :return: string cache key
+    """
+    return make_namespaced_key(RSVPS_CACHE_NAMESPACE.format(meetup_id), *parts)
+
+
+def invalidate_rsvps_cache(meetup_id):
+    """Bump the RSVPs namespace of a meetup, see common.cache.bump_namespace
+
+    :param meetup_id: integer id of the Meetup
+    """
+    bump_namespace(RSVPS_CACHE_NAMESPACE.format(meetup_id))
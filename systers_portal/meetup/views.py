@@ -1,8 +1,12 @@
 import datetime
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404
-from django.views.generic import DeleteView, TemplateView, RedirectView
+from django.views.generic import DeleteView, TemplateView, RedirectView, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, UpdateView, FormView
 from django.views.generic.list import ListView
@@ -10,18 +14,32 @@ from braces.views import LoginRequiredMixin, PermissionRequiredMixin, StaffuserR
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import (Count, DateTimeField, Exists, IntegerField, Max, OuterRef,
+                              Subquery)
 from braces.views import FormValidMessageMixin, FormInvalidMessageMixin
 from meetup.forms import (AddMeetupForm, EditMeetupForm, AddMeetupLocationMemberForm,
                           AddMeetupLocationForm, EditMeetupLocationForm, AddMeetupCommentForm,
                           EditMeetupCommentForm, RsvpForm, AddSupportRequestForm,
                           EditSupportRequestForm, AddSupportRequestCommentForm,
-                          EditSupportRequestCommentForm, RequestMeetupLocationForm)
-from meetup.mixins import MeetupLocationMixin
+                          EditSupportRequestCommentForm, RequestMeetupLocationForm,
+                          JoinRequestsModerationForm)
+from meetup.jobs import notify_new_organizer
+from meetup.mixins import MeetupLocationMixin, resolve_meetup, resolve_meetup_location
 from meetup.models import Meetup, MeetupLocation, Rsvp, SupportRequest, RequestMeetupLocation
 from meetup.constants import (OK, SUCCESS_MSG, NAME_ALREADY_EXISTS, NAME_ALREADY_EXISTS_MSG,
                               SLUG_ALREADY_EXISTS, SLUG_ALREADY_EXISTS_MSG,
-                              LOCATION_ALREADY_EXISTS, LOCATION_ALREADY_EXISTS_MSG, ERROR_MSG)
+                              LOCATION_ALREADY_EXISTS, LOCATION_ALREADY_EXISTS_MSG, ERROR_MSG,
+                              APPROVE, JOIN_REQUESTS_APPROVED_MSG, JOIN_REQUESTS_REJECTED_MSG,
+                              RSVP_MESSAGES, RSVP_TABS, GOING, PLUS_ONE, NOT_GOING)
+from meetup.utils import (approve_join_requests, get_pending_join_requests, get_rsvps_cache_key,
+                          promote_waitlist, reject_join_requests)
 from users.models import SystersUser
+from common.cache import get_object_namespace, get_or_set_namespaced
+from common.jobs import enqueue
+from common.resolvers import resolve_object
+from common.cdn import get_surrogate_key
+from common.mixins import (CommentThreadMixin, ConditionalGetMixin, PublicCacheMixin,
+                           StreamingExportMixin)
 from common.models import Comment
 
 
@@ -73,8 +91,8 @@ class ViewMeetupLocationRequestView(LoginRequiredMixin, StaffuserRequiredMixin,
         """Add RequestMeetupLocation object and it's verbose fields to the context."""
         context = super(ViewMeetupLocationRequestView,
                         self).get_context_data(**kwargs)
-        self.meetup_location_request = get_object_or_404(
-            RequestMeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location_request = resolve_object(
+            self.request, RequestMeetupLocation, slug=self.kwargs['slug'])
         context['meetup_location_request'] = self.meetup_location_request
         context['meetup_location_request_fields'] = \
             self.meetup_location_request.get_verbose_fields()
@@ -103,8 +121,8 @@ class ApproveRequestMeetupLocationView(LoginRequiredMixin, StaffuserRequiredMixi
         * Adds the requestor as the meetup location organizer
         * Sets the RequestMeetupLocation object's is_approved field to True.
         """
-        meetup_location_request = get_object_or_404(
-            RequestMeetupLocation, slug=self.kwargs['slug'])
+        meetup_location_request = resolve_object(
+            self.request, RequestMeetupLocation, slug=self.kwargs['slug'])
         new_meetup_location = MeetupLocation()
         new_meetup_location.name = meetup_location_request.name
         new_meetup_location.slug = meetup_location_request.slug
@@ -112,8 +130,8 @@ class ApproveRequestMeetupLocationView(LoginRequiredMixin, StaffuserRequiredMixi
         new_meetup_location.description = meetup_location_request.description
         systersuser = meetup_location_request.user
 
-        meetup_location_request.approved_by = get_object_or_404(
-            SystersUser, user=self.request.user)
+        meetup_location_request.approved_by = resolve_object(
+            self.request, SystersUser, user=self.request.user)
         meetup_location_request.is_approved = True
         self.slug_meetup_location_request = meetup_location_request.slug
         self.name_meetup_location_request = meetup_location_request.name
@@ -164,21 +182,17 @@ class RejectMeetupLocationRequestView(LoginRequiredMixin, StaffuserRequiredMixin
         """Supply the success URL in case of a successful submit"""
         messages.add_message(self.request, messages.INFO,
                              "Meetup Location request successfullly rejected!")
-        meetup_location_request = get_object_or_404(
-            RequestMeetupLocation, slug=self.kwargs['slug'])
+        meetup_location_request = resolve_object(
+            self.request, RequestMeetupLocation, slug=self.kwargs['slug'])
         meetup_location_request.delete()
         return reverse('new_meetup_location_requests')
 
 
-class MeetupLocationAboutView(MeetupLocationMixin, TemplateView):
+class MeetupLocationAboutView(PublicCacheMixin, MeetupLocationMixin, TemplateView):
     """Meetup Location about view, show about description of Meetup Location"""
     model = MeetupLocation
     template_name = "meetup/about.html"
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-
 
 class MeetupLocationList(ListView):
     """List all Meetup Locations"""
@@ -186,44 +200,79 @@ class MeetupLocationList(ListView):
     model = MeetupLocation
     paginate_by = 20
 
+    def get_queryset(self):
+        return MeetupLocation.objects.defer('description', 'body_html', 'sponsors')
+
     def get_context_data(self, **kwargs):
         context = super(MeetupLocationList, self).get_context_data(**kwargs)
         context['meetup_list'] = Meetup.objects.filter(
-            date__gte=datetime.date.today()).order_by('date', 'time')
+            date__gte=datetime.date.today()).order_by('date', 'time').defer(
+            'description', 'body_html')
         return context
 
 
-class MeetupView(MeetupLocationMixin, DetailView):
+class MeetupView(PublicCacheMixin, ConditionalGetMixin, CommentThreadMixin, MeetupLocationMixin,
+                 DetailView):
     """View details of a meetup, including date, time, venue, description, number of users who
     rsvp'd and comments."""
     template_name = "meetup/meetup.html"
     model = MeetupLocation
 
+    def get_validators(self):
+        """Compute the page validators in a single query from the Meetup, its approved comments
+        and its rsvps. The counts are part of the ETag, so that deletions are noticed too."""
+        comments = Comment.objects.filter(
+            content_type=ContentType.objects.get_for_model(Meetup), object_id=OuterRef('pk'),
+            is_approved=True).order_by().values('object_id')
+        rsvps = Rsvp.objects.filter(meetup=OuterRef('pk')).order_by().values('meetup')
+        meetup = Meetup.objects.filter(
+            slug=self.kwargs['meetup_slug'], meetup_location__slug=self.kwargs['slug']).annotate(
+            comments_count=Subquery(comments.annotate(count=Count('pk')).values('count'),
+                                    output_field=IntegerField()),
+            comments_updated=Subquery(comments.annotate(
+                latest=Max('date_modified')).values('latest'), output_field=DateTimeField()),
+            rsvps_count=Subquery(rsvps.annotate(count=Count('pk')).values('count'),
+                                 output_field=IntegerField()),
+            rsvps_updated=Subquery(rsvps.annotate(latest=Max('last_updated')).values('latest'),
+                                   output_field=DateTimeField())).values_list(
+            'pk', 'last_updated', 'comments_count', 'comments_updated', 'rsvps_count',
+            'rsvps_updated').first()
+        if meetup is None:
+            return None
+        pk, last_updated, comments_count, comments_updated, rsvps_count, rsvps_updated = meetup
+        last_modified = max(date for date in (last_updated, comments_updated, rsvps_updated)
+                            if date is not None)
+        return self.make_etag("meetup", *meetup), last_modified
+
     def get_context_data(self, **kwargs):
         """Add Meetup object, number of users who rsvp'd and comments to the context"""
         context = super(MeetupView, self).get_context_data(**kwargs)
         self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'],
                                         meetup_location=self.object)
         context['meetup'] = self.meetup
-        context['comments'] = Comment.objects.filter(
-            content_type=ContentType.objects.get(app_label='meetup', model='meetup'),
-            object_id=self.meetup.id,
-            is_approved=True).order_by('date_created')
-        coming_list = Rsvp.objects.filter(meetup=self.meetup, coming=True)
-        plus_one_list = Rsvp.objects.filter(meetup=self.meetup, plus_one=True)
-        not_coming_list = Rsvp.objects.filter(meetup=self.meetup, coming=False)
-        context['coming_no'] = len(coming_list) + len(plus_one_list)
-        context['not_coming_no'] = len(not_coming_list)
+        context.update(self.get_comment_thread_context(self.meetup))
+        rsvps = Rsvp.objects.filter(meetup=self.meetup)
+        coming_list = rsvps.filter(coming=True, waitlisted=False)
+        plus_one_list = coming_list.filter(plus_one=True)
+        context['coming_no'] = coming_list.count() + plus_one_list.count()
+        context['not_coming_no'] = rsvps.filter(coming=False).count()
+        context['waitlisted_no'] = rsvps.filter(coming=True, waitlisted=True).count()
         context['share_message'] = self.meetup.title + " @systers_org " + \
             self.meetup.meetup_location.name
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.object
+    def get_object(self, queryset=None):
+        """Get the MeetupLocation of the slug, shared with the rest of the request"""
+        return self.get_meetup_location()
+
+    def get_surrogate_keys(self):
+        """Add the surrogate key of the meetup to the one of its location"""
+        meetup = getattr(self, 'meetup', None) or self.get_meetup()
+        keys = super(MeetupView, self).get_surrogate_keys()
+        return keys + [get_surrogate_key(Meetup, meetup.pk)]
 
 
-class MeetupLocationMembersView(MeetupLocationMixin, DetailView):
+class MeetupLocationMembersView(PublicCacheMixin, MeetupLocationMixin, DetailView):
     """Meetup Location members view, show members list of Meetup Location"""
     model = MeetupLocation
     template_name = "meetup/members.html"
@@ -232,15 +281,41 @@ class MeetupLocationMembersView(MeetupLocationMixin, DetailView):
     def get_context_data(self, **kwargs):
         """Add list of members and organizers to the context"""
         context = super(MeetupLocationMembersView, self).get_context_data(**kwargs)
-        organizer_list = self.meetup_location.organizers.all()
-        context['organizer_list'] = organizer_list
-        context['member_list'] = self.meetup_location.members.exclude(id__in=organizer_list)
+        organizer_list = self.object.organizers.all()
+        context['organizer_list'] = organizer_list.select_related('user').prefetch_related(
+            'picture_variants')
+        context['member_list'] = self.object.members.exclude(
+            id__in=organizer_list).select_related('user').prefetch_related('picture_variants')
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-        return self.meetup_location
+    def get_object(self, queryset=None):
+        """Get the MeetupLocation of the slug, shared with the rest of the request"""
+        return self.get_meetup_location()
+
+
+class MeetupLocationMembersExportView(LoginRequiredMixin, PermissionRequiredMixin,
+                                      StreamingExportMixin, View):
+    """Export the members of a Meetup Location as CSV or JSON Lines"""
+    raise_exception = True
+    export_fields = (('username', 'user__username'), ('first_name', 'user__first_name'),
+                     ('last_name', 'user__last_name'), ('email', 'user__email'),
+                     ('organizer', 'is_organizer'))
+
+    def get_export_name(self):
+        return "{0}-members".format(self.meetup_location.slug)
+
+    def get_export_queryset(self):
+        """Members of the meetup location, flagging the organizers"""
+        organizers = MeetupLocation.organizers.through.objects.filter(
+            meetuplocation=self.meetup_location, systersuser=OuterRef('pk'))
+        return self.meetup_location.members.annotate(
+            is_organizer=Exists(organizers)).order_by('pk')
+
+    def check_permissions(self, request):
+        """Check if the request user has the permission to add a member to the meetup location.
+        The permission holds true for superusers."""
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        return request.user.has_perm('add_meetup_location_member', self.meetup_location)
 
 
 class AddMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequiredMixin,
@@ -263,15 +338,11 @@ class AddMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequire
         Used to autofill form fields with created_by and meetup_location without
         explicitly filling them up in the form."""
         kwargs = super(AddMeetupView, self).get_form_kwargs()
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         kwargs.update({'created_by': self.request.user})
         kwargs.update({'meetup_location': self.meetup_location})
         return kwargs
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to add a meetup to the meetup location.
         The permission holds true for superusers."""
@@ -286,16 +357,14 @@ class DeleteMeetupView(LoginRequiredMixin, PermissionRequiredMixin, MeetupLocati
     slug_url_kwarg = "meetup_slug"
     raise_exception = True
 
+    def get_object(self, queryset=None):
+        """Get the Meetup of the URL"""
+        return self.get_meetup()
+
     def get_success_url(self):
         """Redirect to meetup location's about page in case of successful deletion"""
-        self.get_meetup_location()
         return reverse("about_meetup_location",
-                       kwargs={"slug": self.meetup_location.slug})
-
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-        return self.meetup_location
+                       kwargs={"slug": self.get_meetup_location().slug})
 
     def check_permissions(self, request):
         """Check if the request user has the permission to delete a meetup from the meetup
@@ -319,12 +388,21 @@ class EditMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
         return reverse("view_meetup", kwargs={"slug": self.object.meetup_location.slug,
                        "meetup_slug": self.object.slug})
 
+    def form_valid(self, form):
+        """Offer the seats left to the waitlist, in case the capacity was raised"""
+        response = super(EditMeetupView, self).form_valid(form)
+        promote_waitlist(self.object.pk)
+        return response
+
+    def get_object(self, queryset=None):
+        """Get the Meetup of the URL, along with its MeetupLocation"""
+        return resolve_meetup(self.request, self.kwargs['meetup_slug'])
+
     def get_context_data(self, **kwargs):
         """Add Meetup and MeetupLocation objects to the context"""
         context = super(EditMeetupView, self).get_context_data(**kwargs)
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        context['meetup'] = self.meetup
-        context['meetup_location'] = self.meetup.meetup_location
+        context['meetup'] = self.object
+        context['meetup_location'] = self.object.meetup_location
         return context
 
     def check_permissions(self, request):
@@ -333,7 +411,7 @@ class EditMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
         return request.user.has_perm('meetup.change_meetup')
 
 
-class UpcomingMeetupsView(MeetupLocationMixin, ListView):
+class UpcomingMeetupsView(PublicCacheMixin, MeetupLocationMixin, ListView):
     """List upcoming meetups of a meetup location"""
     template_name = "meetup/upcoming_meetups.html"
     model = Meetup
@@ -342,18 +420,23 @@ class UpcomingMeetupsView(MeetupLocationMixin, ListView):
     def get_queryset(self, **kwargs):
         """Set ListView queryset to all the meetups whose date is equal to or greater than the
         current date"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         meetup_list = Meetup.objects.filter(
             meetup_location=self.meetup_location,
-            date__gte=datetime.date.today()).order_by('date', 'time')
+            date__gte=datetime.date.today()).order_by('date', 'time').defer(
+            'description', 'body_html')
         return meetup_list
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the upcoming meetups, cached in the namespace of the meetup location"""
+        meetup_list = get_or_set_namespaced(
+            get_object_namespace(MeetupLocation, self.meetup_location.pk),
+            ('upcoming', datetime.date.today()), lambda: list(queryset),
+            settings.OBJECT_CACHE_TIMEOUT)
+        return super(UpcomingMeetupsView, self).paginate_queryset(meetup_list, page_size)
 
 
-class PastMeetupListView(MeetupLocationMixin, ListView):
+class PastMeetupListView(PublicCacheMixin, MeetupLocationMixin, ListView):
     """List past meetups of a meetup location"""
     template_name = "meetup/past_meetups.html"
     model = Meetup
@@ -361,25 +444,22 @@ class PastMeetupListView(MeetupLocationMixin, ListView):
 
     def get_queryset(self, **kwargs):
         """Set ListView queryset to all the meetups whose date is less than the current date"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         meetup_list = Meetup.objects.filter(
             meetup_location=self.meetup_location,
-            date__lt=datetime.date.today()).order_by('date', 'time')
+            date__lt=datetime.date.today()).order_by('date', 'time').defer(
+            'description', 'body_html')
         return meetup_list
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
 
-
-class MeetupLocationSponsorsView(MeetupLocationMixin, DetailView):
+class MeetupLocationSponsorsView(PublicCacheMixin, MeetupLocationMixin, DetailView):
     """View sponsors of a meetup location"""
     template_name = "meetup/sponsors.html"
     model = MeetupLocation
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+    def get_object(self, queryset=None):
+        """Get the MeetupLocation of the slug, shared with the rest of the request"""
+        return self.get_meetup_location()
 
 
 class RemoveMeetupLocationMemberView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -401,14 +481,10 @@ class RemoveMeetupLocationMemberView(LoginRequiredMixin, PermissionRequiredMixin
             self.meetup_location.members.remove(systersuser)
         return reverse('members_meetup_location', kwargs={'slug': self.meetup_location.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to remove a member from the meetup
         location. The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('delete_meetup_location_member', self.meetup_location)
 
 
@@ -427,14 +503,10 @@ class AddMeetupLocationMemberView(FormValidMessageMixin, FormInvalidMessageMixin
         """Redirect to the members page of the meetup location in case of successful addition"""
         return reverse('members_meetup_location', kwargs={'slug': self.meetup_location.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to add a member to the meetup location.
         The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('add_meetup_location_member', self.meetup_location)
 
 
@@ -455,14 +527,10 @@ class RemoveMeetupLocationOrganizerView(LoginRequiredMixin, PermissionRequiredMi
             self.meetup_location.organizers.remove(systersuser)
         return reverse('members_meetup_location', kwargs={'slug': self.meetup_location.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to remove an organizer from the meetup
         location. The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('delete_meetup_location_organizer', self.meetup_location)
 
 
@@ -481,16 +549,13 @@ class MakeMeetupLocationOrganizerView(LoginRequiredMixin, PermissionRequiredMixi
         organizers = self.meetup_location.organizers.all()
         if systersuser not in organizers:
             self.meetup_location.organizers.add(systersuser)
+            enqueue(notify_new_organizer, self.meetup_location.pk, systersuser.pk)
         return reverse('members_meetup_location', kwargs={'slug': self.meetup_location.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to add an organizer to the meetup
         location. The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('add_meetup_location_organizer', self.meetup_location)
 
 
@@ -508,13 +573,13 @@ class JoinMeetupLocationView(LoginRequiredMixin, MeetupLocationMixin, RedirectVi
         """Display messages to the user as per the following conditions:
 
         * if the user is not a meetup location member and has not requested to join the location
-          before, add the user's join request, display the corresponding message and send a
-          notification to all organizers
+          before, add the user's join request and display the corresponding message, the
+          organizers are notified in their next join requests digest
         * if the user is not a meetup location member and has requested to join the location
           before, display the corresponding message
         * if the user is aleady a member of the meetup location, display the corresponding message
         """
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         user = get_object_or_404(User, username=self.kwargs.get('username'))
         systersuser = get_object_or_404(SystersUser, user=user)
 
@@ -535,26 +600,103 @@ class JoinMeetupLocationView(LoginRequiredMixin, MeetupLocationMixin, RedirectVi
             messages.add_message(self.request, messages.WARNING, msg.format(self.meetup_location))
         return super(JoinMeetupLocationView, self).get(request, *args, **kwargs)
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
 
-
-class MeetupLocationJoinRequestsView(LoginRequiredMixin, MeetupLocationMixin, DetailView):
-    """View all join requests for a meetup location"""
-    model = MeetupLocation
+class MeetupLocationJoinRequestsView(LoginRequiredMixin, PermissionRequiredMixin,
+                                     MeetupLocationMixin, ListView):
+    """Paginated queue of the join requests to a meetup location, oldest first"""
     template_name = "meetup/join_requests.html"
-    paginated_by = 20
+    context_object_name = 'requests'
+    paginate_by = 20
+
+    def get_queryset(self):
+        """Set ListView queryset to the join requests of the meetup location"""
+        return get_pending_join_requests(self.meetup_location).select_related(
+            'systersuser__user')
 
     def get_context_data(self, **kwargs):
-        """Add all join requests to the context"""
+        """Add the bulk moderation form to the context"""
         context = super(MeetupLocationJoinRequestsView, self).get_context_data(**kwargs)
-        context['requests'] = self.object.join_requests.all()
+        context['form'] = JoinRequestsModerationForm(meetup_location=self.meetup_location)
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.object
+    def check_permissions(self, request):
+        """Check if the request user has the permission to approve join requests of the meetup
+        location. The permission holds true for superusers."""
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        return request.user.has_perm('approve_meetup_location_joinrequest',
+                                     self.meetup_location)
+
+
+class ModerateMeetupLocationJoinRequestsView(LoginRequiredMixin, PermissionRequiredMixin,
+                                             FormView):
+    """Approve or reject the selected join requests to a meetup location, or all of them"""
+    form_class = JoinRequestsModerationForm
+    http_method_names = ['post']
+    raise_exception = True
+
+    def get_form_kwargs(self):
+        """Add the meetup location to the form kwargs"""
+        kwargs = super(ModerateMeetupLocationJoinRequestsView, self).get_form_kwargs()
+        kwargs['meetup_location'] = self.meetup_location
+        return kwargs
+
+    def form_valid(self, form):
+        """Apply the action to the selected join requests in one transaction"""
+        action = form.cleaned_data['action']
+        if not self.request.user.has_perm('{0}_meetup_location_joinrequest'.format(action),
+                                          self.meetup_location):
+            raise PermissionDenied
+        if action == APPROVE:
+            count = approve_join_requests(self.meetup_location, form.get_systersuser_ids())
+            messages.success(self.request, JOIN_REQUESTS_APPROVED_MSG.format(count))
+        else:
+            count = reject_join_requests(self.meetup_location, form.get_systersuser_ids())
+            messages.warning(self.request, JOIN_REQUESTS_REJECTED_MSG.format(count))
+        return super(ModerateMeetupLocationJoinRequestsView, self).form_valid(form)
+
+    def form_invalid(self, form):
+        """Redirect back to the queue with the form errors as messages"""
+        for error in form.non_field_errors():
+            messages.error(self.request, error)
+        if form.has_error('join_requests'):
+            messages.error(self.request, ERROR_MSG)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def get_success_url(self):
+        """Redirect to the page of the queue the request was sent from"""
+        url = reverse('join_requests_meetup_location', kwargs={'slug': self.meetup_location.slug})
+        page = self.request.GET.get('page')
+        if page and page.isdigit():
+            url = "{0}?page={1}".format(url, page)
+        return url
+
+    def check_permissions(self, request):
+        """Check if the request user has the permission to approve or reject join requests of
+        the meetup location. The permission holds true for superusers."""
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        return any(request.user.has_perm(perm, self.meetup_location) for perm in
+                   ('approve_meetup_location_joinrequest', 'reject_meetup_location_joinrequest'))
+
+
+class MeetupLocationJoinRequestsExportView(LoginRequiredMixin, PermissionRequiredMixin,
+                                           StreamingExportMixin, View):
+    """Export the join requests of a Meetup Location as CSV or JSON Lines"""
+    raise_exception = True
+    export_fields = (('username', 'user__username'), ('first_name', 'user__first_name'),
+                     ('last_name', 'user__last_name'), ('email', 'user__email'))
+
+    def get_export_name(self):
+        return "{0}-join-requests".format(self.meetup_location.slug)
+
+    def get_export_queryset(self):
+        return self.meetup_location.join_requests.order_by('pk')
+
+    def check_permissions(self, request):
+        """Check if the request user has the permission to approve join requests of the meetup
+        location. The permission holds true for superusers."""
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        return request.user.has_perm('approve_meetup_location_joinrequest',
+                                     self.meetup_location)
 
 
 class ApproveMeetupLocationJoinRequestView(LoginRequiredMixin, PermissionRequiredMixin,
@@ -565,23 +707,17 @@ class ApproveMeetupLocationJoinRequestView(LoginRequiredMixin, PermissionRequire
     raise_exception = True
 
     def get_redirect_url(self, *args, **kwargs):
-        """Add the user to the members of the meetup location, send the user a notification and
-        redirect to meetup location's join request page"""
-        user = get_object_or_404(User, username=self.kwargs.get('username'))
-        systersuser = get_object_or_404(SystersUser, user=user)
-        self.meetup_location.members.add(systersuser)
-        self.meetup_location.join_requests.remove(systersuser)
+        """Add the user to the members of the meetup location and redirect to meetup location's
+        join request page"""
+        systersuser = get_object_or_404(SystersUser, user__username=self.kwargs.get('username'))
+        approve_join_requests(self.meetup_location, [systersuser.pk])
         messages.success(self.request, 'Join request Approved.')
         return reverse('join_requests_meetup_location', kwargs={'slug': self.meetup_location.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to approve a join request for the meetup
         location. The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('approve_meetup_location_joinrequest', self.meetup_location)
 
 
@@ -594,20 +730,15 @@ class RejectMeetupLocationJoinRequestView(LoginRequiredMixin, PermissionRequired
 
     def get_redirect_url(self, *args, **kwargs):
         """Delete the user's join request and redirect to meetup location's join request page"""
-        user = get_object_or_404(User, username=self.kwargs.get('username'))
-        systersuser = get_object_or_404(SystersUser, user=user)
-        self.meetup_location.join_requests.remove(systersuser)
+        systersuser = get_object_or_404(SystersUser, user__username=self.kwargs.get('username'))
+        reject_join_requests(self.meetup_location, [systersuser.pk])
         messages.warning(self.request, 'Join Request Deleted.')
         return reverse('join_requests_meetup_location', kwargs={'slug': self.meetup_location.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to reject a join request for the meetup
         location. The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('reject_meetup_location_joinrequest', self.meetup_location)
 
 
@@ -637,7 +768,7 @@ class AddMeetupLocationView(FormValidMessageMixin, FormInvalidMessageMixin, Logi
     def check_permissions(self, request):
         """Check if the request user has the permission to add a meetup location.
         The permission holds true for superusers."""
-        self.systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.systersuser = resolve_object(request, SystersUser, user=request.user)
         return request.user.has_perm('meetup.add_meetuplocation')
 
 
@@ -654,17 +785,16 @@ class EditMeetupLocationView(FormValidMessageMixin, FormInvalidMessageMixin, Log
 
     def get_success_url(self):
         """Redirect to the meetup location's about page in case of successful submission"""
-        self.get_meetup_location()
-        return reverse("about_meetup_location", kwargs={"slug": self.meetup_location.slug})
+        return reverse("about_meetup_location", kwargs={"slug": self.object.slug})
 
-    def get_meetup_location(self, **kwargs):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
+    def get_object(self, queryset=None):
+        """Get the MeetupLocation of the slug, shared with the rest of the request"""
+        return self.get_meetup_location()
 
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a meetup location.
         The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('meetup.change_meetuplocation')
 
 
@@ -679,14 +809,14 @@ class DeleteMeetupLocationView(LoginRequiredMixin, PermissionRequiredMixin, Meet
         """Redirect to the list of meetup locations in case of successful deletion"""
         return reverse("list_meetup_location")
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.object
+    def get_object(self, queryset=None):
+        """Get the MeetupLocation of the slug, shared with the rest of the request"""
+        return self.get_meetup_location()
 
     def check_permissions(self, request):
         """Check if the request user has the permission to delete a meetup location.
         The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('meetup.delete_meetuplocation')
 
 
@@ -709,8 +839,8 @@ class AddMeetupCommentView(FormValidMessageMixin, FormInvalidMessageMixin, Login
         """Add meetup object and request user to the form kwargs. Used to autofill form fields with
         content_object and author without explicitly filling them up in the form."""
         kwargs = super(AddMeetupCommentView, self).get_form_kwargs()
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         kwargs.update({'content_object': self.meetup})
         kwargs.update({'author': self.request.user})
         return kwargs
@@ -721,10 +851,6 @@ class AddMeetupCommentView(FormValidMessageMixin, FormInvalidMessageMixin, Login
         context['meetup'] = self.meetup
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
 
 class EditMeetupCommentView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequiredMixin,
                             PermissionRequiredMixin, MeetupLocationMixin,
@@ -747,18 +873,18 @@ class EditMeetupCommentView(FormValidMessageMixin, FormInvalidMessageMixin, Logi
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(EditMeetupCommentView, self).get_context_data(**kwargs)
-        context['meetup'] = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        context['meetup'] = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         return context
 
     def get_meetup_location(self):
         """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return self.meetup_location
 
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a meetup comment."""
-        self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.comment = resolve_object(self.request, Comment, pk=self.kwargs['comment_pk'])
+        systersuser = resolve_object(request, SystersUser, user=request.user)
         return systersuser == self.comment.author
 
 
@@ -779,18 +905,18 @@ class DeleteMeetupCommentView(LoginRequiredMixin, PermissionRequiredMixin, Meetu
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(DeleteMeetupCommentView, self).get_context_data(**kwargs)
-        context['meetup'] = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        context['meetup'] = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         return context
 
     def get_meetup_location(self):
         """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return self.meetup_location
 
     def check_permissions(self, request):
         """Check if the request user has the permission to delete a meetup comment."""
-        self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.comment = resolve_object(self.request, Comment, pk=self.kwargs['comment_pk'])
+        systersuser = resolve_object(request, SystersUser, user=request.user)
         return systersuser == self.comment.author
 
 
@@ -800,7 +926,6 @@ class RsvpMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
     template_name = "meetup/rsvp_meetup.html"
     model = Rsvp
     form_class = RsvpForm
-    form_valid_message = (u"Success")
     form_invalid_message = ERROR_MSG
     raise_exception = True
 
@@ -809,56 +934,167 @@ class RsvpMeetupView(FormValidMessageMixin, FormInvalidMessageMixin, LoginRequir
         return reverse("view_meetup", kwargs={"slug": self.meetup_location.slug,
                                               "meetup_slug": self.object.meetup.slug})
 
+    def form_valid(self, form):
+        self.form = form
+        return super(RsvpMeetupView, self).form_valid(form)
+
+    def get_form_valid_message(self):
+        """Tell the user when the RSVP was waitlisted or the plus one did not fit"""
+        return RSVP_MESSAGES[self.form.status]
+
     def get_form_kwargs(self):
         """Add request user and meetup object to the form kwargs. Used to autofill form fields
         with user and meetup without explicitly filling them up in the form."""
         kwargs = super(RsvpMeetupView, self).get_form_kwargs()
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         kwargs.update({'user': self.request.user})
         kwargs.update({'meetup': self.meetup})
         return kwargs
 
+    def get_initial(self):
+        """Fill the form with the current RSVP of the user, if any, to change it"""
+        initial = super(RsvpMeetupView, self).get_initial()
+        rsvp = Rsvp.objects.filter(meetup__slug=self.kwargs['meetup_slug'],
+                                   user__user=self.request.user).values(
+            'coming', 'plus_one').first()
+        if rsvp is not None:
+            initial.update(rsvp)
+        return initial
+
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(RsvpMeetupView, self).get_context_data(**kwargs)
         context['meetup'] = self.meetup
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
+    def check_permissions(self, request):
+        """Check if the request user has the permission to RSVP for a meetup. The permission
+        holds true for superusers."""
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        return request.user.has_perm('add_meetup_rsvp', self.meetup_location)
+
+
+class RsvpMeetupJsonView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """RSVP for a meetup, or change the RSVP, in a single POST answered with JSON, for one-click
+    RSVP buttons"""
+    http_method_names = ['post']
+    raise_exception = True
+
+    def post(self, request, *args, **kwargs):
+        form = RsvpForm(data=request.POST, user=request.user, meetup=self.meetup)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        rsvp = form.save()
+        return JsonResponse({'status': form.status, 'message': RSVP_MESSAGES[form.status],
+                             'coming': rsvp.coming, 'plus_one': rsvp.plus_one,
+                             'waitlisted': rsvp.waitlisted})
 
     def check_permissions(self, request):
         """Check if the request user has the permission to RSVP for a meetup. The permission
         holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
+        if self.meetup.meetup_location_id != self.meetup_location.pk:
+            raise Http404
         return request.user.has_perm('add_meetup_rsvp', self.meetup_location)
 
 
 class RsvpGoingView(LoginRequiredMixin, MeetupLocationMixin, ListView):
-    """List of members whose rsvp status is 'coming'"""
+    """List of members who rsvp'd for a meetup, in tabs: going, going with a plus one and not
+    going. The pages and the number of RSVPs of each tab are cached until the next RSVP write."""
     template_name = "meetup/rsvp_going.html"
     model = Rsvp
-    paginated_by = 30
+    paginate_by = 30
+
+    def get_tab(self):
+        """Get the tab from the query string, by default the members going"""
+        tab = self.request.GET.get('tab')
+        return tab if tab in dict(RSVP_TABS) else GOING
 
     def get_queryset(self, **kwargs):
-        """Set ListView queryset to all rsvps whose 'coming' attribute is set to True"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        """Set ListView queryset to the rsvps of the tab, without the waitlisted ones"""
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'],
                                         meetup_location=self.meetup_location)
-        rsvp_list = Rsvp.objects.filter(meetup=self.meetup, coming=True)
-        return rsvp_list
+        self.tab = self.get_tab()
+        rsvp_list = Rsvp.objects.filter(meetup=self.meetup)
+        if self.tab == NOT_GOING:
+            rsvp_list = rsvp_list.filter(coming=False)
+        else:
+            rsvp_list = rsvp_list.filter(coming=True, waitlisted=False)
+            if self.tab == PLUS_ONE:
+                rsvp_list = rsvp_list.filter(plus_one=True)
+        return rsvp_list.select_related('user__user').only(
+            'plus_one', 'user__user__username').order_by('pk')
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the rsvps of the tab with their cached count. Each page is read with
+        LIMIT/OFFSET and cached on its own, under its page number."""
+        paginator, page, positions, is_paginated = super(RsvpGoingView, self).paginate_queryset(
+            range(self.get_rsvp_counts()[self.tab]), page_size)
+        key = get_rsvps_cache_key(self.meetup.pk, 'page', self.tab, page.number)
+        page.object_list = cache.get(key)
+        if page.object_list is None:
+            page.object_list = list(queryset[positions.start:positions.stop])
+            cache.set(key, page.object_list, settings.MEETUP_RSVPS_CACHE_TIMEOUT)
+        return paginator, page, page.object_list, is_paginated
+
+    def get_rsvp_counts(self):
+        """Count the rsvps of each tab with a single grouped query
+
+        :return: dict mapping the tabs to integer numbers of rsvps
+        """
+        key = get_rsvps_cache_key(self.meetup.pk, 'counts')
+        counts = cache.get(key)
+        if counts is None:
+            counts = dict.fromkeys(dict(RSVP_TABS), 0)
+            groups = Rsvp.objects.filter(meetup=self.meetup).order_by().values_list(
+                'coming', 'plus_one', 'waitlisted').annotate(count=Count('pk'))
+            for coming, plus_one, waitlisted, count in groups:
+                if not coming:
+                    counts[NOT_GOING] += count
+                elif not waitlisted:
+                    counts[GOING] += count
+                    if plus_one:
+                        counts[PLUS_ONE] += count
+            cache.set(key, counts, settings.MEETUP_RSVPS_CACHE_TIMEOUT)
+        return counts
 
     def get_context_data(self, **kwargs):
-        """Add Meetup object to the context"""
+        """Add Meetup object, the current tab and the tabs with their number of rsvps to the
+        context"""
         context = super(RsvpGoingView, self).get_context_data(**kwargs)
         context['meetup'] = self.meetup
+        context['tab'] = self.tab
+        counts = self.get_rsvp_counts()
+        context['tabs'] = [(tab, label, counts[tab]) for tab, label in RSVP_TABS]
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
+
+class RsvpGoingExportView(PermissionRequiredMixin, StreamingExportMixin, RsvpGoingView):
+    """Export the members going to a meetup as CSV or JSON Lines. Unlike the list, the export
+    includes email addresses, hence it is restricted to the organizers."""
+    raise_exception = True
+    export_fields = (('username', 'user__user__username'),
+                     ('first_name', 'user__user__first_name'),
+                     ('last_name', 'user__user__last_name'), ('email', 'user__user__email'),
+                     ('plus_one', 'plus_one'), ('last_updated', 'last_updated'))
+
+    def get_tab(self):
+        return GOING
+
+    def get_export_name(self):
+        return "{0}-going".format(self.meetup.slug)
+
+    def get_export_queryset(self):
+        return self.get_queryset().order_by('pk')
+
+    def check_permissions(self, request):
+        """Check if the request user has the permission to add a member to the meetup location.
+        The permission holds true for superusers."""
+        meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        return request.user.has_perm('add_meetup_location_member', meetup_location)
 
 
 class AddSupportRequestView(FormValidMessageMixin, FormInvalidMessageMixin,
@@ -881,8 +1117,8 @@ class AddSupportRequestView(FormValidMessageMixin, FormInvalidMessageMixin,
         """Add request user and meetup object to the form kwargs. Used to autofill form fields
         with volunteer and meetup without explicitly filling them up in the form."""
         kwargs = super(AddSupportRequestView, self).get_form_kwargs()
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         kwargs.update({'volunteer': self.request.user})
         kwargs.update({'meetup': self.meetup})
         return kwargs
@@ -893,10 +1129,6 @@ class AddSupportRequestView(FormValidMessageMixin, FormInvalidMessageMixin,
         context['meetup'] = self.meetup
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to add a Support Request for a meetup.
         The permission holds true for superusers."""
@@ -923,13 +1155,13 @@ class EditSupportRequestView(FormValidMessageMixin, FormInvalidMessageMixin, Log
     def get_context_data(self, **kwargs):
         """Add Meetup object to the context"""
         context = super(EditSupportRequestView, self).get_context_data(**kwargs)
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         context['meetup'] = self.meetup
         return context
 
     def get_meetup_location(self):
         """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return self.meetup_location
 
     def check_permissions(self, request):
@@ -954,7 +1186,7 @@ class DeleteSupportRequestView(LoginRequiredMixin, PermissionRequiredMixin, Meet
 
     def get_meetup_location(self):
         """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return self.meetup_location
 
     def check_permissions(self, request):
@@ -963,7 +1195,7 @@ class DeleteSupportRequestView(LoginRequiredMixin, PermissionRequiredMixin, Meet
         return request.user.has_perm('meetup.delete_supportrequest')
 
 
-class SupportRequestView(MeetupLocationMixin, DetailView):
+class SupportRequestView(CommentThreadMixin, MeetupLocationMixin, DetailView):
     """View a support request"""
     template_name = "meetup/support_request.html"
     model = SupportRequest
@@ -971,18 +1203,11 @@ class SupportRequestView(MeetupLocationMixin, DetailView):
     def get_context_data(self, **kwargs):
         """Add Meetup object, SupportRequest object and approved comments to the context"""
         context = super(SupportRequestView, self).get_context_data(**kwargs)
-        context['meetup'] = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        context['meetup'] = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         context['support_request'] = self.object
-        context['comments'] = Comment.objects.filter(
-            content_type=ContentType.objects.get(app_label='meetup', model='supportrequest'),
-            object_id=self.object.id,
-            is_approved=True).order_by('date_created')
+        context.update(self.get_comment_thread_context(self.object))
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-
 
 class SupportRequestsListView(MeetupLocationMixin, ListView):
     """List support requests for a meetup"""
@@ -992,7 +1217,7 @@ class SupportRequestsListView(MeetupLocationMixin, ListView):
 
     def get_queryset(self, **kwargs):
         """Set ListView queryset to all approved support requests of the meetup"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         supportrequest_list = SupportRequest.objects.filter(meetup=self.meetup, is_approved=True)
         return supportrequest_list
 
@@ -1002,10 +1227,6 @@ class SupportRequestsListView(MeetupLocationMixin, ListView):
         context['meetup'] = self.meetup
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-
 
 class UnapprovedSupportRequestsListView(LoginRequiredMixin, PermissionRequiredMixin,
                                         MeetupLocationMixin, ListView):
@@ -1016,7 +1237,7 @@ class UnapprovedSupportRequestsListView(LoginRequiredMixin, PermissionRequiredMi
 
     def get_queryset(self, **kwargs):
         """Set ListView queryset to all unapproved support requests of the meetup"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
         supportrequest_list = SupportRequest.objects.filter(
             meetup=self.meetup, is_approved=False)
         return supportrequest_list
@@ -1027,13 +1248,9 @@ class UnapprovedSupportRequestsListView(LoginRequiredMixin, PermissionRequiredMi
         context['meetup'] = self.meetup
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to approve a support request."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('approve_support_request', self.meetup_location)
 
 
@@ -1047,20 +1264,16 @@ class ApproveSupportRequestView(LoginRequiredMixin, PermissionRequiredMixin, Mee
     def get_redirect_url(self, *args, **kwargs):
         """Approve the support request, send the user a notification and redirect to the unapproved
         support requests' page"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
+        support_request = resolve_object(self.request, SupportRequest, pk=self.kwargs['pk'])
         support_request.is_approved = True
         support_request.save()
         return reverse('unapproved_support_requests', kwargs={'slug': self.meetup_location.slug,
                        'meetup_slug': self.meetup.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to approve a support request."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('approve_support_request', self.meetup_location)
 
 
@@ -1073,19 +1286,15 @@ class RejectSupportRequestView(LoginRequiredMixin, PermissionRequiredMixin, Meet
 
     def get_redirect_url(self, *args, **kwargs):
         """Delete the support request and redirect to the unapproved support requests' page"""
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
+        support_request = resolve_object(self.request, SupportRequest, pk=self.kwargs['pk'])
         support_request.delete()
         return reverse('unapproved_support_requests', kwargs={'slug': self.meetup_location.slug,
                        'meetup_slug': self.meetup.slug})
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to reject a support request."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('reject_support_request', self.meetup_location)
 
 
@@ -1109,8 +1318,8 @@ class AddSupportRequestCommentView(FormValidMessageMixin, FormInvalidMessageMixi
         """Add support request object and request user to the form kwargs. Used to autofill form
         fields with content_object and author without explicitly filling them up in the form."""
         kwargs = super(AddSupportRequestCommentView, self).get_form_kwargs()
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
+        self.support_request = resolve_object(self.request, SupportRequest, pk=self.kwargs['pk'])
         kwargs.update({'content_object': self.support_request})
         kwargs.update({'author': self.request.user})
         return kwargs
@@ -1122,14 +1331,10 @@ class AddSupportRequestCommentView(FormValidMessageMixin, FormInvalidMessageMixi
         context['support_request'] = self.support_request
         return context
 
-    def get_meetup_location(self):
-        """Add MeetupLocation object to the context"""
-        return self.meetup_location
-
     def check_permissions(self, request):
         """Check if the request user has the permission to add a comment to a Support Request.
         The permission holds true for superusers."""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
         return request.user.has_perm('add_support_request_comment', self.meetup_location)
 
 
@@ -1161,15 +1366,15 @@ class EditSupportRequestCommentView(FormValidMessageMixin, FormInvalidMessageMix
 
     def get_meetup_location(self):
         """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
+        self.support_request = resolve_object(self.request, SupportRequest, pk=self.kwargs['pk'])
         return self.meetup_location
 
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a comment to a Support Request"""
-        self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.comment = resolve_object(self.request, Comment, pk=self.kwargs['comment_pk'])
+        systersuser = resolve_object(request, SystersUser, user=request.user)
         return systersuser == self.comment.author
 
 
@@ -1197,13 +1402,13 @@ class DeleteSupportRequestCommentView(LoginRequiredMixin, PermissionRequiredMixi
 
     def get_meetup_location(self):
         """Add MeetupLocation object to the context"""
-        self.meetup_location = get_object_or_404(MeetupLocation, slug=self.kwargs['slug'])
-        self.meetup = get_object_or_404(Meetup, slug=self.kwargs['meetup_slug'])
-        self.support_request = get_object_or_404(SupportRequest, pk=self.kwargs['pk'])
+        self.meetup_location = resolve_meetup_location(self.request, self.kwargs['slug'])
+        self.meetup = resolve_meetup(self.request, self.kwargs['meetup_slug'])
+        self.support_request = resolve_object(self.request, SupportRequest, pk=self.kwargs['pk'])
         return self.meetup_location
 
     def check_permissions(self, request):
         """Check if the request user has the permission to edit a Support Request for a meetup"""
-        self.comment = get_object_or_404(Comment, pk=self.kwargs['comment_pk'])
-        systersuser = get_object_or_404(SystersUser, user=request.user)
+        self.comment = resolve_object(self.request, Comment, pk=self.kwargs['comment_pk'])
+        systersuser = resolve_object(request, SystersUser, user=request.user)
         return systersuser == self.comment.author
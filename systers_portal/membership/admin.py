@@ -1,6 +1,17 @@
 from django.contrib import admin
 
+from common.admin import IndexedSearchAdmin
 from membership.models import JoinRequest
 
 
-admin.site.register(JoinRequest)
+class JoinRequestAdmin(IndexedSearchAdmin):
+    list_display = ('user', 'community', 'is_approved', 'approved_by',
+                    'date_created')
+    list_filter = ('is_approved', 'community')
+    list_select_related = ('user__user', 'approved_by__user',
+                           'community')
+    raw_id_fields = ('user', 'approved_by')
+    search_fields = ('user__user__username',)
+
+
+admin.site.register(JoinRequest, JoinRequestAdmin)
@@ -0,0 +1,139 @@
+"""Retention of the join requests to communities.
+
+Approved join requests older than `JOIN_REQUESTS_ARCHIVE_AGE` days and not
+approved ones older than `JOIN_REQUESTS_STALE_AGE` days are moved from the
+JoinRequest table to the ArchivedJoinRequest table, in batches each running
+in its own transaction, so that the lookups of pending and last join
+requests only go through recent rows. A JoinRequestSummary per user and
+community keeps the last archived join request.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from membership.models import (ArchivedJoinRequest, JoinRequest,
+                               JoinRequestSummary)
+
+
+FIELDS = ('id', 'user_id', 'approved_by_id', 'community_id', 'date_created',
+          'is_approved')
+
+
+def get_cutoffs(age=None, stale_age=None, now=None):
+    """Get the dates before which the join requests are archived
+
+    :param age: integer age in days of the approved join requests to archive,
+                defaults to `JOIN_REQUESTS_ARCHIVE_AGE`
+    :param stale_age: integer age in days of the not approved join requests
+                      to archive, defaults to `JOIN_REQUESTS_STALE_AGE`
+    :param now: datetime object, defaults to the current time
+    :return: tuple (datetime cutoff of the approved join requests, datetime
+             cutoff of the not approved join requests)
+    """
+    now = now or timezone.now()
+    if age is None:
+        age = settings.JOIN_REQUESTS_ARCHIVE_AGE
+    if stale_age is None:
+        stale_age = settings.JOIN_REQUESTS_STALE_AGE
+    return now - timedelta(days=age), now - timedelta(days=stale_age)
+
+
+def get_archivable_join_requests(approved_before, pending_before):
+    """Get the join requests due for archival, oldest first
+
+    :param approved_before: datetime cutoff of the approved join requests
+    :param pending_before: datetime cutoff of the not approved join requests
+    :return: QuerySet of JoinRequest objects
+    """
+    approved = Q(is_approved=True, date_created__lt=approved_before)
+    stale = Q(is_approved=False, date_created__lt=pending_before)
+    return JoinRequest.objects.filter(approved | stale).order_by('pk')
+
+
+@transaction.atomic
+def archive_batch(approved_before, pending_before, batch_size):
+    """Move a batch of join requests to the archive and update the summaries
+    of their users, with a fixed number of queries. The rows locked by
+    another archival are skipped.
+
+    :param approved_before: datetime cutoff of the approved join requests
+    :param pending_before: datetime cutoff of the not approved join requests
+    :param batch_size: integer maximum number of join requests to archive
+    :return: integer number of archived join requests
+    """
+    rows = list(get_archivable_join_requests(
+        approved_before, pending_before).select_for_update(
+        skip_locked=True).values(*FIELDS)[:batch_size])
+    if not rows:
+        return 0
+    ArchivedJoinRequest.objects.bulk_create(
+        [ArchivedJoinRequest(**row) for row in rows])
+    update_summaries(rows)
+    JoinRequest.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+SUMMARY_UPSERT_SQL = """
+INSERT INTO {table} AS summary (user_id, community_id, count, date_created, is_approved)
+VALUES {values}
+ON CONFLICT (user_id, community_id) DO UPDATE SET
+count = summary.count + EXCLUDED.count,
+is_approved = CASE WHEN EXCLUDED.date_created >= summary.date_created
+              THEN EXCLUDED.is_approved ELSE summary.is_approved END,
+date_created = GREATEST(summary.date_created, EXCLUDED.date_created)
+"""
+
+
+def update_summaries(rows):
+    """Merge archived join requests into the summaries of their users. On
+    PostgreSQL the summaries are upserted with a single
+    `INSERT ... ON CONFLICT DO UPDATE`, in a fixed order, so that concurrent
+    archivals merging into the same summaries wait for each other instead of
+    both inserting them. Other databases lock the existing summaries and
+    insert the missing ones.
+
+    :param rows: list of dicts of JoinRequest fields values
+    """
+    counts = Counter()
+    latest = {}
+    for row in rows:
+        key = (row['user_id'], row['community_id'])
+        counts[key] += 1
+        if key not in latest or \
+                row['date_created'] >= latest[key]['date_created']:
+            latest[key] = row
+    keys = sorted(counts)
+    if connection.vendor == 'postgresql':
+        params = []
+        for key in keys:
+            params.extend([key[0], key[1], counts[key], latest[key]['date_created'],
+                           latest[key]['is_approved']])
+        with connection.cursor() as cursor:
+            cursor.execute(SUMMARY_UPSERT_SQL.format(
+                table=JoinRequestSummary._meta.db_table,
+                values=", ".join(["(%s, %s, %s, %s, %s)"] * len(keys))), params)
+        return
+    summaries = {}
+    for summary in JoinRequestSummary.objects.select_for_update().filter(
+            user_id__in={key[0] for key in keys},
+            community_id__in={key[1] for key in keys}).order_by('pk'):
+        summaries[(summary.user_id, summary.community_id)] = summary
+    created = []
+    for key in keys:
+        row = latest[key]
+        summary = summaries.get(key)
+        if summary is None:
+            created.append(JoinRequestSummary(
+                user_id=key[0], community_id=key[1], count=counts[key],
+                date_created=row['date_created'], is_approved=row['is_approved']))
+            continue
+        summary.count += counts[key]
+        if row['date_created'] >= summary.date_created:
+            summary.date_created = row['date_created']
+            summary.is_approved = row['is_approved']
+        summary.save(update_fields=['count', 'date_created', 'is_approved'])
+    JoinRequestSummary.objects.bulk_create(created)
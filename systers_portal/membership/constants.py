@@ -6,6 +6,14 @@ NO_PENDING_JOIN_REQUEST = "no_pending_join_request"
 NOT_MEMBER = "not_member"
 OK = "ok"
 
+# join requests moderation actions
+APPROVE = "approve"
+REJECT = "reject"
+JOIN_REQUEST_ACTION_CHOICES = (
+    (APPROVE, "Approve"),
+    (REJECT, "Reject"),
+)
+
 # messages displayed to the user
 USER_ALREADY_MEMBER_MSG = "{0} is already a member of {1} community."
 USER_MEMBER_SUCCESS_MSG = "{0} successfully became a member of {1} community."
@@ -35,3 +43,9 @@ REMOVE_NOT_MEMBER_MSG = "{0} is not a member of {1} community, hence the " \
                         "user can't be removed from the community members."
 REMOVE_IS_ADMIN_MSG = "{0} is the {1} community admin. It is not possible " \
                       "to remove the admin from community members."
+JOIN_REQUESTS_APPROVED_MSG = "{0} users became members of {1} community."
+JOIN_REQUESTS_ALREADY_MEMBERS_MSG = "{0} users were already members of {1} " \
+                                    "community."
+JOIN_REQUESTS_REJECTED_MSG = "{0} users were rejected to become members of " \
+                             "{1} community."
+NO_JOIN_REQUEST_SELECTED_MSG = "Select the join requests to approve or reject."
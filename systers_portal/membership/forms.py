@@ -1,6 +1,9 @@
 from django import forms
 
 from common.helpers import SubmitCancelFormHelper
+from membership.constants import (JOIN_REQUEST_ACTION_CHOICES,
+                                  NO_JOIN_REQUEST_SELECTED_MSG)
+from membership.models import JoinRequest
 
 
 class TransferOwnershipForm(forms.Form):
@@ -17,3 +20,37 @@ class TransferOwnershipForm(forms.Form):
 
         self.helper = SubmitCancelFormHelper(
             self, cancel_href="{% url 'user' user.username %}")
+
+
+class JoinRequestsModerationForm(forms.Form):
+    """Form to approve or reject several join requests to a community at
+    once"""
+    action = forms.ChoiceField(choices=JOIN_REQUEST_ACTION_CHOICES)
+    join_requests = forms.ModelMultipleChoiceField(
+        queryset=JoinRequest.objects.none(), required=False)
+    select_all = forms.BooleanField(required=False)
+
+    def __init__(self, *args, **kwargs):
+        community = kwargs.pop('community')
+        super(JoinRequestsModerationForm, self).__init__(*args, **kwargs)
+        self.fields['join_requests'].queryset = \
+            JoinRequest.objects.get_pending(community)
+
+    def clean(self):
+        """Check that some join requests are selected"""
+        cleaned_data = super(JoinRequestsModerationForm, self).clean()
+        if not cleaned_data.get('select_all') and \
+                not cleaned_data.get('join_requests'):
+            raise forms.ValidationError(NO_JOIN_REQUEST_SELECTED_MSG)
+        return cleaned_data
+
+    def get_join_request_ids(self):
+        """Get the ids of the selected join requests
+
+        :return: list of integer JoinRequest ids, or None if all the join
+                 requests are selected
+        """
+        if self.cleaned_data['select_all']:
+            return None
+        return [join_request.pk
+                for join_request in self.cleaned_data['join_requests']]
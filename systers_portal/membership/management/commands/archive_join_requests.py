@@ -0,0 +1,32 @@
+from common.management.base import BatchCommand
+from membership.archive import (archive_batch, get_archivable_join_requests,
+                                get_cutoffs)
+
+
+class Command(BatchCommand):
+    help = "Move the old approved and not approved join requests to " \
+           "communities to the archive, in batches."
+    batch_size_setting = 'JOIN_REQUESTS_ARCHIVE_BATCH_SIZE'
+    pause_setting = 'JOIN_REQUESTS_ARCHIVE_PAUSE'
+    items = "join requests"
+    action = "archive"
+    done = "archived"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--age', type=int,
+                            help="Age in days of the approved join requests "
+                                 "to archive.")
+        parser.add_argument('--stale-age', type=int, dest='stale_age',
+                            help="Age in days of the not approved join "
+                                 "requests to archive.")
+        super(Command, self).add_arguments(parser)
+
+    def count(self):
+        return get_archivable_join_requests(*self.cutoffs).count()
+
+    def run_batch(self, batch_size):
+        return archive_batch(*self.cutoffs, batch_size=batch_size)
+
+    def handle(self, *args, **options):
+        self.cutoffs = get_cutoffs(options['age'], options['stale_age'])
+        super(Command, self).handle(*args, **options)
@@ -0,0 +1,230 @@
+import csv
+import re
+from collections import Counter
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from community.models import Community
+from meetup.models import MeetupLocation
+from meetup.utils import add_members as add_meetup_location_members
+from membership.models import JoinRequest
+from users.models import SystersUser
+
+
+HEADERS = ('username', 'email')
+USERNAME_INVALID_CHARACTERS_RE = re.compile(r'[^\w.@+-]')
+
+
+def chunked(items, size):
+    """Split a list in chunks
+
+    :param items: list
+    :param size: integer maximum length of a chunk
+    :return: generator of lists
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = "Add the users listed in a CSV file, one username or email per " \
+           "row, as members of a community or a meetup location. Users are " \
+           "created for the unknown emails."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="Path of the CSV file.")
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--community', help="Slug of the community.")
+        target.add_argument('--meetup-location', dest='meetup_location',
+                            help="Slug of the meetup location.")
+        parser.add_argument('--approved-by', dest='approved_by',
+                            help="Username of the user approving the pending "
+                                 "join requests to the community, defaults to "
+                                 "the admin of the community.")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Number of rows resolved or inserted per query.")
+        parser.add_argument('--dry-run', action='store_true', dest='dry_run',
+                            help="Report what would be done and roll back.")
+
+    def handle(self, *args, **options):
+        if options['community']:
+            target = Community.objects.filter(slug=options['community']).first()
+        else:
+            target = MeetupLocation.objects.filter(slug=options['meetup_location']).first()
+        if target is None:
+            raise CommandError("No community or meetup location with this slug.")
+        approved_by = None
+        if options['approved_by']:
+            approved_by = SystersUser.objects.filter(
+                user__username=options['approved_by']).first()
+            if approved_by is None:
+                raise CommandError("No user with this username.")
+        elif isinstance(target, Community):
+            approved_by = target.admin
+        self.chunk_size = options['chunk_size']
+        usernames, emails = self.read_identifiers(options['csv_file'])
+
+        with transaction.atomic():
+            user_ids, unknown = self.resolve_users(usernames, emails)
+            created_ids = self.create_users(
+                sorted(email for email in emails if email not in user_ids))
+            user_ids.update(created_ids)
+            systersuser_ids = self.get_systersuser_ids(set(user_ids.values()))
+            added = self.add_members(target, systersuser_ids, approved_by)
+            if options['dry_run']:
+                transaction.set_rollback(True)
+
+        self.stdout.write("{0}{1} users found, {2} users created, {3} members added to "
+                          "{4}".format("[dry run] " if options['dry_run'] else "",
+                                       len(set(user_ids.values())) - len(created_ids),
+                                       len(created_ids), len(added), target))
+        for identifier in unknown:
+            self.stderr.write("Unknown user: {0}".format(identifier))
+
+    def read_identifiers(self, path):
+        """Read the usernames and emails of the first column of a CSV file,
+        skipping an optional header row and blank rows.
+
+        :param path: string path of the CSV file
+        :return: tuple (list of usernames, list of lowercased emails), both
+                 without duplicates
+        """
+        usernames, emails = [], []
+        seen = set()
+        with open(path, newline='') as csv_file:
+            for line, row in enumerate(csv.reader(csv_file)):
+                value = row[0].strip() if row else ''
+                if not value or (line == 0 and value.lower() in HEADERS):
+                    continue
+                if '@' in value:
+                    value = value.lower()
+                if value in seen:
+                    continue
+                seen.add(value)
+                (emails if '@' in value else usernames).append(value)
+        return usernames, emails
+
+    def resolve_users(self, usernames, emails):
+        """Find the users by username, and by primary or secondary email
+        address, one query per chunk of identifiers.
+
+        :param usernames: list of string usernames
+        :param emails: list of string lowercased emails
+        :return: tuple (dict mapping the identifiers found to user ids, list
+                 of the usernames not found)
+        """
+        user_ids = {}
+        for chunk in chunked(usernames, self.chunk_size):
+            user_ids.update(User.objects.filter(username__in=chunk).values_list('username', 'pk'))
+        for chunk in chunked(emails, self.chunk_size):
+            # the oldest account wins when an email is used by several users
+            addresses = EmailAddress.objects.annotate(lower_email=Lower('email')).filter(
+                lower_email__in=chunk).order_by('-user_id').values_list('lower_email', 'user_id')
+            user_ids.update(addresses)
+            users = User.objects.annotate(lower_email=Lower('email')).filter(
+                lower_email__in=chunk).order_by('-pk').values_list('lower_email', 'pk')
+            user_ids.update(users)
+        return user_ids, [username for username in usernames if username not in user_ids]
+
+    def create_users(self, emails):
+        """Create users for emails, with a username derived from the email
+        and an unusable password, along with their unverified email address.
+
+        :param emails: list of string lowercased emails
+        :return: dict mapping the emails to the created user ids
+        """
+        if not emails:
+            return {}
+        usernames = self.get_available_usernames(emails)
+        password = make_password(None)
+        users = [User(username=usernames[email], email=email, password=password)
+                 for email in emails]
+        User.objects.bulk_create(users, batch_size=self.chunk_size)
+        created_ids = {}
+        username_emails = {username: email for email, username in usernames.items()}
+        for chunk in chunked(list(username_emails), self.chunk_size):
+            for username, pk in User.objects.filter(
+                    username__in=chunk).values_list('username', 'pk'):
+                created_ids[username_emails[username]] = pk
+        EmailAddress.objects.bulk_create(
+            [EmailAddress(user_id=pk, email=email, primary=True, verified=False)
+             for email, pk in created_ids.items()], batch_size=self.chunk_size)
+        return created_ids
+
+    def get_available_usernames(self, emails):
+        """Derive unused usernames from the local part of emails, adding a
+        number to the ones that are taken.
+
+        :param emails: list of string lowercased emails
+        :return: dict mapping the emails to usernames
+        """
+        max_length = User._meta.get_field('username').max_length
+        bases = {email: USERNAME_INVALID_CHARACTERS_RE.sub(
+            '', email.split('@')[0])[:max_length - 6] or 'user' for email in emails}
+        distinct_bases = sorted(set(bases.values()))
+        taken = set()
+        for chunk in chunked(distinct_bases, self.chunk_size):
+            taken.update(User.objects.filter(username__in=chunk).values_list(
+                'username', flat=True))
+        # numbered variants are only needed for the bases that are taken or
+        # derived from several emails
+        counts = Counter(bases.values())
+        collisions = taken.union(base for base, count in counts.items() if count > 1)
+        for chunk in chunked(sorted(collisions), self.chunk_size):
+            pattern = r'^({0})[0-9]+$'.format('|'.join(re.escape(base) for base in chunk))
+            taken.update(User.objects.filter(username__regex=pattern).values_list(
+                'username', flat=True))
+        usernames = {}
+        for email in emails:
+            username, suffix = bases[email], 1
+            while username in taken:
+                suffix += 1
+                username = "{0}{1}".format(bases[email], suffix)
+            taken.add(username)
+            usernames[email] = username
+        return usernames
+
+    def get_systersuser_ids(self, user_ids):
+        """Get the SystersUser ids of users, creating the missing SystersUser
+        rows since `bulk_create` does not send the `post_save` signal.
+
+        :param user_ids: set of integer user ids
+        :return: dict mapping the SystersUser ids to the user ids
+        """
+        systersuser_ids = {}
+        for chunk in chunked(sorted(user_ids), self.chunk_size):
+            systersuser_ids.update(SystersUser.objects.filter(
+                user_id__in=chunk).values_list('pk', 'user_id'))
+        missing = user_ids - set(systersuser_ids.values())
+        if missing:
+            SystersUser.objects.bulk_create(
+                [SystersUser(user_id=pk) for pk in sorted(missing)], batch_size=self.chunk_size)
+            for chunk in chunked(sorted(missing), self.chunk_size):
+                systersuser_ids.update(SystersUser.objects.filter(
+                    user_id__in=chunk).values_list('pk', 'user_id'))
+        return systersuser_ids
+
+    def add_members(self, target, systersuser_ids, approved_by=None):
+        """Add users to the members of a community or a meetup location, one
+        chunk at a time, and settle their pending join requests, see
+        `JoinRequestManager.add_members` and `meetup.utils.add_members`.
+
+        :param target: Community or MeetupLocation object
+        :param systersuser_ids: dict mapping SystersUser ids to user ids
+        :param approved_by: SystersUser object approving the join requests to
+                            a community
+        :return: list of integer ids of the SystersUser objects added
+        """
+        added = []
+        for chunk in chunked(sorted(systersuser_ids), self.chunk_size):
+            if isinstance(target, Community):
+                added.extend(JoinRequest.objects.add_members(
+                    target, chunk, approved_by=approved_by)[0])
+            else:
+                added.extend(add_meetup_location_members(target, chunk))
+        return added
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 08:40
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_digest'),
+        ('community', '0014_auto_20261019_0745'),
+        ('membership', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJoinRequest',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('date_created', models.DateTimeField()),
+                ('is_approved', models.BooleanField(default=False)),
+                ('date_archived', models.DateTimeField(auto_now_add=True)),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.SystersUser')),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='community.Community')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_join_requests', to='users.SystersUser')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JoinRequestSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('date_created', models.DateTimeField()),
+                ('is_approved', models.BooleanField(default=False)),
+                ('community', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='community.Community')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='join_request_summaries', to='users.SystersUser')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='joinrequestsummary',
+            unique_together=set([('user', 'community')]),
+        ),
+    ]
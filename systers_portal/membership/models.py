@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 from community.models import Community
 from membership.constants import ALREADY_MEMBER, JOIN_REQUEST_EXISTS, OK
@@ -38,6 +38,87 @@ class JoinRequestManager(models.Manager):
 
         return user.delete_all_join_requests(community)
 
+    def get_pending(self, community, join_request_ids=None):
+        """Get the not yet approved join requests to a community, oldest first
+
+        :param community: Community object
+        :param join_request_ids: list of integer JoinRequest ids, or None for
+                                 all the pending join requests
+        :return: QuerySet of JoinRequest objects
+        """
+        join_requests = self.filter(community=community,
+                                    is_approved=False).order_by('pk')
+        if join_request_ids is not None:
+            join_requests = join_requests.filter(pk__in=join_request_ids)
+        return join_requests
+
+    @transaction.atomic
+    def add_members(self, community, systersuser_ids, approved_by=None):
+        """Make users members of a community, with one query per step
+        whatever the number of users. The pending join requests of the new
+        members are approved, while the ones of the users who were already
+        members are deleted.
+
+        :param community: Community object
+        :param systersuser_ids: iterable of integer SystersUser ids
+        :param approved_by: SystersUser object approving the join requests
+        :return: tuple (list of integer ids of the SystersUser objects that
+                 became members, list of integer ids of the SystersUser
+                 objects that were already members)
+        """
+        user_ids = set(systersuser_ids)
+        through = Community.members.through
+        members = set(through.objects.filter(
+            community=community, systersuser_id__in=user_ids).values_list(
+            'systersuser_id', flat=True))
+        added = sorted(user_ids - members)
+        pending = self.filter(community=community, is_approved=False)
+        pending.filter(user_id__in=members).delete()
+        pending.filter(user_id__in=added).update(is_approved=True,
+                                                 approved_by=approved_by)
+        through.objects.bulk_create(
+            [through(community=community, systersuser_id=pk) for pk in added])
+        return added, sorted(members)
+
+    @transaction.atomic
+    def approve_join_requests(self, community, join_request_ids=None,
+                              approved_by=None):
+        """Approve pending join requests to a community and make their users
+        members of the community, see `add_members`. The other pending join
+        requests of the same users are approved too.
+
+        :param community: Community object
+        :param join_request_ids: list of integer JoinRequest ids, or None to
+                                 approve all the pending join requests
+        :param approved_by: SystersUser object approving the join requests
+        :return: tuple (list of integer ids of the SystersUser objects that
+                 became members, list of integer ids of the SystersUser
+                 objects that were already members)
+        """
+        user_ids = set(self.get_pending(
+            community, join_request_ids).select_for_update().values_list(
+            'user_id', flat=True))
+        if not user_ids:
+            return [], []
+        return self.add_members(community, user_ids, approved_by=approved_by)
+
+    @transaction.atomic
+    def reject_join_requests(self, community, join_request_ids=None):
+        """Reject pending join requests to a community, along with the other
+        pending join requests of the same users.
+
+        :param community: Community object
+        :param join_request_ids: list of integer JoinRequest ids, or None to
+                                 reject all the pending join requests
+        :return: list of integer ids of the SystersUser objects whose join
+                 requests were rejected
+        """
+        user_ids = sorted(set(self.get_pending(
+            community, join_request_ids).values_list('user_id', flat=True)))
+        self.filter(community=community, is_approved=False,
+                    user_id__in=user_ids).delete()
+        return user_ids
+
 
 class JoinRequest(models.Model):
     """Model to represent a request to join a community by a user"""
@@ -54,9 +135,50 @@ class JoinRequest(models.Model):
         approval_status = "approved" if self.is_approved else "not approved"
         return "Join Request by {0} - {1}".format(self.user, approval_status)
 
-    def approve(self):
-        """Approve a join request."""
+    def approve(self, approved_by=None):
+        """Approve a join request.
+
+        :param approved_by: SystersUser object approving the join request
+        """
         if self.is_approved:
             return
         self.is_approved = True
+        self.approved_by = approved_by
         self.save()
+
+
+class ArchivedJoinRequest(models.Model):
+    """Approved or stale JoinRequest moved out of the JoinRequest table by
+    `manage.py archive_join_requests`. It keeps the id of the join request."""
+    id = models.IntegerField(primary_key=True)
+    user = models.ForeignKey(SystersUser,
+                             related_name='archived_join_requests')
+    approved_by = models.ForeignKey(SystersUser, blank=True, null=True,
+                                    related_name='+')
+    community = models.ForeignKey(Community)
+    date_created = models.DateTimeField()
+    is_approved = models.BooleanField(default=False)
+    date_archived = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        approval_status = "approved" if self.is_approved else "not approved"
+        return "Archived Join Request by {0} - {1}".format(self.user,
+                                                           approval_status)
+
+
+class JoinRequestSummary(models.Model):
+    """Last archived join request of a user to a community, along with the
+    number of archived join requests"""
+    user = models.ForeignKey(SystersUser,
+                             related_name='join_request_summaries')
+    community = models.ForeignKey(Community)
+    count = models.PositiveIntegerField(default=0)
+    date_created = models.DateTimeField()
+    is_approved = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('user', 'community')
+
+    def __str__(self):
+        return "Join Requests Summary of {0} to {1}".format(self.user,
+                                                            self.community)
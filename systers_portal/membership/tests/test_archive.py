@@ -0,0 +1,143 @@
+import threading
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from community.models import Community
+from membership.archive import archive_batch, get_cutoffs, update_summaries
+from membership.models import (ArchivedJoinRequest, JoinRequest,
+                               JoinRequestSummary)
+from users.models import SystersUser
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.admin = SystersUser.objects.get(
+            user=User.objects.create(username='foo'))
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=1, admin=self.admin)
+        self.bar = SystersUser.objects.get(
+            user=User.objects.create(username='bar'))
+
+    def create_join_request(self, user, days, is_approved):
+        join_request = JoinRequest.objects.create(user=user,
+                                                  community=self.community,
+                                                  is_approved=is_approved)
+        JoinRequest.objects.filter(pk=join_request.pk).update(
+            date_created=self.now - timedelta(days=days))
+        return join_request
+
+    def test_get_cutoffs(self):
+        """Test the cutoffs default to the settings"""
+        with self.settings(JOIN_REQUESTS_ARCHIVE_AGE=10,
+                           JOIN_REQUESTS_STALE_AGE=20):
+            self.assertEqual(get_cutoffs(now=self.now),
+                             (self.now - timedelta(days=10),
+                              self.now - timedelta(days=20)))
+        self.assertEqual(get_cutoffs(1, 2, now=self.now),
+                         (self.now - timedelta(days=1),
+                          self.now - timedelta(days=2)))
+
+    def test_archive_batch(self):
+        """Test archiving the old approved and stale join requests"""
+        old = self.create_join_request(self.bar, 100, True)
+        recent = self.create_join_request(self.bar, 5, True)
+        stale = self.create_join_request(self.admin, 400, False)
+        pending = self.create_join_request(self.admin, 100, False)
+        approved_before, pending_before = get_cutoffs(90, 365, now=self.now)
+
+        self.assertEqual(archive_batch(approved_before, pending_before, 10), 2)
+        self.assertCountEqual(JoinRequest.objects.all(), [recent, pending])
+        archived = ArchivedJoinRequest.objects.get(pk=old.pk)
+        self.assertTrue(archived.is_approved)
+        self.assertTrue(ArchivedJoinRequest.objects.filter(
+            pk=stale.pk, is_approved=False).exists())
+        summary = JoinRequestSummary.objects.get(user=self.bar)
+        self.assertEqual(summary.count, 1)
+        self.assertEqual(summary.date_created, archived.date_created)
+        self.assertEqual(archive_batch(approved_before, pending_before, 10), 0)
+
+        self.assertEqual(self.bar.get_last_join_request(self.community),
+                         recent)
+        JoinRequest.objects.filter(pk=recent.pk).delete()
+        self.assertEqual(self.bar.get_last_join_request(self.community),
+                         summary)
+        self.assertIsNone(self.admin.get_last_join_request(Community(pk=0)))
+
+    def test_archive_batch_merges_summaries(self):
+        """Test the summaries accumulate the join requests of several batches
+        and keep the last one"""
+        for days in (300, 200, 100):
+            self.create_join_request(self.bar, days, days != 100)
+        approved_before, pending_before = get_cutoffs(90, 90, now=self.now)
+        self.assertEqual(archive_batch(approved_before, pending_before, 2), 2)
+        self.assertEqual(archive_batch(approved_before, pending_before, 2), 1)
+        summary = JoinRequestSummary.objects.get()
+        self.assertEqual(summary.count, 3)
+        self.assertFalse(summary.is_approved)
+        self.assertEqual(summary.date_created,
+                         self.now - timedelta(days=100))
+        self.assertIsNone(self.bar.get_last_join_request(self.community))
+
+    def test_archive_batch_constant_queries(self):
+        """Test the number of queries does not depend on the batch size"""
+        approved_before, pending_before = get_cutoffs(90, 365, now=self.now)
+        self.create_join_request(self.bar, 100, True)
+        archive_batch(approved_before, pending_before, 100)
+        self.create_join_request(self.bar, 100, True)
+        with CaptureQueriesContext(connection) as queries:
+            archive_batch(approved_before, pending_before, 100)
+        for i in range(20):
+            user = SystersUser.objects.get(
+                user=User.objects.create(username='user{0}'.format(i)))
+            self.create_join_request(user, 100, True)
+        self.create_join_request(self.bar, 100, True)
+        with self.assertNumQueries(len(queries)):
+            self.assertEqual(
+                archive_batch(approved_before, pending_before, 100), 21)
+
+
+class ConcurrentSummariesTestCase(TransactionTestCase):
+    def test_concurrent_summary_updates(self):
+        """Test concurrent archivals merge into the same summary instead of both
+        inserting it"""
+        admin = SystersUser.objects.get(user=User.objects.create(username='foo'))
+        community = Community.objects.create(name="Foo", slug="foo", order=1, admin=admin)
+        now = timezone.now()
+        rows = [{'user_id': admin.pk, 'community_id': community.pk, 'is_approved': approved,
+                 'date_created': now - timedelta(days=days)}
+                for approved, days in ((True, 10), (False, 20))]
+        merged, commit, errors = threading.Event(), threading.Event(), []
+
+        def archive(row, event):
+            try:
+                with transaction.atomic():
+                    update_summaries([row])
+                    if event is not None:
+                        event.set()
+                        commit.wait(5)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        first = threading.Thread(target=archive, args=(rows[0], merged))
+        first.start()
+        merged.wait(5)
+        second = threading.Thread(target=archive, args=(rows[1], None))
+        second.start()
+        second.join(0.5)
+        self.assertTrue(second.is_alive())
+        commit.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(errors, [])
+        summary = JoinRequestSummary.objects.get()
+        self.assertEqual(summary.count, 2)
+        self.assertTrue(summary.is_approved)
+        self.assertEqual(summary.date_created, rows[0]['date_created'])
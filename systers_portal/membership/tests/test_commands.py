@@ -0,0 +1,157 @@
+import os
+import tempfile
+from datetime import timedelta
+
+from allauth.account.models import EmailAddress
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from community.models import Community
+from meetup.constants import MEMBER
+from meetup.models import MeetupLocation
+from membership.models import ArchivedJoinRequest, JoinRequest
+from users.models import SystersUser
+
+
+class ImportMembersCommandTestCase(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', password='foobar')
+        self.systers_admin = SystersUser.objects.get(user=self.admin)
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  admin=self.systers_admin)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location,
+            description="It's a test location", sponsors="BarBaz")
+        self.foo = User.objects.create(username='foo', email='Foo@Test.com')
+        self.bar = User.objects.create(username='bar', email='bar@test.com')
+        self.csv_files = []
+
+    def tearDown(self):
+        for path in self.csv_files:
+            os.remove(path)
+
+    def write_csv(self, rows):
+        csv_file = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        with csv_file:
+            csv_file.write("\n".join(rows))
+        self.csv_files.append(csv_file.name)
+        return csv_file.name
+
+    def import_members(self, rows, target, **options):
+        out, err = StringIO(), StringIO()
+        call_command('import_members', self.write_csv(rows), target, stdout=out, stderr=err,
+                     **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_community_members(self):
+        """Test adding existing and new users to a community"""
+        JoinRequest.objects.create(user=SystersUser.objects.get(user=self.bar),
+                                   community=self.community)
+        out, err = self.import_members(
+            ['username', 'foo', 'BAR@test.com', 'new@test.com', 'foo', '', 'ghost'],
+            '--community=foo')
+        self.assertIn("2 users found, 1 users created, 3 members added to Foo", out)
+        self.assertIn("Unknown user: ghost", err)
+        new = User.objects.get(email='new@test.com')
+        self.assertEqual(new.username, 'new')
+        self.assertFalse(new.has_usable_password())
+        self.assertTrue(EmailAddress.objects.filter(user=new, email='new@test.com',
+                                                    primary=True).exists())
+        members = set(self.community.members.values_list('user__username', flat=True))
+        self.assertEqual(members, {'admin', 'foo', 'bar', 'new'})
+        self.assertFalse(JoinRequest.objects.filter(is_approved=False).exists())
+        self.assertEqual(JoinRequest.objects.get().approved_by, self.systers_admin)
+
+        out, _ = self.import_members(['foo@test.com', 'new@test.com'], '--community=foo')
+        self.assertIn("2 users found, 0 users created, 0 members added", out)
+
+    def test_import_approved_by(self):
+        """Test the approver of the join requests settled by the import is recorded"""
+        systers_foo = SystersUser.objects.get(user=self.foo)
+        JoinRequest.objects.create(user=SystersUser.objects.get(user=self.bar),
+                                   community=self.community)
+        self.import_members(['bar'], '--community=foo', approved_by='foo')
+        self.assertEqual(JoinRequest.objects.get().approved_by, systers_foo)
+        with self.assertRaises(CommandError):
+            self.import_members(['bar'], '--community=foo', approved_by='ghost')
+
+    def test_import_meetup_location_members(self):
+        """Test adding users to a meetup location and its members group"""
+        systers_bar = SystersUser.objects.get(user=self.bar)
+        self.meetup_location.join_requests.add(systers_bar)
+        out, _ = self.import_members(['bar', 'foo@test.com'], '--meetup-location=foo')
+        self.assertIn("2 users found, 0 users created, 2 members added to Foo Systers", out)
+        self.assertEqual(self.meetup_location.members.count(), 2)
+        self.assertFalse(self.meetup_location.join_requests.exists())
+        self.assertTrue(systers_bar.is_group_member(MEMBER.format("Foo Systers")))
+
+    def test_available_usernames(self):
+        """Test the usernames derived from emails do not collide"""
+        User.objects.create(username='foo2')
+        self.import_members(['foo@example.com', 'foo@example.org', 'Fo o!@example.net'],
+                            '--community=foo')
+        usernames = dict(User.objects.filter(email__startswith='fo').exclude(
+            pk=self.foo.pk).values_list('email', 'username'))
+        self.assertEqual(usernames, {'fo o!@example.net': 'foo3',
+                                     'foo@example.com': 'foo4',
+                                     'foo@example.org': 'foo5'})
+
+    def test_dry_run(self):
+        """Test a dry run reports the changes without keeping them"""
+        out, _ = self.import_members(['foo', 'new@test.com'], '--community=foo', dry_run=True)
+        self.assertIn("[dry run] 1 users found, 1 users created, 2 members added", out)
+        self.assertFalse(User.objects.filter(email='new@test.com').exists())
+        self.assertEqual(self.community.members.count(), 1)
+
+    def test_unknown_target(self):
+        """Test the command fails for an unknown community"""
+        with self.assertRaises(CommandError):
+            self.import_members(['foo'], '--community=baz')
+
+    def test_constant_queries(self):
+        """Test the number of queries depends on the number of chunks, not
+        on the number of rows"""
+        rows = ['user{0}@test.com'.format(i) for i in range(10)] + ['foo']
+        with CaptureQueriesContext(connection) as queries:
+            self.import_members(rows, '--community=foo')
+        rows = ['user{0}@test.com'.format(i) for i in range(10, 100)] + ['bar']
+        with self.assertNumQueries(len(queries)):
+            self.import_members(rows, '--community=foo')
+
+
+class ArchiveJoinRequestsCommandTestCase(TestCase):
+    def setUp(self):
+        admin = SystersUser.objects.get(
+            user=User.objects.create(username='admin'))
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=1, admin=admin)
+        for i in range(5):
+            user = User.objects.create(username='user{0}'.format(i))
+            JoinRequest.objects.create(
+                user=SystersUser.objects.get(user=user),
+                community=self.community, is_approved=i < 3)
+        JoinRequest.objects.update(
+            date_created=timezone.now() - timedelta(days=100))
+
+    def test_archive_join_requests(self):
+        """Test archiving join requests in several batches"""
+        out = StringIO()
+        call_command('archive_join_requests', age=30, dry_run=True,
+                     stdout=out)
+        self.assertIn("[dry run] 3 join requests to archive", out.getvalue())
+        self.assertEqual(JoinRequest.objects.count(), 5)
+
+        out = StringIO()
+        call_command('archive_join_requests', age=30, stale_age=60,
+                     batch_size=2, pause=0, stdout=out)
+        self.assertIn("5 join requests archived", out.getvalue())
+        self.assertFalse(JoinRequest.objects.exists())
+        self.assertEqual(ArchivedJoinRequest.objects.count(), 5)
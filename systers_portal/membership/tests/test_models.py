@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 
 from community.models import Community
@@ -36,6 +38,72 @@ class JoinRequestModelTestCase(TestCase):
         join_request.approve()
         self.assertTrue(join_request.is_approved)
 
+    def test_approve_join_requests(self):
+        """Test model manager method to approve join requests in bulk"""
+        users = [SystersUser.objects.get(user=User.objects.create(
+            username=username)) for username in ('bar', 'baz', 'qux')]
+        join_requests = [JoinRequest.objects.create(user=user,
+                                                    community=self.community)
+                         for user in users]
+        JoinRequest.objects.create(user=users[0], community=self.community)
+        JoinRequest.objects.create(user=self.systers_user,
+                                   community=self.community)
+
+        added, members = JoinRequest.objects.approve_join_requests(
+            self.community, [join_requests[0].pk], approved_by=self.systers_user)
+        self.assertEqual(added, [users[0].pk])
+        self.assertEqual(members, [])
+        self.assertTrue(users[0].is_member(self.community))
+        self.assertEqual(JoinRequest.objects.filter(
+            user=users[0], is_approved=True,
+            approved_by=self.systers_user).count(), 2)
+
+        added, members = JoinRequest.objects.approve_join_requests(
+            self.community)
+        self.assertEqual(added, [users[1].pk, users[2].pk])
+        self.assertEqual(members, [self.systers_user.pk])
+        self.assertEqual(self.community.members.count(), 4)
+        self.assertFalse(JoinRequest.objects.filter(
+            is_approved=False).exists())
+        self.assertFalse(JoinRequest.objects.filter(
+            user=self.systers_user).exists())
+        self.assertEqual(JoinRequest.objects.approve_join_requests(
+            self.community), ([], []))
+
+    def test_approve_join_requests_constant_queries(self):
+        """Test the number of queries does not depend on the number of join
+        requests"""
+        def create_join_requests(count):
+            for i in range(count):
+                user = User.objects.create(username='user{0}'.format(
+                    User.objects.count()))
+                JoinRequest.objects.create(
+                    user=SystersUser.objects.get(user=user),
+                    community=self.community)
+
+        create_join_requests(1)
+        with CaptureQueriesContext(connection) as queries:
+            JoinRequest.objects.approve_join_requests(self.community)
+        create_join_requests(10)
+        with self.assertNumQueries(len(queries)):
+            JoinRequest.objects.approve_join_requests(self.community)
+
+    def test_reject_join_requests(self):
+        """Test model manager method to reject join requests in bulk"""
+        users = [SystersUser.objects.get(user=User.objects.create(
+            username=username)) for username in ('bar', 'baz')]
+        join_request = JoinRequest.objects.create(user=users[0],
+                                                  community=self.community)
+        JoinRequest.objects.create(user=users[0], community=self.community)
+        JoinRequest.objects.create(user=users[1], community=self.community)
+        rejected = JoinRequest.objects.reject_join_requests(
+            self.community, [join_request.pk])
+        self.assertEqual(rejected, [users[0].pk])
+        self.assertEqual(JoinRequest.objects.get().user, users[1])
+        self.assertEqual(JoinRequest.objects.reject_join_requests(
+            self.community), [users[1].pk])
+        self.assertFalse(JoinRequest.objects.exists())
+
     def test_create_join_request(self):
         """Test model manager method to create a join request"""
         user = User.objects.create(username="bar", password="foobar")
@@ -38,6 +38,101 @@ class CommunityJoinRequestListViewTestCase(TestCase):
         self.assertContains(response, "<th>1</th>")
         self.assertContains(response, 'rainbow')
 
+    def test_community_join_request_export_view(self):
+        """Test exporting the not yet approved community join requests"""
+        url = reverse("export_community_join_requests",
+                      kwargs={'slug': 'foo', 'format': 'csv'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        user = User.objects.create_user(username="rainbow", password="foobar")
+        JoinRequest.objects.create(user=SystersUser.objects.get(user=user),
+                                   community=self.community, is_approved=True)
+        user = User.objects.create_user(username="unicorn", password="foobar")
+        JoinRequest.objects.create(user=SystersUser.objects.get(user=user),
+                                   community=self.community)
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode(
+            'utf-8').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("unicorn,"))
+
+    def test_community_join_request_list_pagination(self):
+        """Test the join requests are paginated oldest first"""
+        for i in range(25):
+            user = User.objects.create(username='user{0}'.format(i))
+            JoinRequest.objects.create(user=SystersUser.objects.get(user=user),
+                                       community=self.community)
+        url = reverse("view_community_join_request_list",
+                      kwargs={'slug': 'foo'})
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['object_list']), 20)
+        self.assertEqual(response.context['object_list'][0].user.user.username,
+                         'user0')
+        self.assertContains(response, "Select all 25 join requests")
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual(len(response.context['object_list']), 5)
+        self.assertContains(response, "<th>21</th>")
+
+
+class ModerateCommunityJoinRequestsViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        self.community = Community.objects.create(name="Foo", slug="foo",
+                                                  order=1,
+                                                  admin=self.systers_user)
+        self.join_requests = []
+        for username in ('bar', 'baz', 'qux'):
+            user = User.objects.create_user(username=username,
+                                            password='foobar')
+            self.join_requests.append(JoinRequest.objects.create(
+                user=SystersUser.objects.get(user=user),
+                community=self.community))
+        self.url = reverse("moderate_community_join_requests",
+                           kwargs={'slug': 'foo'})
+
+    def test_moderate_community_join_requests_permissions(self):
+        """Test only the users who can approve join requests moderate them"""
+        response = self.client.post(self.url, {'action': 'approve',
+                                               'select_all': 'on'})
+        self.assertEqual(response.status_code, 403)
+        self.client.login(username='bar', password='foobar')
+        response = self.client.post(self.url, {'action': 'approve',
+                                               'select_all': 'on'})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.community.members.count(), 1)
+
+    def test_moderate_community_join_requests(self):
+        """Test approving and rejecting the selected join requests"""
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+        response = self.client.post(self.url, {'action': 'approve'},
+                                    follow=True)
+        self.assertContains(response, "Select the join requests")
+        self.assertEqual(self.community.members.count(), 1)
+
+        response = self.client.post(self.url + '?page=1', {
+            'action': 'approve',
+            'join_requests': [self.join_requests[0].pk,
+                              self.join_requests[1].pk]})
+        self.assertRedirects(response, '/community/foo/join_requests/?page=1')
+        self.assertEqual(self.community.members.count(), 3)
+        self.assertEqual(JoinRequest.objects.filter(
+            approved_by=self.systers_user).count(), 2)
+
+        response = self.client.post(self.url, {'action': 'reject',
+                                               'select_all': 'on'},
+                                    follow=True)
+        self.assertContains(response, "1 users were rejected")
+        self.assertEqual(self.community.members.count(), 3)
+        self.assertFalse(JoinRequest.objects.filter(
+            is_approved=False).exists())
+
 
 class ApproveCommunityJoinRequestViewTestCase(TestCase):
     def setUp(self):
@@ -92,6 +187,8 @@ class ApproveCommunityJoinRequestViewTestCase(TestCase):
                 in message.message)
         self.assertTrue(systers_user.is_member(self.community))
         self.assertTrue(JoinRequest.objects.get().is_approved)
+        self.assertEqual(JoinRequest.objects.get().approved_by,
+                         self.systers_user)
 
     def test_approve_community_join_request_view_multiple(self):
         """Test GET request to approve multiple community join request from a
@@ -1,6 +1,8 @@
 from django.conf.urls import url
 
 from membership.views import (CommunityJoinRequestListView,
+                              CommunityJoinRequestExportView,
+                              ModerateCommunityJoinRequestsView,
                               ApproveCommunityJoinRequestView,
                               RejectCommunityJoinRequestView,
                               RequestJoinCommunityView,
@@ -12,6 +14,12 @@ urlpatterns = [
     url(r'^(?P<slug>[\w-]+)/join_requests/$',
         CommunityJoinRequestListView.as_view(),
         name="view_community_join_request_list"),
+    url(r'^(?P<slug>[\w-]+)/join_requests/export/(?P<format>csv|jsonl)/$',
+        CommunityJoinRequestExportView.as_view(),
+        name="export_community_join_requests"),
+    url(r'^(?P<slug>[\w-]+)/join_requests/moderate/$',
+        ModerateCommunityJoinRequestsView.as_view(),
+        name="moderate_community_join_requests"),
     url(r'^(?P<slug>[\w-]+)/join_requests/approve/(?P<pk>\d+)$',
         ApproveCommunityJoinRequestView.as_view(),
         name="approve_community_join_request"),
@@ -1,14 +1,16 @@
 from django.contrib import messages
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.views.generic import RedirectView, ListView, FormView
 from django.views.generic.detail import SingleObjectMixin
 from braces.views import LoginRequiredMixin, PermissionRequiredMixin
 
+from common.mixins import StreamingExportMixin
 from community.models import Community
 from membership.constants import *  # NOQA
-from membership.forms import TransferOwnershipForm
+from membership.forms import JoinRequestsModerationForm, TransferOwnershipForm
 from membership.models import JoinRequest
 from users.models import SystersUser
 
@@ -17,20 +19,22 @@ class CommunityJoinRequestListView(LoginRequiredMixin, PermissionRequiredMixin,
                                    ListView):
     """List of not yet approved JoinRequest(s) to a Community"""
     template_name = "membership/join_requests.html"
+    paginate_by = 20
     raise_exception = True
     # TODO: add `redirect_unauthenticated_users = True` when django-braces will
     # reach version 1.5
 
     def get_context_data(self, **kwargs):
-        """Add Community object to the context"""
+        """Add Community object and the bulk moderation form to the context"""
         context = super(CommunityJoinRequestListView, self).get_context_data(
             **kwargs)
         context['community'] = self.community
+        context['form'] = JoinRequestsModerationForm(community=self.community)
         return context
 
     def get_queryset(self):
-        return JoinRequest.objects.filter(community=self.community,
-                                          is_approved=False)
+        return JoinRequest.objects.get_pending(self.community).select_related(
+            'user__user')
 
     def check_permissions(self, request):
         """Check if the request user has the permissions to approve join
@@ -40,6 +44,23 @@ class CommunityJoinRequestListView(LoginRequiredMixin, PermissionRequiredMixin,
                                      self.community)
 
 
+class CommunityJoinRequestExportView(StreamingExportMixin,
+                                     CommunityJoinRequestListView):
+    """Export not yet approved JoinRequest(s) to a Community as CSV or JSON
+    Lines"""
+    export_fields = (('username', 'user__user__username'),
+                     ('first_name', 'user__user__first_name'),
+                     ('last_name', 'user__user__last_name'),
+                     ('email', 'user__user__email'),
+                     ('date_created', 'date_created'))
+
+    def get_export_name(self):
+        return "{0}-join-requests".format(self.community.slug)
+
+    def get_export_queryset(self):
+        return JoinRequest.objects.get_pending(self.community)
+
+
 class ApproveCommunityJoinRequestView(LoginRequiredMixin,
                                       PermissionRequiredMixin, RedirectView):
     """Approve a JoinRequest to a Community"""
@@ -66,15 +87,17 @@ class ApproveCommunityJoinRequestView(LoginRequiredMixin,
 
         :return: tuple containing a string message and a message level
         """
-        join_request = get_object_or_404(JoinRequest, community=self.community,
-                                         pk=self.kwargs['pk'])
+        join_request = get_object_or_404(
+            JoinRequest.objects.select_related('user__user'),
+            community=self.community, pk=self.kwargs['pk'])
         user = join_request.user
-        if user.is_member(self.community):
+        approved_by = get_object_or_404(SystersUser, user=self.request.user)
+        added, _ = JoinRequest.objects.approve_join_requests(
+            self.community, [join_request.pk], approved_by=approved_by)
+        if user.pk not in added:
             join_request.delete()
             return USER_ALREADY_MEMBER_MSG.format(
                 user, self.community), messages.INFO
-        user.approve_all_join_requests(self.community)
-        self.community.add_member(join_request.user)
         return USER_MEMBER_SUCCESS_MSG.format(
             user, self.community), messages.SUCCESS
 
@@ -86,6 +109,72 @@ class ApproveCommunityJoinRequestView(LoginRequiredMixin,
                                      self.community)
 
 
+class ModerateCommunityJoinRequestsView(LoginRequiredMixin,
+                                        PermissionRequiredMixin, FormView):
+    """Approve or reject the selected JoinRequest(s) to a Community, or all of
+    them"""
+    form_class = JoinRequestsModerationForm
+    http_method_names = ['post']
+    raise_exception = True
+
+    def get_form_kwargs(self):
+        """Add community object to form kwargs"""
+        kwargs = super(ModerateCommunityJoinRequestsView,
+                       self).get_form_kwargs()
+        kwargs['community'] = self.community
+        return kwargs
+
+    def form_valid(self, form):
+        """Apply the action to the selected join requests in one transaction
+        and add messages about the result"""
+        join_request_ids = form.get_join_request_ids()
+        if form.cleaned_data['action'] == APPROVE:
+            approved_by = get_object_or_404(SystersUser,
+                                            user=self.request.user)
+            added, members = JoinRequest.objects.approve_join_requests(
+                self.community, join_request_ids, approved_by=approved_by)
+            messages.add_message(
+                self.request, messages.SUCCESS,
+                JOIN_REQUESTS_APPROVED_MSG.format(len(added), self.community))
+            if members:
+                messages.add_message(
+                    self.request, messages.INFO,
+                    JOIN_REQUESTS_ALREADY_MEMBERS_MSG.format(len(members),
+                                                             self.community))
+        else:
+            rejected = JoinRequest.objects.reject_join_requests(
+                self.community, join_request_ids)
+            messages.add_message(
+                self.request, messages.INFO,
+                JOIN_REQUESTS_REJECTED_MSG.format(len(rejected),
+                                                  self.community))
+        return super(ModerateCommunityJoinRequestsView, self).form_valid(form)
+
+    def form_invalid(self, form):
+        """Redirect back to the join requests with the errors as messages"""
+        for error in form.non_field_errors():
+            messages.add_message(self.request, messages.WARNING, error)
+        for error in form.errors.get('join_requests', []):
+            messages.add_message(self.request, messages.WARNING, error)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def get_success_url(self):
+        """Redirect to the page of join requests the request was sent from"""
+        url = reverse("view_community_join_request_list",
+                      kwargs={'slug': self.community.slug})
+        page = self.request.GET.get('page')
+        if page and page.isdigit():
+            url = "{0}?page={1}".format(url, page)
+        return url
+
+    def check_permissions(self, request):
+        """Check if the request user has the permissions to approve/reject join
+        requests. The permission holds true for superusers."""
+        self.community = get_object_or_404(Community, slug=self.kwargs['slug'])
+        return request.user.has_perm("approve_community_joinrequest",
+                                     self.community)
+
+
 class RejectCommunityJoinRequestView(LoginRequiredMixin,
                                      PermissionRequiredMixin, RedirectView):
     """Reject a JoinRequest to a community"""
@@ -45,7 +45,6 @@ INSTALLED_APPS = (
     'guardian',
     'crispy_forms',
     'cities_light',
-    'imagekit',
     'blog',
     'common',
     'community',
@@ -55,6 +54,8 @@ INSTALLED_APPS = (
 )
 
 MIDDLEWARE_CLASSES = (
+    'common.middleware.PublicCacheMiddleware',
+    'common.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -118,10 +119,123 @@ STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'static'),
 )
 
+# `manage.py collectstatic` writes the files under names containing a hash of
+# their content, along with their gzip and brotli versions, to STATIC_ROOT,
+# served by common.static.StaticFilesApp, see wsgi.py
+STATIC_ROOT = os.path.join(BASE_DIR, "collected_static")
+STATICFILES_STORAGE = 'common.storage.CompressedManifestStaticFilesStorage'
+# seconds the static files without a hash in their name are cached
+STATIC_MAX_AGE = 60 * 60
+
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 MEDIA_URL = "/media/"
 
+# Background jobs, run by `manage.py run_workers`, see common.jobs
+JOBS_WORKERS = 2
+JOBS_MAX_ATTEMPTS = 5
+# seconds before the first retry of a failed job, doubled after each attempt
+JOBS_RETRY_DELAY = 10
+JOBS_MAX_RETRY_DELAY = 60 * 60
+# seconds after which a running job is considered lost and queued again
+JOBS_TIMEOUT = 10 * 60
+# seconds successful jobs are kept for the metrics
+JOBS_RETENTION = 24 * 60 * 60
+# run the jobs in the request instead of queueing them
+JOBS_ALWAYS_EAGER = False
+
+# Comments
+# comments per page of a comment thread
+COMMENTS_PAGE_SIZE = 20
+# orphaned comments, see `manage.py sweep_comments`
+# seconds between two sweeps queued by `manage.py sweep_comments --schedule`
+COMMENTS_SWEEP_INTERVAL = 24 * 60 * 60
+COMMENTS_SWEEP_CHUNK_SIZE = 1000
+
+# Activity feed, see users.feed
+# items per page of the feed on the user profile
+FEED_PAGE_SIZE = 20
+# items kept per user, the older ones are deleted
+FEED_MAX_LENGTH = 500
+# feed rows inserted per query when an item is fanned out to the members
+FEED_FANOUT_BATCH_SIZE = 1000
+
+# Sessions
+# The sessions are read from the shared cache, not from the default cache, whose
+# in-process copies could keep a logged out session alive for LOCAL_TIMEOUT.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'shared'
+# expired sessions, see `manage.py purge_sessions`
+# seconds between two purges queued by `manage.py purge_sessions --schedule`
+SESSIONS_PURGE_INTERVAL = 24 * 60 * 60
+SESSIONS_PURGE_BATCH_SIZE = 1000
+# seconds between two batches, to spread the load on the database
+SESSIONS_PURGE_PAUSE = 0.5
+# The messages are kept in a cookie, so that they do not load the session of the
+# anonymous visitors
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Database replicas, see common.routers
+DATABASE_ROUTERS = ['common.routers.ReplicaRouter']
+# aliases of the DATABASES receiving the reads of the safe requests
+DATABASE_REPLICAS = ()
+# seconds the users who wrote read from the primary database
+DATABASE_REPLICA_PIN_SECONDS = 10
+# seconds a replica may lag behind the primary before its reads go to the primary
+DATABASE_REPLICA_MAX_LAG = 5
+# seconds between two health checks of a replica
+DATABASE_REPLICA_CHECK_INTERVAL = 10
+
+# CDN, see common.cdn
+# The public pages of the anonymous visitors have no cookies and do not vary on
+# them, the CDN must not serve its cached pages to the requests with a session
+# cookie.
+# seconds the CDN keeps the public pages, their changes purge them earlier
+CDN_S_MAXAGE = 10 * 60
+# dotted path of the class purging the CDN, like 'common.cdn.HttpPurger', None
+# to not purge
+CDN_PURGER = None
+CDN_PURGE_URL = ''
+# seconds to wait for the purge requests
+CDN_PURGE_TIMEOUT = 5
+
+# Caches, see common.cache
+# The default cache keeps an in-process LRU of the entries of the shared cache,
+# for at most LOCAL_TIMEOUT seconds. The shared cache can be a file based or a
+# database cache, the latter needs `manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'common.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, "cache"),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+# seconds the data in the cache namespace of a Community or a MeetupLocation is
+# cached, their changes invalidate it earlier
+OBJECT_CACHE_TIMEOUT = 60 * 60
+# seconds the lists of RSVPs of a meetup are cached, RSVP writes invalidate them earlier
+MEETUP_RSVPS_CACHE_TIMEOUT = 60 * 60
+
+# Community join requests retention, see `manage.py archive_join_requests`
+# days after which approved join requests are archived
+JOIN_REQUESTS_ARCHIVE_AGE = 90
+# days after which not approved join requests are archived
+JOIN_REQUESTS_STALE_AGE = 365
+JOIN_REQUESTS_ARCHIVE_BATCH_SIZE = 1000
+# seconds between two batches, to spread the load on the database
+JOIN_REQUESTS_ARCHIVE_PAUSE = 0.5
+
 # Django-allauth settings
 # https://django-allauth.readthedocs.org/en/latest/#configuration
 ACCOUNT_EMAIL_REQUIRED = True
@@ -133,7 +247,11 @@ ACCOUNT_FORMS = {'change_password': 'users.forms.SystersChangePasswordForm'}
 CKEDITOR_UPLOAD_PATH = "uploads/"
 CKEDITOR_IMAGE_BACKEND = 'pillow'
 CKEDITOR_JQUERY_URL = '//ajax.googleapis.com/ajax/libs/jquery/2.1.1/jquery.min.js'  # NOQA
-CKEDITOR_RESTRICT_BY_USER = True
+# Uploads over this size in bytes are rejected before being fully received
+CKEDITOR_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+# Uploaded images are downscaled to fit in a square of this side in pixels
+CKEDITOR_IMAGE_MAX_DIMENSION = 2048
+IMAGE_QUALITY = 85
 
 CKEDITOR_CONFIGS = {
     'default': {
@@ -148,7 +266,7 @@ CKEDITOR_CONFIGS = {
              'Blockquote', 'CreateDiv', '-', 'JustifyLeft', 'JustifyCenter',
              'JustifyRight', 'JustifyBlock', '-', 'BidiLtr', 'BidiRtl'],
             ['Link', 'Unlink', 'Anchor'],
-            ['Image', 'Flash', 'Table', 'HorizontalRule', 'Smiley',
+            ['Image', 'Table', 'HorizontalRule', 'Smiley',
              'SpecialChar'],
             ['TextColor', 'BGColor'],
         ],
@@ -21,3 +21,7 @@ INTERNAL_IPS = ('127.0.0.1',)
 EMAIL_HOST = 'localhost'
 EMAIL_PORT = 25
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Run the background jobs in the request, so that `manage.py run_workers` is
+# not needed during development.
+JOBS_ALWAYS_EAGER = True
@@ -19,3 +19,7 @@ INTERNAL_IPS = ('127.0.0.1',)
 # Instead of sending out real email, during development the emails will be sent
 # to stdout, where from they can be inspected.
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Run the background jobs in the request, so that `manage.py run_workers` is
+# not needed during development.
+JOBS_ALWAYS_EAGER = True
@@ -11,6 +11,17 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'NAME': '',
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': '',
+        'PORT': '5432',
+    },
 }
+
+# the reads go to the replica once its database is filled in above
+DATABASE_REPLICAS = ('replica',) if DATABASES['replica']['NAME'] else ()
 INTERNAL_IPS = ('127.0.0.1',)
@@ -15,7 +15,20 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+    },
+    # a second connection to the test database, standing in for a replica in
+    # the tests enabling DATABASE_REPLICAS
+    'replica': {
+        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'NAME': 'systersdb',
+        'USER': '',
+        'PASSWORD': '',
+        'HOST': 'localhost',
+        'PORT': '5432',
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
 INTERNAL_IPS = ('127.0.0.1',)
@@ -34,3 +47,12 @@ NOSE_ARGS = [
 PASSWORD_HASHERS = (
     'django.contrib.auth.hashers.MD5PasswordHasher',
 )
+
+JOBS_ALWAYS_EAGER = True
+
+# the tests do not collect the static files
+STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+CACHES['shared'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+}
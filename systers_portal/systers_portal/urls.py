@@ -1,12 +1,9 @@
 from django.conf import settings
 from django.conf.urls import include, url
 from django.contrib import admin
-from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import never_cache
-from ckeditor_uploader import views
 from django.views.static import serve
 
-from common.views import IndexView, Logout
+from common.views import CKEditorUploadView, IndexView, Logout, serve_media
 from common.views import ContactView
 from common.views import AboutUsView
 from common.views import NewCommunityProposalView
@@ -26,10 +23,8 @@ urlpatterns = [
     url(r'^admin/', include(admin.site.urls)),
     url(r'^logout/', Logout.as_view(), name='logout'),
     url(r'^accounts/', include('allauth.urls')),
-    url(r'^ckeditor/upload/', login_required(views),
+    url(r'^ckeditor/upload/', CKEditorUploadView.as_view(),
         name='ckeditor_upload'),
-    url(r'^ckeditor/browse/', never_cache(login_required(views.browse)),
-        name='ckeditor_browse'),
     url(r'^contact/$', ContactView.as_view(), name='contact'),
     url(r'^about-us/$', AboutUsView.as_view(), name='about-us'),
     url(r'^propose/newcommunity/$', NewCommunityProposalView.as_view(),
@@ -40,6 +35,6 @@ if settings.DEBUG:
     urlpatterns += [
         url(r'^static/(?P<path>.*)$', serve,
             {'document_root': settings.STATIC_ROOT}),
-        url(r'^media/(?P<path>.*)$', serve,
+        url(r'^media/(?P<path>.*)$', serve_media,
             {'document_root': settings.MEDIA_ROOT}),
     ]
@@ -11,4 +11,5 @@ import os
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "systers_portal.settings")
 
 from django.core.wsgi import get_wsgi_application
-application = get_wsgi_application()
+from common.static import StaticFilesApp
+application = StaticFilesApp(get_wsgi_application())
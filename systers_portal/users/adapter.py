@@ -1,8 +1,11 @@
 from allauth.account.adapter import DefaultAccountAdapter
 from django.core.urlresolvers import reverse
 from django.core.exceptions import ValidationError
+from django.utils.html import strip_tags
 import re
 
+from common.jobs import enqueue, send_email
+
 
 class SystersUserAccountAdapter(DefaultAccountAdapter):
     """Custom account adapter with different than default redirect URLs"""
@@ -27,6 +30,18 @@ class SystersUserAccountAdapter(DefaultAccountAdapter):
                 "Password must have at least, 6 characters, one uppercase letter, "
                 "one special character and one digit.")
 
+    def send_mail(self, template_prefix, email, context):
+        """Render the account emails in the request and queue their sending"""
+        message = self.render_mail(template_prefix, email, context)
+        body, html_body = message.body, None
+        if message.content_subtype == 'html':
+            body, html_body = strip_tags(message.body), message.body
+        for content, mimetype in getattr(message, 'alternatives', []):
+            if mimetype == 'text/html':
+                html_body = content
+        enqueue(send_email, message.subject, body, message.from_email, message.to,
+                html_body=html_body)
+
     def get_login_redirect_url(self, request):
         return reverse('user', args=[request.user.username])
 
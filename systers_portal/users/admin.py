@@ -1,5 +1,14 @@
 from django.contrib import admin
+
+from common.admin import IndexedSearchAdmin
 from users.models import SystersUser
 
 
-admin.site.register(SystersUser)
+class SystersUserAdmin(IndexedSearchAdmin):
+    list_display = ('user', 'country', 'digest_frequency')
+    list_select_related = ('user', 'country')
+    raw_id_fields = ('user', 'country')
+    search_fields = ('user__username',)
+
+
+admin.site.register(SystersUser, SystersUserAdmin)
@@ -0,0 +1,49 @@
+# Profile picture variants
+PROFILE_PICTURE_SIZES = (50, 100, 200)
+JPEG = "JPEG"
+WEBP = "WEBP"
+PROFILE_PICTURE_FORMATS = (JPEG, WEBP)
+PROFILE_PICTURE_FORMAT_CHOICES = (
+    (JPEG, "JPEG"),
+    (WEBP, "WebP"),
+)
+PROFILE_PICTURE_EXTENSIONS = {
+    JPEG: "jpg",
+    WEBP: "webp",
+}
+PROFILE_PICTURE_MIME_TYPES = {
+    JPEG: "image/jpeg",
+    WEBP: "image/webp",
+}
+PROFILE_PICTURE_PLACEHOLDER = "img/default.png"
+
+# Join request digest frequencies
+DIGEST_HOURLY = "hourly"
+DIGEST_DAILY = "daily"
+DIGEST_WEEKLY = "weekly"
+DIGEST_NEVER = "never"
+DIGEST_FREQUENCY_CHOICES = (
+    (DIGEST_HOURLY, "Hourly"),
+    (DIGEST_DAILY, "Daily"),
+    (DIGEST_WEEKLY, "Weekly"),
+    (DIGEST_NEVER, "Never"),
+)
+# seconds between two digests of a frequency
+DIGEST_INTERVALS = {
+    DIGEST_HOURLY: 60 * 60,
+    DIGEST_DAILY: 24 * 60 * 60,
+    DIGEST_WEEKLY: 7 * 24 * 60 * 60,
+}
+DIGEST_SUBJECT = "{0} new join requests to review"
+
+# Activity feed item types
+FEED_NEWS = 1
+FEED_RESOURCE = 2
+FEED_MEETUP = 3
+FEED_PAGE = 4
+FEED_ITEM_TYPE_CHOICES = (
+    (FEED_NEWS, "News"),
+    (FEED_RESOURCE, "Resource"),
+    (FEED_MEETUP, "Meetup"),
+    (FEED_PAGE, "Community page"),
+)
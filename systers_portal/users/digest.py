@@ -0,0 +1,201 @@
+"""Digests of the join requests to review.
+
+Instead of one email per join request and per organizer, the meetup location
+organizers and the community admins receive a single message listing the
+join requests made since their previous digest, as often as their
+`digest_frequency` preference asks for. Each frequency has a `DigestWindow`
+remembering the last join requests it covered; a window is processed with a
+fixed number of queries whatever the number of join requests and recipients,
+and all its messages are sent over a single connection.
+
+Join requests that were approved, rejected or canceled before the end of the
+window are left out.
+"""
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from community.models import Community
+from meetup.models import MeetupLocation
+from membership.models import JoinRequest
+from users.constants import DIGEST_INTERVALS, DIGEST_SUBJECT
+from users.models import DigestWindow, SystersUser
+
+
+def collect_meetup_join_requests(frequency, after, until):
+    """Group the new meetup location join requests per organizer
+
+    :param frequency: string digest frequency of the organizers
+    :param after: integer id of the last join request of the previous digest
+    :param until: integer id of the last join request of this digest
+    :return: dict mapping organizer ids to dicts mapping meetup location ids
+             to lists of requester ids
+    """
+    entries = MeetupLocation.join_requests.through.objects.filter(
+        pk__gt=after, pk__lte=until).order_by('pk').values_list(
+        'meetuplocation_id', 'systersuser_id')
+    requesters = OrderedDict()
+    for location_id, systersuser_id in entries:
+        requesters.setdefault(location_id, []).append(systersuser_id)
+    if not requesters:
+        return {}
+    organizers = MeetupLocation.organizers.through.objects.filter(
+        meetuplocation_id__in=requesters, systersuser__digest_frequency=frequency).exclude(
+        systersuser__user__email='').values_list('meetuplocation_id', 'systersuser_id')
+    digests = {}
+    for location_id, organizer_id in organizers:
+        digests.setdefault(organizer_id, OrderedDict())[location_id] = requesters[location_id]
+    return digests
+
+
+def collect_community_join_requests(frequency, after, until):
+    """Group the new pending community join requests per community admin
+
+    :param frequency: string digest frequency of the admins
+    :param after: integer id of the last join request of the previous digest
+    :param until: integer id of the last join request of this digest
+    :return: dict mapping admin ids to dicts mapping community ids to lists
+             of requester ids
+    """
+    entries = JoinRequest.objects.filter(
+        pk__gt=after, pk__lte=until, is_approved=False).order_by('pk').values_list(
+        'community_id', 'user_id')
+    requesters = OrderedDict()
+    for community_id, systersuser_id in entries:
+        requesters.setdefault(community_id, []).append(systersuser_id)
+    if not requesters:
+        return {}
+    admins = Community.objects.filter(
+        pk__in=requesters, admin__digest_frequency=frequency).exclude(
+        admin__user__email='').values_list('pk', 'admin_id')
+    digests = {}
+    for community_id, admin_id in admins:
+        digests.setdefault(admin_id, OrderedDict())[community_id] = requesters[community_id]
+    return digests
+
+
+def build_messages(meetup_digests, community_digests):
+    """Render one message per recipient, loading the users, meetup locations
+    and communities of all the digests at once.
+
+    :param meetup_digests: dict returned by `collect_meetup_join_requests`
+    :param community_digests: dict returned by `collect_community_join_requests`
+    :return: list of EmailMessage objects
+    """
+    user_ids, location_ids, community_ids = set(), set(), set()
+    for recipient_id, locations in meetup_digests.items():
+        user_ids.add(recipient_id)
+        location_ids.update(locations)
+        for requester_ids in locations.values():
+            user_ids.update(requester_ids)
+    for recipient_id, communities in community_digests.items():
+        user_ids.add(recipient_id)
+        community_ids.update(communities)
+        for requester_ids in communities.values():
+            user_ids.update(requester_ids)
+    if not user_ids:
+        return []
+    users = SystersUser.objects.select_related('user').in_bulk(user_ids)
+    locations = MeetupLocation.objects.only('name', 'slug').in_bulk(location_ids)
+    communities = Community.objects.in_bulk(community_ids)
+
+    context = {
+        'domain': Site.objects.get_current().domain,
+        'protocol': getattr(settings, 'ACCOUNT_DEFAULT_HTTP_PROTOCOL', 'http'),
+    }
+    messages = []
+    for recipient_id in sorted(set(meetup_digests) | set(community_digests)):
+        recipient = users[recipient_id]
+        context['recipient'] = recipient
+        context['meetup_locations'] = [
+            (locations[location_id], [users[pk] for pk in requester_ids])
+            for location_id, requester_ids in meetup_digests.get(recipient_id, {}).items()]
+        context['communities'] = [
+            (communities[community_id], [users[pk] for pk in requester_ids])
+            for community_id, requester_ids in community_digests.get(recipient_id, {}).items()]
+        count = sum(len(requesters) for _, requesters in
+                    context['meetup_locations'] + context['communities'])
+        messages.append(EmailMessage(
+            DIGEST_SUBJECT.format(count),
+            render_to_string('users/email/join_request_digest.txt', context),
+            to=[recipient.user.email]))
+    return messages
+
+
+def get_last_join_request_ids():
+    """Get the ids of the last meetup location and community join requests
+    that a window can cover. Ids are allocated before the inserting
+    transactions commit, so a join request could commit after another one
+    with a higher id was covered, and be skipped for good. The join request
+    tables are thus briefly locked in SHARE mode, which waits for the
+    transactions inserting join requests to commit and makes the new ones
+    wait: all the join requests up to the returned ids are then committed.
+
+    :return: tuple (integer id of the last meetup location join request,
+             integer id of the last community join request)
+    """
+    through = MeetupLocation.join_requests.through
+    tables = [db_connection.ops.quote_name(model._meta.db_table)
+              for model in (through, JoinRequest)]
+    with transaction.atomic():
+        with db_connection.cursor() as cursor:
+            cursor.execute("LOCK TABLE {0} IN SHARE MODE".format(", ".join(tables)))
+        return (through.objects.aggregate(last=Max('pk'))['last'] or 0,
+                JoinRequest.objects.aggregate(last=Max('pk'))['last'] or 0)
+
+
+def send_digest(frequency, force=False, connection=None):
+    """Send the digest of a frequency if its window is over. The window is
+    locked while it is processed, so that concurrent runs never send the same
+    digest twice, and it only moves forward once the messages are sent.
+
+    :param frequency: string digest frequency
+    :param force: boolean, send the digest even if the window is not over
+    :param connection: optional email backend connection to reuse
+    :return: integer number of messages sent, or None if the window is not
+             over
+    """
+    now = timezone.now()
+    DigestWindow.objects.get_or_create(frequency=frequency)
+    last_ids = get_last_join_request_ids()
+    with transaction.atomic():
+        window = DigestWindow.objects.select_for_update().get(frequency=frequency)
+        if not force and not window.is_due(now):
+            return None
+        last_meetup_join_request = max(last_ids[0], window.last_meetup_join_request)
+        last_community_join_request = max(last_ids[1], window.last_community_join_request)
+        messages = build_messages(
+            collect_meetup_join_requests(frequency, window.last_meetup_join_request,
+                                         last_meetup_join_request),
+            collect_community_join_requests(frequency, window.last_community_join_request,
+                                            last_community_join_request))
+        if messages:
+            (connection or get_connection()).send_messages(messages)
+        window.last_meetup_join_request = last_meetup_join_request
+        window.last_community_join_request = last_community_join_request
+        window.date_sent = now
+        window.save()
+    return len(messages)
+
+
+def send_due_digests(force=False):
+    """Send the digests of all the frequencies whose window is over, over a
+    single connection.
+
+    :param force: boolean, send the digests even if their window is not over
+    :return: dict mapping the frequencies to the number of messages sent,
+             or None if the window was not over
+    """
+    connection = get_connection()
+    connection.open()
+    try:
+        return {frequency: send_digest(frequency, force=force, connection=connection)
+                for frequency in DIGEST_INTERVALS}
+    finally:
+        connection.close()
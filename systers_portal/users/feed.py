@@ -0,0 +1,219 @@
+"""Activity feeds of the users.
+
+Rather than reading the news, resources, pages and meetups of all the
+communities and meetup locations of a user when their feed is displayed, each
+new item is written once to the feed of every member, see `fan_out`. The
+fan-out runs in a background job, the `FeedItem` rows are inserted
+`FEED_FANOUT_BATCH_SIZE` members at a time and the feeds touched by a batch
+are trimmed to their `FEED_MAX_LENGTH` latest items. Each batch is committed
+on its own; a retried fan-out skips the feeds the item was already written to.
+
+The feeds are read newest first with `get_feed_page`, one page at a time.
+The rows of deleted items are not removed, they are left out of the pages.
+"""
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.db import connection
+
+from blog.models import News, Resource
+from community.models import Community, CommunityPage
+from meetup.models import Meetup, MeetupLocation
+from users.constants import FEED_MEETUP, FEED_NEWS, FEED_PAGE, FEED_RESOURCE
+from users.models import FeedItem
+
+FEED_ITEM_MODELS = {
+    FEED_NEWS: News,
+    FEED_RESOURCE: Resource,
+    FEED_MEETUP: Meetup,
+    FEED_PAGE: CommunityPage,
+}
+
+
+def get_feed_item_type(model):
+    """Get the feed item type of a model
+
+    :param model: model class
+    :return: integer item type, or None if the objects of the model are not
+             written to the feeds
+    """
+    for item_type, item_model in FEED_ITEM_MODELS.items():
+        if model is item_model:
+            return item_type
+    return None
+
+
+def get_recipient_ids(item):
+    """Get the users whose feeds receive an item: the members of the community
+    of a news, resource or page, the members and organizers of the meetup
+    location of a meetup
+
+    :param item: News, Resource, CommunityPage or Meetup object
+    :return: sorted list of integer SystersUser ids
+    """
+    if isinstance(item, Meetup):
+        location_id = item.meetup_location_id
+        recipients = set(MeetupLocation.members.through.objects.filter(
+            meetuplocation_id=location_id).values_list('systersuser_id', flat=True))
+        recipients.update(MeetupLocation.organizers.through.objects.filter(
+            meetuplocation_id=location_id).values_list('systersuser_id', flat=True))
+    else:
+        recipients = set(Community.members.through.objects.filter(
+            community_id=item.community_id).values_list('systersuser_id', flat=True))
+    return sorted(recipients)
+
+
+FEED_TRIM_SQL = """
+DELETE FROM {table} AS feed_item USING (
+    SELECT systers_user_id, id AS oldest_kept FROM (
+        SELECT systers_user_id, id,
+               row_number() OVER (PARTITION BY systers_user_id ORDER BY id DESC) AS position
+        FROM {table} WHERE systers_user_id = ANY(%s)
+    ) AS ranked WHERE position = %s
+) AS cutoffs
+WHERE feed_item.systers_user_id = cutoffs.systers_user_id AND feed_item.id < cutoffs.oldest_kept
+"""
+
+
+def trim_feeds(systers_user_ids, max_length=None):
+    """Delete the items beyond the latest `max_length` ones of the feeds of
+    users. The id of the oldest kept item of each feed is found once, with a
+    single window query over the feeds on PostgreSQL, and the older items
+    are deleted in the same query. Other databases fall back to one indexed
+    lookup and one delete per feed.
+
+    :param systers_user_ids: list of integer SystersUser ids
+    :param max_length: integer number of items kept per feed, defaults to
+                       `FEED_MAX_LENGTH`
+    :return: integer number of deleted items
+    """
+    max_length = max_length or settings.FEED_MAX_LENGTH
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(FEED_TRIM_SQL.format(table=FeedItem._meta.db_table),
+                           [list(systers_user_ids), max_length])
+            return cursor.rowcount
+    deleted = 0
+    for systers_user_id in systers_user_ids:
+        feed_items = FeedItem.objects.filter(systers_user_id=systers_user_id)
+        oldest_kept = feed_items.order_by('-pk').values_list('pk', flat=True)[
+            max_length - 1:max_length].first()
+        if oldest_kept is not None:
+            deleted += feed_items.filter(pk__lt=oldest_kept).delete()[0]
+    return deleted
+
+
+FEED_INSERT_SQL = """
+INSERT INTO {table} (systers_user_id, item_type, item_id, date_created)
+SELECT systers_user_id, %s, %s, %s FROM unnest(%s) AS systers_user_id
+ON CONFLICT (systers_user_id, item_type, item_id) DO NOTHING
+"""
+
+
+def insert_feed_items(item_type, item_id, date_created, systers_user_ids):
+    """Write an item to the feeds of users, skipping the feeds which already
+    have it, with a single `INSERT ... ON CONFLICT DO NOTHING` on PostgreSQL.
+    Other databases fall back to a lookup of the existing rows and a bulk
+    insert of the others.
+
+    :param item_type: integer feed item type
+    :param item_id: integer id of the item
+    :param date_created: datetime the item was created
+    :param systers_user_ids: list of integer SystersUser ids
+    :return: integer number of inserted items
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(FEED_INSERT_SQL.format(table=FeedItem._meta.db_table),
+                           [item_type, item_id, date_created, list(systers_user_ids)])
+            return cursor.rowcount
+    existing = set(FeedItem.objects.filter(
+        item_type=item_type, item_id=item_id, systers_user_id__in=systers_user_ids).values_list(
+        'systers_user_id', flat=True))
+    return len(FeedItem.objects.bulk_create(
+        FeedItem(systers_user_id=systers_user_id, item_type=item_type, item_id=item_id,
+                 date_created=date_created)
+        for systers_user_id in systers_user_ids if systers_user_id not in existing))
+
+
+def fan_out(item_type, item_id, date_created, batch_size=None):
+    """Write an item to the feeds of its recipients. The feeds which already
+    have the item are skipped, so a fan-out failing after some batches can be
+    run again.
+
+    :param item_type: integer feed item type
+    :param item_id: integer id of the item
+    :param date_created: datetime the item was created
+    :param batch_size: integer number of feeds written per query, defaults to
+                       `FEED_FANOUT_BATCH_SIZE`
+    :return: integer number of feeds written, 0 if the item no longer exists
+    """
+    batch_size = batch_size or settings.FEED_FANOUT_BATCH_SIZE
+    item = FEED_ITEM_MODELS[item_type]._default_manager.filter(pk=item_id).first()
+    if item is None:
+        return 0
+    recipients = get_recipient_ids(item)
+    written = 0
+    for start in range(0, len(recipients), batch_size):
+        batch = recipients[start:start + batch_size]
+        written += insert_feed_items(item_type, item_id, date_created, batch)
+        trim_feeds(batch)
+    return written
+
+
+def get_feed_item_url(item_type, item):
+    """Get the URL of a feed item
+
+    :param item_type: integer feed item type
+    :param item: News, Resource, CommunityPage or Meetup object
+    :return: string URL
+    """
+    if item_type == FEED_MEETUP:
+        return reverse('view_meetup', kwargs={'slug': item.meetup_location.slug,
+                                              'meetup_slug': item.slug})
+    if item_type == FEED_PAGE:
+        return reverse('view_community_page', kwargs={'slug': item.community.slug,
+                                                      'page_slug': item.slug})
+    return item.get_absolute_url()
+
+
+def get_feed_page(systers_user, before=None, size=None):
+    """Get a page of the feed of a user, newest first. The pages are addressed
+    by a cursor, the id of the last feed item of the previous page, so that
+    they do not shift when items are added. The items are loaded with one
+    query per item type; the deleted ones are left out, a page can then be
+    shorter than `size`.
+
+    :param systers_user: SystersUser object
+    :param before: integer id of the last feed item of the previous page,
+                   None for the first page
+    :param size: integer number of feed items per page, defaults to
+                 `FEED_PAGE_SIZE`
+    :return: tuple (list of FeedItem objects with their `item` and its `url`,
+             integer cursor of the next page or None if there is no next page)
+    """
+    size = size or settings.FEED_PAGE_SIZE
+    feed_items = FeedItem.objects.filter(systers_user=systers_user)
+    if before is not None:
+        feed_items = feed_items.filter(pk__lt=before)
+    feed_items = list(feed_items.order_by('-pk')[:size + 1])
+    next_cursor = None
+    if len(feed_items) > size:
+        feed_items, next_cursor = feed_items[:size], feed_items[size - 1].pk
+
+    item_ids = {}
+    for feed_item in feed_items:
+        item_ids.setdefault(feed_item.item_type, []).append(feed_item.item_id)
+    items = {}
+    for item_type, ids in item_ids.items():
+        model = FEED_ITEM_MODELS[item_type]
+        related = 'meetup_location' if model is Meetup else 'community'
+        items[item_type] = model._default_manager.select_related(related).in_bulk(ids)
+    page = []
+    for feed_item in feed_items:
+        item = items[feed_item.item_type].get(feed_item.item_id)
+        if item is None:
+            continue
+        feed_item.item = item
+        feed_item.url = get_feed_item_url(feed_item.item_type, item)
+        page.append(feed_item)
+    return page, next_cursor
@@ -37,7 +37,8 @@ class SystersUserForm(forms.ModelForm):
     """Form for SystersUser model"""
     class Meta:
         model = SystersUser
-        fields = ('country', 'blog_url', 'homepage_url', 'profile_picture')
+        fields = ('country', 'blog_url', 'homepage_url', 'profile_picture',
+                  'digest_frequency')
 
 
 class SystersChangePasswordForm(ChangePasswordForm):
@@ -0,0 +1,26 @@
+from django.utils.dateparse import parse_datetime
+
+from common.jobs import job
+from users.feed import fan_out
+from users.thumbnails import generate_profile_picture_variants
+
+
+@job
+def generate_profile_pictures(systers_user_pk, picture_name):
+    """Generate the sizes and formats of a profile picture, see `users.thumbnails`
+
+    :param systers_user_pk: primary key of the SystersUser object
+    :param picture_name: string storage name of the profile picture
+    """
+    generate_profile_picture_variants(systers_user_pk, picture_name)
+
+
+@job
+def fan_out_feed_item(item_type, item_id, date_created):
+    """Write a new item to the activity feeds of its recipients, see `users.feed`
+
+    :param item_type: integer feed item type
+    :param item_id: integer id of the item
+    :param date_created: string ISO 8601 datetime the item was created
+    """
+    fan_out(item_type, item_id, parse_datetime(date_created))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from users.models import SystersUser
+from users.thumbnails import generate_profile_picture_variants
+
+
+class Command(BaseCommand):
+    help = "Generate the sizes and formats of the profile pictures that " \
+           "have no variants yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', dest='all',
+                            help="Regenerate the variants of all the profile "
+                                 "pictures.")
+
+    def handle(self, *args, **options):
+        users = SystersUser.objects.exclude(profile_picture__isnull=True).exclude(
+            profile_picture__in=['', 'False'])
+        if not options['all']:
+            users = users.filter(picture_variants__isnull=True)
+        count = 0
+        for pk, name in users.values_list('pk', 'profile_picture').iterator():
+            if generate_profile_picture_variants(pk, name):
+                count += 1
+        self.stdout.write("Generated variants of {0} profile pictures".format(count))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from users.constants import DIGEST_INTERVALS
+from users.digest import send_digest, send_due_digests
+
+
+class Command(BaseCommand):
+    help = "Send the join request digests whose window is over. Meant to " \
+           "be run every few minutes, e.g. from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frequency', choices=sorted(DIGEST_INTERVALS),
+                            help="Only send the digest of this frequency.")
+        parser.add_argument('--force', action='store_true', dest='force',
+                            help="Send the digests even if their window is not over.")
+
+    def handle(self, *args, **options):
+        if options['frequency']:
+            sent = {options['frequency']: send_digest(options['frequency'],
+                                                      force=options['force'])}
+        else:
+            sent = send_due_digests(force=options['force'])
+        for frequency, count in sorted(sent.items()):
+            if count is None:
+                self.stdout.write("{0}: window not over".format(frequency))
+            else:
+                self.stdout.write("{0}: sent {1} digests".format(frequency, count))
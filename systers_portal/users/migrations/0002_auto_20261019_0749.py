@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 07:49
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_squashed_0003_auto_20160207_1550'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilePictureVariant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.PositiveSmallIntegerField(verbose_name='Size')),
+                ('format', models.CharField(choices=[('JPEG', 'JPEG'), ('WEBP', 'WebP')], max_length=4, verbose_name='Format')),
+                ('image', models.ImageField(upload_to='users/thumbnails/', verbose_name='Image')),
+                ('systers_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='picture_variants', to='users.SystersUser', verbose_name='User')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='profilepicturevariant',
+            unique_together=set([('systers_user', 'size', 'format')]),
+        ),
+    ]
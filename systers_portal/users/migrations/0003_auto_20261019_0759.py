@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 07:59
+from __future__ import unicode_literals
+
+import common.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_auto_20261019_0749'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='systersuser',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=common.storage.ContentAddressedStorage(), upload_to='users/pictures/', verbose_name='Profile picture'),
+        ),
+    ]
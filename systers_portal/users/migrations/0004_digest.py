@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 08:10
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auto_20261019_0759'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestWindow',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('hourly', 'Hourly'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('never', 'Never')], max_length=6, unique=True, verbose_name='Frequency')),
+                ('last_meetup_join_request', models.PositiveIntegerField(default=0, verbose_name='Last meetup location join request')),
+                ('last_community_join_request', models.PositiveIntegerField(default=0, verbose_name='Last community join request')),
+                ('date_sent', models.DateTimeField(blank=True, null=True, verbose_name='Date sent')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='systersuser',
+            name='digest_frequency',
+            field=models.CharField(choices=[('hourly', 'Hourly'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('never', 'Never')], default='daily', help_text='How often to receive the join requests to review as an organizer or admin.', max_length=6, verbose_name='Join requests digest'),
+        ),
+    ]
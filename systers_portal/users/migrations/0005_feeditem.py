@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 09:36
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.PositiveSmallIntegerField(choices=[(1, 'News'), (2, 'Resource'), (3, 'Meetup'), (4, 'Community page')], verbose_name='Item type')),
+                ('item_id', models.PositiveIntegerField(verbose_name='Item id')),
+                ('date_created', models.DateTimeField(verbose_name='Date created')),
+                ('systers_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_items', to='users.SystersUser', verbose_name='User')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='feeditem',
+            index_together=set([('systers_user', 'id')]),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.6 on 2026-10-19 11:35
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def delete_duplicate_feed_items(apps, schema_editor):
+    """Keep the first row of the items written twice to a feed by a retried fan-out"""
+    FeedItem = apps.get_model('users', 'FeedItem')
+    duplicates = FeedItem.objects.values('systers_user_id', 'item_type', 'item_id').annotate(
+        count=Count('id'), first=Min('id')).filter(count__gt=1)
+    for duplicate in duplicates.iterator():
+        FeedItem.objects.filter(
+            systers_user_id=duplicate['systers_user_id'], item_type=duplicate['item_type'],
+            item_id=duplicate['item_id']).exclude(pk=duplicate['first']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_feeditem'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_feed_items, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='feeditem',
+            unique_together=set([('systers_user', 'item_type', 'item_id')]),
+        ),
+    ]
@@ -1,15 +1,18 @@
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
-from django.db import models
-from django.db.models.signals import post_save
+from django.contrib.staticfiles.templatetags.staticfiles import static
+from django.db import models, transaction
+from django.db.models.signals import post_init, post_save
 from django.dispatch import receiver
 from cities_light.models import Country
-from imagekit.models import ImageSpecField
-from imagekit.processors import ResizeToFill
 
+from common.storage import blob_storage
 from community.utils import get_groups
 from membership.constants import (NO_PENDING_JOIN_REQUEST, OK, NOT_MEMBER,
                                   IS_ADMIN)
+from users.constants import (DIGEST_DAILY, DIGEST_FREQUENCY_CHOICES, DIGEST_INTERVALS,
+                             FEED_ITEM_TYPE_CHOICES, JPEG, PROFILE_PICTURE_FORMAT_CHOICES,
+                             PROFILE_PICTURE_FORMATS, PROFILE_PICTURE_PLACEHOLDER)
 
 
 class SystersUser(models.Model):
@@ -20,12 +23,15 @@ class SystersUser(models.Model):
     homepage_url = models.URLField(max_length=255, blank=True,
                                    verbose_name="Homepage")
     profile_picture = models.ImageField(upload_to='users/pictures/',
+                                        storage=blob_storage,
                                         blank=True,
                                         null=True,
                                         verbose_name="Profile picture")
-    profile_picture_thumbnail = ImageSpecField(source='profile_picture',
-                                               processors=[ResizeToFill(100, 100)],
-                                               options={'quality': 100})
+    digest_frequency = models.CharField(max_length=6, choices=DIGEST_FREQUENCY_CHOICES,
+                                        default=DIGEST_DAILY,
+                                        verbose_name="Join requests digest",
+                                        help_text="How often to receive the join requests "
+                                                  "to review as an organizer or admin.")
 
     def __str__(self):
         return str(self.user)
@@ -65,6 +71,33 @@ class SystersUser(models.Model):
         return [(field.name, getattr(self, field.name)) for field in
                 SystersUser._meta.fields]
 
+    def get_profile_picture_srcsets(self, size):
+        """Get the srcset of the profile picture variants of a given size in
+        each image format. Only the variants stored in the database are used,
+        `picture_variants` can be prefetched to render a list of users with a
+        single query. The placeholder image is used while the variants of the
+        current profile picture are not generated yet.
+
+        :param size: integer size in pixels of the displayed picture
+        :return: list of tuples (image format, srcset) ordered by format
+                 preference, the JPEG srcset is always last
+        """
+        urls = {}
+        for variant in self.picture_variants.all():
+            if variant.size in (size, size * 2):
+                urls.setdefault(variant.format, {})[variant.size] = variant.image.url
+        if JPEG not in urls or size not in urls[JPEG]:
+            return [(JPEG, static(PROFILE_PICTURE_PLACEHOLDER))]
+        srcsets = []
+        for image_format in PROFILE_PICTURE_FORMATS[::-1]:
+            if size not in urls.get(image_format, {}):
+                continue
+            srcset = urls[image_format][size]
+            if size * 2 in urls[image_format]:
+                srcset = "{0} 1x, {1} 2x".format(srcset, urls[image_format][size * 2])
+            srcsets.append((image_format, srcset))
+        return srcsets
+
     def is_member(self, community):
         """Check if the user is a member of the community
 
@@ -94,34 +127,37 @@ class SystersUser(models.Model):
         return member_groups
 
     def get_last_join_request(self, community):
-        """Get the last join request made by the user to a community
+        """Get the last join request made by the user to a community. Once
+        archived, only the approved join requests are returned, through their
+        summary, since the archived not approved ones are expired.
 
         :param community: Community object
-        :return: JoinRequest object or None in case user has made no requests
+        :return: JoinRequest object, JoinRequestSummary object of the last
+                 approved archived join request, or None in case user has made
+                 no requests
         """
-        from membership.models import JoinRequest
-        join_requests = JoinRequest.objects.filter(user=self,
-                                                   community=community).\
-            order_by('-date_created')
-        if join_requests:
-            return join_requests[0]
-
-    def approve_all_join_requests(self, community):
+        from membership.models import JoinRequest, JoinRequestSummary
+        join_request = JoinRequest.objects.filter(
+            user=self, community=community).order_by('-date_created').first()
+        if join_request is None:
+            join_request = JoinRequestSummary.objects.filter(
+                user=self, community=community, is_approved=True).first()
+        return join_request
+
+    def approve_all_join_requests(self, community, approved_by=None):
         """Approve all join requests of a user towards a community.
 
         :param community: Community object
+        :param approved_by: SystersUser object approving the join requests
         :return: string approve status: OK if all approved,
                  NO_PENDING_JOIN_REQUEST if no not approved join requests
         """
         from membership.models import JoinRequest
-        join_requests = JoinRequest.objects.filter(user=self,
-                                                   community=community,
-                                                   is_approved=False)
-        if not join_requests.exists():
+        approved = JoinRequest.objects.filter(
+            user=self, community=community, is_approved=False).update(
+            is_approved=True, approved_by=approved_by)
+        if not approved:
             return NO_PENDING_JOIN_REQUEST
-
-        for join_request in join_requests:
-            join_request.approve()
         return OK
 
     def delete_all_join_requests(self, community):
@@ -163,6 +199,73 @@ class SystersUser(models.Model):
         return OK
 
 
+class ProfilePictureVariant(models.Model):
+    """Resized copy of a profile picture in a given size and image format.
+    Variants are generated in the background after the profile picture
+    changes, see `users.thumbnails`."""
+    systers_user = models.ForeignKey(SystersUser, related_name="picture_variants",
+                                     verbose_name="User")
+    size = models.PositiveSmallIntegerField(verbose_name="Size")
+    format = models.CharField(max_length=4, choices=PROFILE_PICTURE_FORMAT_CHOICES,
+                              verbose_name="Format")
+    image = models.ImageField(upload_to='users/thumbnails/', verbose_name="Image")
+
+    class Meta:
+        unique_together = (('systers_user', 'size', 'format'),)
+
+    def __str__(self):
+        return "{0} {1}px {2} profile picture".format(
+            self.systers_user, self.size, self.format)
+
+
+class DigestWindow(models.Model):
+    """Progress of the join request digests of a frequency. The digest sent
+    at the end of a window covers the join requests stored after the ones
+    covered by the previous digest, see `users.digest`."""
+    frequency = models.CharField(max_length=6, choices=DIGEST_FREQUENCY_CHOICES, unique=True,
+                                 verbose_name="Frequency")
+    last_meetup_join_request = models.PositiveIntegerField(
+        default=0, verbose_name="Last meetup location join request")
+    last_community_join_request = models.PositiveIntegerField(
+        default=0, verbose_name="Last community join request")
+    date_sent = models.DateTimeField(null=True, blank=True, verbose_name="Date sent")
+
+    def __str__(self):
+        return "{0} join requests digest".format(self.get_frequency_display())
+
+    def is_due(self, now):
+        """Check if the window of the digest is over
+
+        :param now: datetime current time
+        :return: True if the digest should be sent, False otherwise
+        """
+        if self.frequency not in DIGEST_INTERVALS:
+            return False
+        return self.date_sent is None or \
+            (now - self.date_sent).total_seconds() >= DIGEST_INTERVALS[self.frequency]
+
+
+class FeedItem(models.Model):
+    """Entry of the activity feed of a user, written for each member when an
+    item is posted to their communities or meetup locations, see `users.feed`.
+    The item is referred to by its type and id only, to keep the rows small."""
+    systers_user = models.ForeignKey(SystersUser, related_name="feed_items",
+                                     verbose_name="User")
+    item_type = models.PositiveSmallIntegerField(choices=FEED_ITEM_TYPE_CHOICES,
+                                                 verbose_name="Item type")
+    item_id = models.PositiveIntegerField(verbose_name="Item id")
+    date_created = models.DateTimeField(verbose_name="Date created")
+
+    class Meta:
+        index_together = (('systers_user', 'id'),)
+        # an item is written once per feed, even when its fan-out is retried
+        unique_together = (('systers_user', 'item_type', 'item_id'),)
+
+    def __str__(self):
+        return "{0} {1} in the feed of {2}".format(
+            self.get_item_type_display(), self.item_id, self.systers_user)
+
+
 def user_str(self):
     """String representation of Django User model
 
@@ -189,3 +292,32 @@ def create_systers_user(sender, instance, created, **kwargs):
         if instance is not None:
             systers_user = SystersUser(user=instance)
             systers_user.save()
+
+
+@receiver(post_init, sender=SystersUser)
+def remember_profile_picture(sender, instance, **kwargs):
+    """Remember the name of the loaded profile picture, to be able to tell
+    on save if it changed."""
+    picture = instance.__dict__.get('profile_picture')
+    instance._profile_picture_name = getattr(picture, 'name', picture) or None
+
+
+@receiver(post_save, sender=SystersUser)
+def update_profile_picture_variants(sender, instance, update_fields, **kwargs):
+    """Drop the variants of a replaced profile picture and schedule the
+    generation of the variants of the new one. Until the new variants are
+    stored the placeholder image is displayed."""
+    if update_fields is not None and 'profile_picture' not in update_fields:
+        return
+    if 'profile_picture' in instance.get_deferred_fields():
+        return
+    name = instance.profile_picture.name or None
+    if name == instance._profile_picture_name:
+        return
+    instance._profile_picture_name = name
+    from users.thumbnails import (delete_profile_picture_variants,
+                                  schedule_profile_picture_variants)
+    delete_profile_picture_variants(instance)
+    if name:
+        transaction.on_commit(
+            lambda: schedule_profile_picture_variants(instance.pk, name))
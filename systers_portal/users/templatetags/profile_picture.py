@@ -0,0 +1,30 @@
+from django import template
+
+from users.constants import PROFILE_PICTURE_MIME_TYPES
+
+
+register = template.Library()
+
+
+@register.inclusion_tag('users/snippets/profile_picture.html')
+def profile_picture(systersuser, size=100, css_class="img-responsive"):
+    """Render the profile picture variants of a user in a picture element,
+    letting the browser pick the best format and resolution.
+
+    :param systersuser: SystersUser object
+    :param size: integer size in pixels of the displayed picture
+    :param css_class: string CSS class of the img element
+    :return: dict template context
+    """
+    srcsets = systersuser.get_profile_picture_srcsets(size)
+    sources = [(srcset, PROFILE_PICTURE_MIME_TYPES[image_format])
+               for image_format, srcset in srcsets[:-1]]
+    fallback = srcsets[-1][1]
+    return {
+        'systersuser': systersuser,
+        'sources': sources,
+        'src': fallback.split(' ', 1)[0],
+        'srcset': fallback,
+        'size': size,
+        'css_class': css_class,
+    }
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from common.jobs import work
+from common.models import Job
+from users.adapter import SystersUserAccountAdapter
+
+
+class SystersUserAccountAdapterTestCase(TestCase):
+    @override_settings(JOBS_ALWAYS_EAGER=False)
+    def test_send_mail(self):
+        """Test account emails are rendered right away and sent by a job"""
+        user = User.objects.create_user(username='foo', password='foobar',
+                                        email='foo@bar.com')
+        context = {'user': user, 'activate_url': 'http://example.com/confirm/',
+                   'current_site': Site.objects.get_current(), 'key': 'key'}
+        SystersUserAccountAdapter().send_mail('account/email/email_confirmation',
+                                              'foo@bar.com', context)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Job.objects.get().name, 'common.jobs.send_email')
+        work(lambda: False, once=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['foo@bar.com'])
+        self.assertIn('http://example.com/confirm/', mail.outbox[0].body)
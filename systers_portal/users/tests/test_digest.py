@@ -0,0 +1,161 @@
+import threading
+from datetime import timedelta
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from community.models import Community
+from meetup.models import MeetupLocation
+from membership.models import JoinRequest
+from users.constants import DIGEST_DAILY, DIGEST_HOURLY, DIGEST_NEVER, DIGEST_WEEKLY
+from users.digest import get_last_join_request_ids, send_digest, send_due_digests
+from users.models import DigestWindow, SystersUser
+
+
+class DigestTestCase(TestCase):
+    def setUp(self):
+        self.organizer = self.create_systers_user('organizer', DIGEST_DAILY)
+        self.admin = self.create_systers_user('admin', DIGEST_DAILY)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Foo', display_name='Foo', country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location,
+            description="It's a test location", sponsors="BarBaz")
+        self.meetup_location.organizers.add(self.organizer)
+        self.community = Community.objects.create(name="Bar", slug="bar", order=1,
+                                                  admin=self.admin)
+        self.requesters = [self.create_systers_user('user{0}'.format(i)) for i in range(3)]
+
+    def create_systers_user(self, username, frequency=DIGEST_DAILY):
+        user = User.objects.create(username=username, email='{0}@test.com'.format(username))
+        SystersUser.objects.filter(user=user).update(digest_frequency=frequency)
+        return SystersUser.objects.get(user=user)
+
+    def test_one_message_per_recipient(self):
+        """Test the join requests are grouped in one message per recipient"""
+        for requester in self.requesters:
+            self.meetup_location.join_requests.add(requester)
+        for requester in self.requesters[:2]:
+            JoinRequest.objects.create(user=requester, community=self.community)
+        self.community.admin = self.organizer
+        self.community.save()
+        self.assertEqual(send_digest(DIGEST_DAILY), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['organizer@test.com'])
+        self.assertEqual(message.subject, "5 new join requests to review")
+        self.assertIn("Foo Systers:\n  - user0\n  - user1\n  - user2\n", message.body)
+        self.assertIn("/meetup/foo/join_requests/", message.body)
+        self.assertIn("Bar:\n  - user0\n  - user1\n", message.body)
+        self.assertIn("/community/bar/join_requests/", message.body)
+
+    def test_window(self):
+        """Test a digest only covers the join requests made since the
+        previous one, and is not sent before the end of its window"""
+        self.meetup_location.join_requests.add(self.requesters[0])
+        JoinRequest.objects.create(user=self.requesters[0], community=self.community)
+        self.assertEqual(send_digest(DIGEST_DAILY), 2)
+        self.meetup_location.join_requests.add(self.requesters[1])
+        self.assertIsNone(send_digest(DIGEST_DAILY))
+        DigestWindow.objects.filter(frequency=DIGEST_DAILY).update(
+            date_sent=timezone.now() - timedelta(days=1))
+        self.assertEqual(send_digest(DIGEST_DAILY), 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn("user1", mail.outbox[2].body)
+        self.assertNotIn("user0", mail.outbox[2].body)
+        self.assertEqual(send_digest(DIGEST_DAILY, force=True), 0)
+
+    def test_handled_join_requests(self):
+        """Test the join requests handled before the digest are left out"""
+        self.meetup_location.join_requests.add(self.requesters[0])
+        self.meetup_location.join_requests.remove(self.requesters[0])
+        JoinRequest.objects.create(user=self.requesters[0], community=self.community,
+                                   is_approved=True)
+        self.assertEqual(send_digest(DIGEST_DAILY), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_frequency_preferences(self):
+        """Test each recipient gets the digest of their frequency"""
+        self.organizer.digest_frequency = DIGEST_HOURLY
+        self.organizer.save()
+        self.admin.digest_frequency = DIGEST_NEVER
+        self.admin.save()
+        self.meetup_location.join_requests.add(self.requesters[0])
+        JoinRequest.objects.create(user=self.requesters[0], community=self.community)
+        self.assertEqual(send_due_digests(),
+                         {DIGEST_HOURLY: 1, DIGEST_DAILY: 0, DIGEST_WEEKLY: 0})
+        self.assertEqual(mail.outbox[0].to, ['organizer@test.com'])
+
+    def test_constant_queries(self):
+        """Test the number of queries does not depend on the number of join
+        requests and recipients"""
+        Site.objects.get_current()
+        send_digest(DIGEST_DAILY)
+        DigestWindow.objects.update(date_sent=None)
+        self.meetup_location.join_requests.add(self.requesters[0])
+        JoinRequest.objects.create(user=self.requesters[0], community=self.community)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(send_digest(DIGEST_DAILY), 2)
+        for i in range(5):
+            organizer = self.create_systers_user('organizer{0}'.format(i))
+            self.meetup_location.organizers.add(organizer)
+            requester = self.create_systers_user('requester{0}'.format(i))
+            self.meetup_location.join_requests.add(requester)
+            JoinRequest.objects.create(user=requester, community=self.community)
+        DigestWindow.objects.update(date_sent=None)
+        with self.assertNumQueries(len(queries)):
+            self.assertEqual(send_digest(DIGEST_DAILY), 7)
+
+    def test_send_digests_command(self):
+        """Test sending the due digests from the command line"""
+        self.meetup_location.join_requests.add(self.requesters[0])
+        out = StringIO()
+        call_command('send_digests', stdout=out)
+        self.assertIn("daily: sent 1 digests", out.getvalue())
+        call_command('send_digests', frequency=DIGEST_DAILY, stdout=out)
+        self.assertIn("daily: window not over", out.getvalue())
+
+
+class DigestWatermarkTestCase(TransactionTestCase):
+    def setUp(self):
+        admin = SystersUser.objects.get(user=User.objects.create(username='admin'))
+        self.community = Community.objects.create(name="Bar", slug="bar", order=1, admin=admin)
+        self.requester = SystersUser.objects.get(user=User.objects.create(username='foo'))
+
+    def test_wait_for_inserting_transactions(self):
+        """Test the last join request ids are read once the transactions inserting join
+        requests committed, so that no join request is skipped by a window"""
+        inserted, commit = threading.Event(), threading.Event()
+        join_request_ids, last_ids = [], []
+
+        def insert():
+            with transaction.atomic():
+                join_request_ids.append(JoinRequest.objects.create(
+                    user=self.requester, community=self.community).pk)
+                inserted.set()
+                commit.wait(5)
+            connections.close_all()
+
+        def read():
+            last_ids.append(get_last_join_request_ids())
+            connections.close_all()
+
+        inserting = threading.Thread(target=insert)
+        inserting.start()
+        inserted.wait(5)
+        reading = threading.Thread(target=read)
+        reading.start()
+        reading.join(0.5)
+        self.assertTrue(reading.is_alive())
+        commit.set()
+        inserting.join(5)
+        reading.join(5)
+        self.assertEqual(last_ids, [(0, join_request_ids[0])])
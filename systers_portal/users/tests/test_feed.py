@@ -0,0 +1,140 @@
+from unittest.mock import patch
+
+from cities_light.models import City, Country
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import News, Resource
+from community.models import Community, CommunityPage
+from meetup.models import Meetup, MeetupLocation
+from users.constants import FEED_MEETUP, FEED_NEWS, FEED_PAGE, FEED_RESOURCE
+from users.feed import fan_out, get_feed_page, trim_feeds
+from users.models import FeedItem, SystersUser
+
+
+class FeedTestCase(TestCase):
+    def setUp(self):
+        self.admin = self.create_systers_user('admin')
+        self.community = Community.objects.create(name="Foo", slug="foo", order=1,
+                                                  admin=self.admin)
+        self.members = [self.create_systers_user('user{0}'.format(i)) for i in range(3)]
+        for member in self.members:
+            self.community.add_member(member)
+        country = Country.objects.create(name='Bar', continent='AS')
+        location = City.objects.create(name='Baz', display_name='Baz', country=country)
+        self.meetup_location = MeetupLocation.objects.create(
+            name="Foo Systers", slug="foo", location=location)
+        self.meetup_location.organizers.add(self.admin)
+        self.meetup_location.members.add(self.members[0], self.admin)
+
+    def create_systers_user(self, username):
+        return SystersUser.objects.get(user=User.objects.create(username=username))
+
+    def create_news(self, slug):
+        return News.objects.create(slug=slug, title=slug.title(), author=self.admin,
+                                   content="Hi", community=self.community)
+
+    def get_feed(self, systers_user):
+        return list(FeedItem.objects.filter(systers_user=systers_user).order_by(
+            '-pk').values_list('item_type', 'item_id'))
+
+    def test_fan_out_on_create(self):
+        """Test the new items are written to the feeds of the members"""
+        news = self.create_news('foo')
+        resource = Resource.objects.create(slug='bar', title='Bar', author=self.admin,
+                                           content="Hi", community=self.community)
+        page = CommunityPage.objects.create(slug='baz', title='Baz', order=1, author=self.admin,
+                                            content="Hi", community=self.community)
+        meetup = Meetup.objects.create(
+            title='Foo', slug='foo', date=timezone.now().date(), time=timezone.now().time(),
+            meetup_location=self.meetup_location)
+        news.title = "Foo Bar"
+        news.save()
+        community_items = [(FEED_PAGE, page.pk), (FEED_RESOURCE, resource.pk),
+                           (FEED_NEWS, news.pk)]
+        self.assertEqual(self.get_feed(self.admin), [(FEED_MEETUP, meetup.pk)] + community_items)
+        self.assertEqual(self.get_feed(self.members[0]),
+                         [(FEED_MEETUP, meetup.pk)] + community_items)
+        self.assertEqual(self.get_feed(self.members[1]), community_items)
+
+    def test_fan_out_batches(self):
+        """Test the feeds are written with one insert per batch of members"""
+        news = self.create_news('foo')
+        FeedItem.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(fan_out(FEED_NEWS, news.pk, timezone.now(), batch_size=2), 4)
+        inserts = [query for query in queries if query['sql'].lstrip().startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(FeedItem.objects.count(), 4)
+        self.assertEqual(fan_out(FEED_NEWS, 0, timezone.now()), 0)
+
+    def test_fan_out_retry(self):
+        """Test a fan-out failing after a batch is retried without writing the item twice"""
+        news = self.create_news('foo')
+        FeedItem.objects.all().delete()
+        with patch('users.feed.trim_feeds', side_effect=[0, ValueError("Boom")]):
+            with self.assertRaises(ValueError):
+                fan_out(FEED_NEWS, news.pk, timezone.now(), batch_size=2)
+        self.assertEqual(FeedItem.objects.count(), 4)
+        self.assertEqual(fan_out(FEED_NEWS, news.pk, timezone.now(), batch_size=2), 0)
+        FeedItem.objects.filter(systers_user=self.members[2]).delete()
+        self.assertEqual(fan_out(FEED_NEWS, news.pk, timezone.now(), batch_size=2), 1)
+        for systers_user in [self.admin] + self.members:
+            self.assertEqual(self.get_feed(systers_user), [(FEED_NEWS, news.pk)])
+
+    @override_settings(FEED_MAX_LENGTH=2)
+    def test_trim(self):
+        """Test the feeds keep their latest items only"""
+        news = [self.create_news('news{0}'.format(i)) for i in range(3)]
+        self.assertEqual(self.get_feed(self.members[1]),
+                         [(FEED_NEWS, news[2].pk), (FEED_NEWS, news[1].pk)])
+        self.assertEqual(FeedItem.objects.count(), 8)
+        self.assertEqual(trim_feeds([self.admin.pk], max_length=1), 1)
+
+        feeds = [self.admin.pk] + [member.pk for member in self.members]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(trim_feeds(feeds, max_length=1), 3)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.get_feed(self.members[1]), [(FEED_NEWS, news[2].pk)])
+        self.assertEqual(trim_feeds(feeds, max_length=1), 0)
+
+    def test_feed_page(self):
+        """Test the feed is paginated with a cursor and skips the deleted items"""
+        news = [self.create_news('news{0}'.format(i)) for i in range(5)]
+        page, cursor = get_feed_page(self.members[0], size=2)
+        self.assertEqual([feed_item.item for feed_item in page], [news[4], news[3]])
+        self.assertEqual(page[0].url, news[4].get_absolute_url())
+
+        news[2].delete()
+        page, cursor = get_feed_page(self.members[0], before=cursor, size=2)
+        self.assertEqual([feed_item.item for feed_item in page], [news[1]])
+        page, cursor = get_feed_page(self.members[0], before=cursor, size=2)
+        self.assertEqual([feed_item.item for feed_item in page], [news[0]])
+        self.assertIsNone(cursor)
+
+    def test_user_view_feed(self):
+        """Test the feed is displayed on the profile of the user only"""
+        news = [self.create_news('news{0}'.format(i)) for i in range(3)]
+        self.members[0].user.set_password('foobar')
+        self.members[0].user.save()
+        self.client.login(username='user0', password='foobar')
+        with override_settings(FEED_PAGE_SIZE=2):
+            response = self.client.get(reverse('user', kwargs={'username': 'user0'}))
+        self.assertTemplateUsed(response, 'users/snippets/feed.html')
+        self.assertEqual([feed_item.item for feed_item in response.context['feed_items']],
+                         [news[2], news[1]])
+        self.assertContains(response, news[1].get_absolute_url())
+        self.assertContains(response, '?before={0}'.format(response.context['feed_next']))
+
+        response = self.client.get(reverse('user', kwargs={'username': 'user0'}),
+                                   {'before': response.context['feed_next']})
+        self.assertEqual([feed_item.item for feed_item in response.context['feed_items']],
+                         [news[0]])
+
+        response = self.client.get(reverse('user', kwargs={'username': 'user1'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateNotUsed(response, 'users/snippets/feed.html')
@@ -16,7 +16,8 @@ class UserFormsTestCase(TestCase):
         self.assertEqual(type(form.systers_user_form), SystersUserForm)
         data = {'first_name': 'Foo',
                 'last_name': 'Bar',
-                'blog_url': 'http://example.com/'}
+                'blog_url': 'http://example.com/',
+                'digest_frequency': 'daily'}
         form = UserForm(data=data, instance=self.user)
         self.assertTrue(form.is_valid())
         form.save()
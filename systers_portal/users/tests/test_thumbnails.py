@@ -0,0 +1,134 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.utils.six import StringIO
+from PIL import Image
+
+from common.models import Job
+from users.constants import JPEG, PROFILE_PICTURE_FORMATS, PROFILE_PICTURE_SIZES, WEBP
+from users.models import ProfilePictureVariant, SystersUser
+from users.thumbnails import (generate_profile_picture_variants,
+                              schedule_profile_picture_variants)
+
+
+def create_image_file(width=300, height=200):
+    output = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(output, format='PNG')
+    return ContentFile(output.getvalue())
+
+
+class ProfilePictureVariantsTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='foo', password='foobar')
+        self.systers_user = SystersUser.objects.get(user=self.user)
+        self.systers_user.profile_picture.save('foo.png', create_image_file())
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_generate_profile_picture_variants(self):
+        """Test generating all sizes and formats of a profile picture"""
+        variants = generate_profile_picture_variants(
+            self.systers_user.pk, self.systers_user.profile_picture.name)
+        count = len(PROFILE_PICTURE_SIZES) * len(PROFILE_PICTURE_FORMATS)
+        self.assertEqual(len(variants), count)
+        variant = ProfilePictureVariant.objects.get(systers_user=self.systers_user,
+                                                    size=50, format=WEBP)
+        self.assertTrue(variant.image.name.endswith('.webp'))
+        image = Image.open(variant.image.path)
+        self.assertEqual(image.format, WEBP)
+        self.assertEqual(image.size, (50, 50))
+
+    @patch('users.thumbnails.features.check', return_value=False)
+    def test_generate_without_webp(self, check):
+        """Test only JPEG variants are generated when Pillow can't encode WebP"""
+        variants = generate_profile_picture_variants(
+            self.systers_user.pk, self.systers_user.profile_picture.name)
+        self.assertEqual(len(variants), len(PROFILE_PICTURE_SIZES))
+        self.assertEqual({variant.format for variant in variants}, {JPEG})
+
+    @override_settings(JOBS_ALWAYS_EAGER=False)
+    def test_schedule_profile_picture_variants(self):
+        """Test the generation is queued once as a background job"""
+        name = self.systers_user.profile_picture.name
+        queued = schedule_profile_picture_variants(self.systers_user.pk, name)
+        self.assertEqual(queued.name, 'users.jobs.generate_profile_pictures')
+        self.assertIsNone(schedule_profile_picture_variants(self.systers_user.pk, name))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_generate_stale_profile_picture(self):
+        """Test nothing is generated for a replaced profile picture"""
+        self.assertEqual(generate_profile_picture_variants(
+            self.systers_user.pk, 'users/pictures/old.png'), [])
+        self.assertFalse(ProfilePictureVariant.objects.exists())
+
+    def test_picture_change_drops_variants(self):
+        """Test the variants are dropped when the profile picture changes"""
+        generate_profile_picture_variants(
+            self.systers_user.pk, self.systers_user.profile_picture.name)
+        systers_user = SystersUser.objects.get(pk=self.systers_user.pk)
+        systers_user.blog_url = "http://foo.com"
+        systers_user.save()
+        self.assertTrue(ProfilePictureVariant.objects.exists())
+        # the same picture is stored under the same name, nothing changes
+        systers_user.profile_picture.save('bar.png', create_image_file())
+        self.assertTrue(ProfilePictureVariant.objects.exists())
+        systers_user.profile_picture.save('bar.png', create_image_file(400, 300))
+        self.assertFalse(ProfilePictureVariant.objects.exists())
+
+    def test_profile_picture_srcsets(self):
+        """Test the srcsets use the stored variants or the placeholder"""
+        srcsets = self.systers_user.get_profile_picture_srcsets(100)
+        self.assertEqual(srcsets, [(JPEG, '/static/img/default.png')])
+        generate_profile_picture_variants(
+            self.systers_user.pk, self.systers_user.profile_picture.name)
+        systers_user = SystersUser.objects.prefetch_related('picture_variants').get(
+            pk=self.systers_user.pk)
+        with self.assertNumQueries(0):
+            srcsets = systers_user.get_profile_picture_srcsets(100)
+        self.assertEqual([image_format for image_format, _ in srcsets], [WEBP, JPEG])
+        self.assertRegex(srcsets[1][1],
+                         r'^/media/users/thumbnails/[0-9a-f]{64}_100\S*\.jpg 1x, '
+                         r'/media/users/thumbnails/[0-9a-f]{64}_200\S*\.jpg 2x$')
+
+    def test_profile_picture_tag(self):
+        """Test rendering the profile picture variants in a picture element"""
+        template = Template("{% load profile_picture %}{% profile_picture user 50 %}")
+        html = template.render(Context({'user': self.systers_user}))
+        self.assertIn('src="/static/img/default.png"', html)
+        self.assertNotIn('<source', html)
+        generate_profile_picture_variants(
+            self.systers_user.pk, self.systers_user.profile_picture.name)
+        html = template.render(Context({'user': self.systers_user}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('width="50"', html)
+
+    def test_profile_page_picture(self):
+        """Test the profile page shows a variant of the profile picture"""
+        generate_profile_picture_variants(
+            self.systers_user.pk, self.systers_user.profile_picture.name)
+        self.client.login(username='foo', password='foobar')
+        response = self.client.get(reverse('user', kwargs={'username': 'foo'}))
+        self.assertContains(response, '_200')
+        self.assertContains(response, 'type="image/webp"')
+
+    def test_generate_profile_pictures_command(self):
+        """Test the command generates the missing variants"""
+        out = StringIO()
+        call_command('generate_profile_pictures', stdout=out)
+        self.assertIn("Generated variants of 1 profile pictures", out.getvalue())
+        self.assertEqual(ProfilePictureVariant.objects.count(), 6)
+        call_command('generate_profile_pictures', stdout=out)
+        self.assertIn("Generated variants of 0 profile pictures", out.getvalue())
@@ -139,7 +139,8 @@ class UserProfileViewTestCase(TestCase):
         """Test POST user profile"""
         self.client.login(username='foo', password='foobar')
         profile_url = reverse('user_profile', kwargs={'username': 'foo'})
-        response = self.client.post(profile_url, data={'first_name': 'Foo'})
+        response = self.client.post(profile_url, data={'first_name': 'Foo',
+                                                       'digest_frequency': 'hourly'})
         self.assertEqual(response.status_code, 302)
         self.assertTrue(response.url.endswith('/users/foo/'))
         user = User.objects.get(username='foo')
@@ -154,7 +155,7 @@ class UserProfileViewTestCase(TestCase):
         user = User.objects.create_user(username='bar', password='foobar')
         SystersUser.objects.get(user=user)
         response = self.client.post(bar_profile_url,
-                                    data={'first_name': 'Bar'})
+                                    data={'first_name': 'Bar', 'digest_frequency': 'daily'})
         self.assertEqual(response.status_code, 302)
         self.assertTrue(response.url.endswith('/users/bar/'))
         user = User.objects.get(username='bar')
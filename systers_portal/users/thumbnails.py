@@ -0,0 +1,112 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, features
+
+from common.jobs import enqueue
+from users.constants import (JPEG, WEBP, PROFILE_PICTURE_EXTENSIONS,
+                             PROFILE_PICTURE_FORMATS, PROFILE_PICTURE_SIZES)
+from users.models import ProfilePictureVariant, SystersUser
+
+SAVE_OPTIONS = {
+    JPEG: {'quality': 90, 'optimize': True, 'progressive': True},
+    WEBP: {'quality': 85},
+}
+
+
+def get_profile_picture_formats():
+    """Get the formats of the profile picture variants that the installed
+    Pillow can encode. WebP support is optional in Pillow builds, JPEG is
+    always available.
+
+    :return: tuple of string PIL format names
+    """
+    return tuple(image_format for image_format in PROFILE_PICTURE_FORMATS
+                 if image_format == JPEG or features.check(image_format.lower()))
+
+
+def schedule_profile_picture_variants(systers_user_pk, picture_name):
+    """Queue the generation of the variants of a profile picture as a
+    background job, see `common.jobs`
+
+    :param systers_user_pk: primary key of the SystersUser object
+    :param picture_name: string storage name of the profile picture
+    :return: Job object, or None if the job was run right away or was
+             already queued
+    """
+    from users.jobs import generate_profile_pictures
+
+    return enqueue(generate_profile_pictures, systers_user_pk, picture_name,
+                   dedup_key='generate_profile_pictures:{0}:{1}'.format(
+                       systers_user_pk, picture_name))
+
+
+def render_variant(image, size, image_format):
+    """Resize and crop an image to a square and encode it
+
+    :param image: RGB PIL Image object
+    :param size: integer side in pixels of the square
+    :param image_format: string PIL format name
+    :return: bytes of the encoded image
+    """
+    resized = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    output = BytesIO()
+    resized.save(output, format=image_format, **SAVE_OPTIONS.get(image_format, {}))
+    return output.getvalue()
+
+
+def generate_profile_picture_variants(systers_user_pk, picture_name):
+    """Generate and store all the sizes and formats of a profile picture.
+    Nothing is stored if the user has changed the profile picture meanwhile.
+
+    :param systers_user_pk: primary key of the SystersUser object
+    :param picture_name: string storage name of the profile picture
+    :return: list of the created ProfilePictureVariant objects
+    """
+    systers_user = SystersUser.objects.filter(pk=systers_user_pk).first()
+    if systers_user is None or systers_user.profile_picture.name != picture_name:
+        return []
+    storage = systers_user.profile_picture.storage
+    with storage.open(picture_name) as picture_file:
+        image = Image.open(picture_file).convert('RGB')
+
+    basename = os.path.splitext(os.path.basename(picture_name))[0]
+    variants = []
+    for size in PROFILE_PICTURE_SIZES:
+        for image_format in get_profile_picture_formats():
+            variant = ProfilePictureVariant(systers_user=systers_user, size=size,
+                                            format=image_format)
+            filename = "{0}_{1}.{2}".format(basename, size,
+                                            PROFILE_PICTURE_EXTENSIONS[image_format])
+            variant.image.save(filename, ContentFile(
+                render_variant(image, size, image_format)), save=False)
+            variants.append(variant)
+
+    with transaction.atomic():
+        current = SystersUser.objects.select_for_update().filter(
+            pk=systers_user_pk).values_list('profile_picture', flat=True).first()
+        if current == picture_name:
+            delete_profile_picture_variants(systers_user)
+            return ProfilePictureVariant.objects.bulk_create(variants)
+    for variant in variants:
+        variant.image.delete(save=False)
+    return []
+
+
+def delete_profile_picture_variants(systers_user):
+    """Delete the variant rows of a user profile picture and, once the
+    transaction is committed, their files.
+
+    :param systers_user: SystersUser object
+    """
+    variants = list(ProfilePictureVariant.objects.filter(systers_user=systers_user))
+    if not variants:
+        return
+    ProfilePictureVariant.objects.filter(pk__in=[v.pk for v in variants]).delete()
+
+    def delete_files():
+        for variant in variants:
+            variant.image.delete(save=False)
+    transaction.on_commit(delete_files)
@@ -5,6 +5,7 @@ from django.views.generic.edit import UpdateView
 from braces.views import LoginRequiredMixin, MultiplePermissionsRequiredMixin
 
 from membership.models import JoinRequest
+from users.feed import get_feed_page
 from users.forms import UserForm
 from users.models import SystersUser
 
@@ -20,6 +21,9 @@ class UserView(LoginRequiredMixin, TemplateView):
         * Community objects SystersUser is member of
         * SystersUser JoinRequest objects not (yet) approved
         * Group objects SystersUser is member of
+        * page of the activity feed, to the user viewing their own profile,
+          starting after the feed item whose id is given in the `before`
+          query string parameter
         """
         context = super(UserView, self).get_context_data(**kwargs)
         username = context['username']
@@ -32,6 +36,11 @@ class UserView(LoginRequiredMixin, TemplateView):
                         'community_list': communities,
                         'join_requests': join_requests,
                         'permission_groups': permission_groups}
+        if self.request.user == systersuser.user:
+            before = self.request.GET.get('before', '')
+            feed_items, feed_next = get_feed_page(
+                systersuser, before=int(before) if before.isdigit() else None)
+            context_dict.update({'feed_items': feed_items, 'feed_next': feed_next})
         for key, value in context_dict.items():
             context[key] = value
         return context